@@ -103,6 +103,11 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "maintenance_mode.middleware.MaintenanceModeMiddleware",
 ]
+# Report the time spent in the application's middlewares in a Server-Timing
+# response header
+MIDDLEWARE_TIMING = ast.literal_eval(os.environ.get("MIDDLEWARE_TIMING", "False"))
+if MIDDLEWARE_TIMING:
+    MIDDLEWARE.insert(0, "users.middleware.MiddlewareTimingMiddleware")
 
 AUTHENTICATION_BACKENDS = (
     "shibboleth.backends.ShibbolethRemoteUserBackend",
@@ -140,6 +145,19 @@ DATABASES = {
     )
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Set CACHE_URL (e.g. redis://redis:6379/1) to share the cache between
+# workers, otherwise each process has its own in-memory cache.
+CACHE_URL = os.environ.get("CACHE_URL")
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/2.0/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -208,6 +226,17 @@ EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD")
 EMAIL_PORT = os.environ.get("EMAIL_PORT")
 EMAIL_USE_TLS = ast.literal_eval(os.environ.get("EMAIL_USE_TLS", "False"))
+# Seconds to collect notifications to the same recipient for, before sending
+# them as one digest. 0, the default, sends each notification immediately.
+# Digests are sent by a scheduled job, so the RQ worker must run its scheduler
+# (rqworker --with-scheduler) when this is set.
+NOTIFICATION_COALESCE_SECONDS = int(os.environ.get("NOTIFICATION_COALESCE_SECONDS", 0))
+
+# Institutions
+# Seconds each process keeps its cache of institutions for. Saving an
+# institution clears the cache of the process that saved it, so this bounds
+# how long other processes see the old institution.
+INSTITUTION_CACHE_TIMEOUT = int(os.environ.get("INSTITUTION_CACHE_TIMEOUT", 300))
 
 # Shibboleth
 SHIBBOLETH_IDENTITY_PROVIDER_LOGIN = os.environ.get(
@@ -241,6 +270,17 @@ OPENLDAP_JWT_KEY = os.environ.get("OPENLDAP_JWT_KEY")
 OPENLDAP_JWT_ISSUER = os.environ.get("OPENLDAP_JWT_ISSUER")
 OPENLDAP_JWT_AUDIENCE = os.environ.get("OPENLDAP_JWT_AUDIENCE")
 OPENLDAP_JWT_ALGORITHM = os.environ.get("OPENLDAP_JWT_ALGORITHM")
+# Seconds to wait for the OpenLDAP API to connect and respond
+OPENLDAP_TIMEOUT = float(os.environ.get("OPENLDAP_TIMEOUT", 5))
+# Retries of failed OpenLDAP API requests, with an exponential backoff
+# scaled by OPENLDAP_RETRY_BACKOFF seconds between them
+OPENLDAP_RETRIES = int(os.environ.get("OPENLDAP_RETRIES", 3))
+OPENLDAP_RETRY_BACKOFF = float(os.environ.get("OPENLDAP_RETRY_BACKOFF", 0.5))
+# Connections to the OpenLDAP API kept alive per process
+OPENLDAP_POOL_SIZE = int(os.environ.get("OPENLDAP_POOL_SIZE", 10))
+# OpenLDAP API requests in flight at once when an admin action propagates
+# a batch of changes
+OPENLDAP_BATCH_WORKERS = int(os.environ.get("OPENLDAP_BATCH_WORKERS", 4))
 
 # Logging
 LOGS_DIR = os.path.join(BASE_DIR, "logs")
@@ -397,3 +437,15 @@ SELENIUM_WEBDRIVER_PROFILE = webdriver.FirefoxProfile
 DISPLAY_DATA_ANALYTICS = ast.literal_eval(
     os.environ.get("DISPLAY_DATA_ANALYTICS", "True")
 )
+# Seconds to cache the data analytics responses for. The stats imports
+# invalidate the cache, so this only bounds how long stale entries are kept.
+# The responses are only cached when CACHE_URL is set, as the web processes
+# don't see an import invalidating a per-process cache.
+DATA_ANALYTICS_CACHE_TIMEOUT = int(
+    os.environ.get("DATA_ANALYTICS_CACHE_TIMEOUT", 60 * 60 * 24)
+)
+# Projects with at least this many compute daily records in the requested
+# date range have their PDF report generated by an RQ worker.
+DATA_ANALYTICS_PDF_ASYNC_RECORDS = int(
+    os.environ.get("DATA_ANALYTICS_PDF_ASYNC_RECORDS", 10000)
+)
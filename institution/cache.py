@@ -0,0 +1,84 @@
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+
+# (loaded time, institutions by identity provider, institutions by base domain)
+_institutions = None
+
+
+def clear_institution_cache():
+    """
+    Discard the cached institutions, so they are loaded again on next use.
+    """
+    global _institutions
+    _institutions = None
+
+
+def _index(institutions, field):
+    """
+    Index the institutions by a field, leaving out blank values and values
+    shared by several institutions, which don't identify one.
+    """
+    index = {}
+    for institution in institutions:
+        value = getattr(institution, field)
+        if value:
+            index[value] = None if value in index else institution
+    return {value: institution for value, institution in index.items() if institution}
+
+
+def _load():
+    institutions = list(apps.get_model('institution', 'Institution').objects.all())
+    by_base_domain = _index(institutions, 'base_domain')
+    return (
+        time.monotonic(),
+        _index(institutions, 'identity_provider'),
+        {domain.lower(): institution for domain, institution in by_base_domain.items()},
+    )
+
+
+def _get_institutions():
+    global _institutions
+    if connection.in_atomic_block:
+        # Institutions read in a transaction may yet be rolled back, so are
+        # not kept.
+        return _load()
+    institutions = _institutions
+    if institutions is None or time.monotonic() - institutions[0] > settings.INSTITUTION_CACHE_TIMEOUT:
+        institutions = _institutions = _load()
+    return institutions
+
+
+def get_institution_by_identity_provider(identity_provider):
+    """
+    Return the institution of a Shibboleth identity provider, from the
+    process's cache of institutions. The instance is shared, so must not be
+    modified.
+
+    Args:
+        identity_provider (str): Identity provider - required
+    """
+    try:
+        return _get_institutions()[1][identity_provider]
+    except KeyError:
+        raise apps.get_model('institution', 'Institution').DoesNotExist(
+            'No institution has the identity provider {identity_provider}.'.format(identity_provider=identity_provider)
+        )
+
+
+def get_institution_by_base_domain(domain):
+    """
+    Return the institution of an email domain, from the process's cache of
+    institutions. The instance is shared, so must not be modified.
+
+    Args:
+        domain (str): Email address domain - required
+    """
+    try:
+        return _get_institutions()[2][domain.lower()]
+    except KeyError:
+        raise apps.get_model('institution', 'Institution').DoesNotExist(
+            'No institution has the base domain {domain}.'.format(domain=domain)
+        )
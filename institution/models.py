@@ -2,6 +2,7 @@ from django.conf import settings
 from django.db import models
 from django.utils.translation import gettext as _
 
+from institution.cache import (get_institution_by_base_domain, get_institution_by_identity_provider)
 from institution.exceptions import (InvalidInstitutionalEmailAddress, InvalidInstitutionalIndentityProvider)
 
 
@@ -35,7 +36,7 @@ class Institution(models.Model):
         """
         try:
             _, domain = email.split('@')
-            support_email = Institution.objects.get(base_domain=domain).support_email
+            support_email = get_institution_by_base_domain(domain).support_email
             return support_email if support_email else settings.DEFAULT_SUPPORT_EMAIL
         except Exception:
             return settings.DEFAULT_SUPPORT_EMAIL
@@ -50,7 +51,7 @@ class Institution(models.Model):
         """
         try:
             _, domain = email.split('@')
-            Institution.objects.get(base_domain=domain)
+            get_institution_by_base_domain(domain)
         except Exception:
             raise InvalidInstitutionalEmailAddress('Email address domain is not supported.')
         else:
@@ -65,7 +66,7 @@ class Institution(models.Model):
             identity_provider (str): An identity provider to validate.
         """
         try:
-            Institution.objects.get(identity_provider=identity_provider)
+            get_institution_by_identity_provider(identity_provider)
         except Exception:
             raise InvalidInstitutionalIndentityProvider('Identity provider is not supported.')
         else:
@@ -0,0 +1,16 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+
+from institution.cache import clear_institution_cache
+from institution.models import Institution
+
+
+def institution_changed(sender, **kwargs):
+    clear_institution_cache()
+    # Other threads may cache the old institutions before the change commits.
+    transaction.on_commit(clear_institution_cache)
+
+
+post_save.connect(institution_changed, sender=Institution)
+post_delete.connect(institution_changed, sender=Institution)
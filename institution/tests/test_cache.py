@@ -0,0 +1,65 @@
+import mock
+
+from django.test import TestCase
+from django.test import override_settings
+
+from institution.cache import clear_institution_cache
+from institution.cache import get_institution_by_base_domain
+from institution.cache import get_institution_by_identity_provider
+from institution.models import Institution
+
+
+@override_settings(INSTITUTION_CACHE_TIMEOUT=300)
+class InstitutionCacheTests(TestCase):
+
+    def setUp(self):
+        # The test runs in a transaction, in which the cache isn't kept.
+        patcher = mock.patch('institution.cache.connection', in_atomic_block=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        clear_institution_cache()
+        self.addCleanup(clear_institution_cache)
+
+    def test_lookups_are_cached(self):
+        """
+        Ensure the institutions are queried once for every lookup by identity
+        provider and by domain.
+        """
+        with self.assertNumQueries(1):
+            self.assertTrue(Institution.is_valid_identity_provider('https://idp.bangor.ac.uk/shibboleth'))
+            institution = get_institution_by_identity_provider('https://idp.bangor.ac.uk/shibboleth')
+            self.assertEqual(institution.base_domain, 'bangor.ac.uk')
+            self.assertTrue(Institution.is_valid_email_address('user@Cardiff.ac.uk'))
+            Institution.parse_support_email_from_user_email('user@swan.ac.uk')
+            with self.assertRaises(Institution.DoesNotExist):
+                get_institution_by_base_domain('invalid.ac.uk')
+
+    def test_cache_is_cleared_on_save(self):
+        """
+        Ensure saving or deleting an institution clears the cache.
+        """
+        with self.assertRaises(Institution.DoesNotExist):
+            get_institution_by_base_domain('example.ac.uk')
+        institution = Institution.objects.create(
+            name='Example University',
+            base_domain='example.ac.uk',
+            support_email='support@example.ac.uk',
+        )
+        self.assertEqual(get_institution_by_base_domain('example.ac.uk'), institution)
+        self.assertEqual(Institution.parse_support_email_from_user_email('user@example.ac.uk'), 'support@example.ac.uk')
+
+        institution.delete()
+        with self.assertRaises(Institution.DoesNotExist):
+            get_institution_by_base_domain('example.ac.uk')
+
+    def test_ambiguous_values_are_not_cached(self):
+        """
+        Ensure blank values, and values shared by several institutions, don't
+        identify an institution.
+        """
+        Institution.objects.create(name='Example University', base_domain='example.ac.uk')
+        Institution.objects.create(name='Example College', base_domain='example.ac.uk')
+        with self.assertRaises(Institution.DoesNotExist):
+            get_institution_by_base_domain('example.ac.uk')
+        with self.assertRaises(Institution.DoesNotExist):
+            get_institution_by_identity_provider('')
@@ -0,0 +1,65 @@
+import django_rq
+from django.contrib import messages
+
+
+class OpenLDAPBatchAdminMixin:
+    """
+    Queue the OpenLDAP propagation of an admin action as one batch job, and
+    report the job's results on the change list once it has finished.
+    """
+
+    def _openldap_batch_session_key(self):
+        return 'openldap_batch_jobs_{model}'.format(model=self.model._meta.label_lower)
+
+    def queue_openldap_batch(self, request, batch_job, ids):
+        """
+        Queue a batch job propagating the given instances to OpenLDAP.
+
+        Args:
+            request (django.http.request.HttpRequest): Django HTTP request - required
+            batch_job (function): Batch job taking the instance ids - required
+            ids (list): Ids of the instances to propagate - required
+        """
+        queued_job = batch_job.delay(ids)
+        key = self._openldap_batch_session_key()
+        request.session[key] = request.session.get(key, []) + [queued_job.id]
+
+    def message_openldap_batch_results(self, request):
+        """
+        Report the results of the batch jobs that have finished since the
+        change list was last viewed.
+        """
+        key = self._openldap_batch_session_key()
+        job_ids = request.session.get(key)
+        if not job_ids:
+            return
+        queue = django_rq.get_queue()
+        pending = []
+        for job_id in job_ids:
+            queued_job = queue.fetch_job(job_id)
+            if queued_job is None:
+                # The job's result has expired.
+                continue
+            if queued_job.is_finished:
+                summary = queued_job.result
+                if summary['succeeded']:
+                    self.message_user(
+                        request,
+                        'LDAP updates succeeded for: {names}.'.format(names=', '.join(summary['succeeded'])),
+                        messages.SUCCESS,
+                    )
+                for name, error in summary['failed'].items():
+                    self.message_user(
+                        request,
+                        'LDAP update failed for {name}: {error}'.format(name=name, error=error),
+                        messages.ERROR,
+                    )
+            elif queued_job.is_failed:
+                self.message_user(request, 'An LDAP batch update failed.', messages.ERROR)
+            else:
+                pending.append(job_id)
+        request.session[key] = pending
+
+    def changelist_view(self, request, extra_context=None):
+        self.message_openldap_batch_results(request)
+        return super().changelist_view(request, extra_context)
@@ -1,12 +1,11 @@
-import jsonschema
-import requests
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from django_rq import job
-from openldap.schemas.project.activate_project import activate_project_json
-from openldap.schemas.project.create_project import create_project_json
-from openldap.schemas.project.get_project import get_project_json
-from openldap.schemas.project.list_projects import list_projects_json
+from openldap import client
+from openldap.schemas.project.activate_project import activate_project_validator
+from openldap.schemas.project.create_project import create_project_validator
+from openldap.schemas.project.get_project import get_project_validator
+from openldap.schemas.project.list_projects import list_projects_validator
 from openldap.util import (decode_response, raise_for_data_error, verify_payload_data)
 from users.notifications import email_user
 
@@ -19,14 +18,13 @@ def list_projects():
     url = ''.join([settings.OPENLDAP_HOST, 'project/'])
     headers = {'Cache-Control': 'no-cache'}
     try:
-        response = requests.get(
+        response = client.get(
             url,
             headers=headers,
-            timeout=5,
         )
         response.raise_for_status()
         response = decode_response(response)
-        jsonschema.validate(response, list_projects_json)
+        list_projects_validator.validate(response)
         raise_for_data_error(response.get('data'))
         return response
     except Exception as e:
@@ -44,14 +42,13 @@ def get_project(project_code):
     url = ''.join([settings.OPENLDAP_HOST, 'project/', project_code, '/'])
     headers = {'Cache-Control': 'no-cache'}
     try:
-        response = requests.get(
+        response = client.get(
             url,
             headers=headers,
-            timeout=5,
         )
         response.raise_for_status()
         response = decode_response(response)
-        jsonschema.validate(response, get_project_json)
+        get_project_validator.validate(response)
         raise_for_data_error(response.get('data'))
         return response
     except Exception as e:
@@ -59,13 +56,14 @@ def get_project(project_code):
 
 
 @job
-def create_project(project, notify_user=True):
+def create_project(project, notify_user=True, reset_on_failure=True):
     """
     Create an OpenLDAP project.
 
     Args:
         project (Project): Project instance - required
         notify_user (bool): Issue a notification email to the project technical lead? - optional
+        reset_on_failure (bool): Reset the project's status if the request fails? - optional
     """
     url = ''.join([settings.OPENLDAP_HOST, 'project/'])
     headers = {
@@ -89,15 +87,14 @@ def create_project(project, notify_user=True):
         'technical_lead': project.tech_lead.profile.scw_username,
     }
     try:
-        response = requests.post(
+        response = client.post(
             url,
             headers=headers,
             data=payload,
-            timeout=5,
         )
         response.raise_for_status()
         response = decode_response(response)
-        jsonschema.validate(response, create_project_json)
+        create_project_validator.validate(response)
         data = response.get('data')
         raise_for_data_error(data)
         mapping = {
@@ -128,26 +125,27 @@ def create_project(project, notify_user=True):
             email_user(subject, context, text_template_path, html_template_path)
         return response
     except Exception as e:
-        if 'Existing Project' not in str(e):
+        if reset_on_failure and 'Existing Project' not in str(e):
             project.reset_status()
         raise e
 
 
 @job
-def deactivate_project(project, notify_user=True):
+def deactivate_project(project, notify_user=True, reset_on_failure=True):
     """
     Deactivate an OpenLDAP project.
 
     Args:
         code (str): Project code - required
+        notify_user (bool): Issue a notification email to the project technical lead? - optional
+        reset_on_failure (bool): Reset the project's status if the request fails? - optional
     """
     url = ''.join([settings.OPENLDAP_HOST, 'project/', project.code, '/'])
     headers = {'Cache-Control': 'no-cache'}
     try:
-        response = requests.delete(
+        response = client.delete(
             url,
             headers=headers,
-            timeout=5,
         )
         response.raise_for_status()
 
@@ -169,29 +167,31 @@ def deactivate_project(project, notify_user=True):
             email_user(subject, context, text_template_path, html_template_path)
         return response
     except Exception as e:
-        project.reset_status()
+        if reset_on_failure:
+            project.reset_status()
         raise e
 
 
 @job
-def activate_project(project, notify_user=True):
+def activate_project(project, notify_user=True, reset_on_failure=True):
     """
     Activate an OpenLDAP project.
 
     Args:
         code (str): Project code - required
+        notify_user (bool): Issue a notification email to the project technical lead? - optional
+        reset_on_failure (bool): Reset the project's status if the request fails? - optional
     """
     url = ''.join([settings.OPENLDAP_HOST, 'project/enable/', project.code, '/'])
     headers = {'Cache-Control': 'no-cache'}
     try:
-        response = requests.put(
+        response = client.put(
             url,
             headers=headers,
-            timeout=5,
         )
         response.raise_for_status()
         response = decode_response(response)
-        jsonschema.validate(response, activate_project_json)
+        activate_project_validator.validate(response)
         raise_for_data_error(response.get('data'))
 
         if notify_user:
@@ -212,5 +212,6 @@ def activate_project(project, notify_user=True):
             email_user(subject, context, text_template_path, html_template_path)
         return response
     except Exception as e:
-        project.reset_status()
+        if reset_on_failure:
+            project.reset_status()
         raise e
@@ -1,13 +1,11 @@
-import jsonschema
-import requests
-
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from django_rq import job
 
-from openldap.schemas.project_membership.create_project_membership import create_project_membership_json
-from openldap.schemas.project_membership.delete_project_membership import delete_project_membership_json
-from openldap.schemas.project_membership.list_project_memberships import list_project_memberships_json
+from openldap import client
+from openldap.schemas.project_membership.create_project_membership import create_project_membership_validator
+from openldap.schemas.project_membership.delete_project_membership import delete_project_membership_validator
+from openldap.schemas.project_membership.list_project_memberships import list_project_memberships_validator
 from openldap.util import decode_response
 from openldap.util import raise_for_data_error
 from users.notifications import email_user
@@ -19,15 +17,15 @@ def list_project_memberships(project_code):
     List all OpenLDAP project memberships for a given project.
     """
     url = ''.join([settings.OPENLDAP_HOST, 'project/member/', project_code, '/'])
+    headers = {'Cache-Control': 'no-cache'}
     try:
-        response = requests.get(
+        response = client.get(
             url,
             headers=headers,
-            timeout=5,
         )
         response.raise_for_status()
         response = decode_response(response)
-        jsonschema.validate(response, list_project_memberships_json)
+        list_project_memberships_validator.validate(response)
         raise_for_data_error(response.get('data'))
         return response
     except Exception as e:
@@ -35,13 +33,14 @@ def list_project_memberships(project_code):
 
 
 @job
-def create_project_membership(project_membership, notify_user=True):
+def create_project_membership(project_membership, notify_user=True, reset_on_failure=True):
     """
     Create an OpenLDAP project membership.
 
     Args:
         project_membership (str): Project Membership - required
         notify_user (bool): Issue a notification email to the user? - optional
+        reset_on_failure (bool): Reset the project membership's status if the request fails? - optional
     """
     url = ''.join([settings.OPENLDAP_HOST, 'project/member/', project_membership.project.code, '/'])
     headers = {
@@ -52,15 +51,14 @@ def create_project_membership(project_membership, notify_user=True):
         'email': project_membership.user.email,
     }
     try:
-        response = requests.post(
+        response = client.post(
             url,
             headers=headers,
             data=payload,
-            timeout=5,
         )
         response.raise_for_status()
         response = decode_response(response)
-        jsonschema.validate(response, create_project_membership_json)
+        create_project_membership_validator.validate(response)
         raise_for_data_error(response.get('data'))
 
         if notify_user:
@@ -76,18 +74,20 @@ def create_project_membership(project_membership, notify_user=True):
             email_user(subject, context, text_template_path, html_template_path)
         return response
     except Exception as e:
-        project_membership.reset_status()
+        if reset_on_failure:
+            project_membership.reset_status()
         raise e
 
 
 @job
-def delete_project_membership(project_membership, notify_user=True):
+def delete_project_membership(project_membership, notify_user=True, reset_on_failure=True):
     """
     Delete an OpenLDAP project membership.
 
     Args:
         project_membership (str): Project Membership - required
         notify_user (bool): Issue a notification email to the user? - optional
+        reset_on_failure (bool): Reset the project membership's status if the request fails? - optional
     """
     url = ''.join(
         [
@@ -97,14 +97,13 @@ def delete_project_membership(project_membership, notify_user=True):
     )
     headers = {'Cache-Control': 'no-cache'}
     try:
-        response = requests.delete(
+        response = client.delete(
             url,
             headers=headers,
-            timeout=5,
         )
         response.raise_for_status()
         response = decode_response(response)
-        jsonschema.validate(response, delete_project_membership_json)
+        delete_project_membership_validator.validate(response)
         raise_for_data_error(response.get('data'))
 
         if notify_user:
@@ -120,5 +119,6 @@ def delete_project_membership(project_membership, notify_user=True):
             email_user(subject, context, text_template_path, html_template_path)
         return response
     except Exception as e:
-        project_membership.reset_status()
+        if reset_on_failure:
+            project_membership.reset_status()
         raise e
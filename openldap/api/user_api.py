@@ -1,15 +1,13 @@
-import jsonschema
-import requests
-
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from django_rq import job
 
-from openldap.schemas.user.activate_user import activate_user_json
-from openldap.schemas.user.create_user import create_user_json
-from openldap.schemas.user.get_user import get_user_json
-from openldap.schemas.user.list_users import list_users_json
-from openldap.schemas.user.reset_user_password import reset_user_password_json
+from openldap import client
+from openldap.schemas.user.activate_user import activate_user_validator
+from openldap.schemas.user.create_user import create_user_validator
+from openldap.schemas.user.get_user import get_user_validator
+from openldap.schemas.user.list_users import list_users_validator
+from openldap.schemas.user.reset_user_password import reset_user_password_validator
 from openldap.util import decode_response
 from openldap.util import raise_for_data_error
 from openldap.util import verify_payload_data
@@ -24,14 +22,13 @@ def list_users():
     url = ''.join([settings.OPENLDAP_HOST, 'user/'])
     headers = {'Cache-Control': 'no-cache'}
     try:
-        response = requests.get(
+        response = client.get(
             url,
             headers=headers,
-            timeout=5,
         )
         response.raise_for_status()
         response = decode_response(response)
-        jsonschema.validate(response, list_users_json)
+        list_users_validator.validate(response)
         raise_for_data_error(response.get('data'))
         return response
     except Exception as e:
@@ -39,13 +36,14 @@ def list_users():
 
 
 @job
-def create_user(user, notify_user=True):
+def create_user(user, notify_user=True, reset_on_failure=True):
     """
     Create an LDAP user account.
 
     Args:
         user (CustomUser): User instance - required
         notify_user (bool): Issue a notification email to the user? - optional
+        reset_on_failure (bool): Reset the user's account status if the request fails? - optional
     """
     url = ''.join([settings.OPENLDAP_HOST, 'user/'])
     headers = {
@@ -64,15 +62,14 @@ def create_user(user, notify_user=True):
     if hasattr(user.profile, 'department'):
         payload.update({'department': user.profile.department})
     try:
-        response = requests.post(
+        response = client.post(
             url,
             headers=headers,
             data=payload,
-            timeout=5,
         )
         response.raise_for_status()
         response = decode_response(response)
-        jsonschema.validate(response, create_user_json)
+        create_user_validator.validate(response)
         data = response.get('data')
         raise_for_data_error(data)
         mapping = {
@@ -98,7 +95,7 @@ def create_user(user, notify_user=True):
             email_user(subject, context, text_template_path, html_template_path)
         return response
     except Exception as e:
-        if 'Existing user' not in str(e):
+        if reset_on_failure and 'Existing user' not in str(e):
             user.profile.reset_account_status()
         raise e
 
@@ -114,14 +111,13 @@ def get_user_by_id(user_id):
     url = ''.join([settings.OPENLDAP_HOST, 'user/', user_id, '/'])
     headers = {'Cache-Control': 'no-cache'}
     try:
-        response = requests.get(
+        response = client.get(
             url,
             headers=headers,
-            timeout=5,
         )
         response.raise_for_status()
         response = decode_response(response)
-        jsonschema.validate(response, get_user_json)
+        get_user_validator.validate(response)
         raise_for_data_error(response.get('data'))
         return response
     except Exception as e:
@@ -139,14 +135,13 @@ def get_user_by_email_address(email_address):
     url = ''.join([settings.OPENLDAP_HOST, 'user/', email_address, '/'])
     headers = {'Cache-Control': 'no-cache'}
     try:
-        response = requests.get(
+        response = client.get(
             url,
             headers=headers,
-            timeout=5,
         )
         response.raise_for_status()
         response = decode_response(response)
-        jsonschema.validate(response, get_user_json)
+        get_user_validator.validate(response)
         raise_for_data_error(response.get('data'))
         return response
     except Exception as e:
@@ -170,15 +165,14 @@ def reset_user_password(user, password, notify_user=True):
     }
     payload = {'password': password}
     try:
-        response = requests.post(
+        response = client.post(
             url,
             headers=headers,
             data=payload,
-            timeout=5,
         )
         response.raise_for_status()
         response = decode_response(response)
-        jsonschema.validate(response, reset_user_password_json)
+        reset_user_password_validator.validate(response)
         raise_for_data_error(response.get('data'))
 
         if notify_user:
@@ -196,21 +190,21 @@ def reset_user_password(user, password, notify_user=True):
 
 
 @job
-def deactivate_user_account(user, notify_user=True):
+def deactivate_user_account(user, notify_user=True, reset_on_failure=True):
     """
     Deactivate an existing user's LDAP account.
 
     Args:
         user(CustomUser): User instance - required
         notify_user(bool): Issue a notification email to the user? - optional
+        reset_on_failure (bool): Reset the user's account status if the request fails? - optional
     """
     url = ''.join([settings.OPENLDAP_HOST, 'user/', user.email, '/'])
     headers = {'Cache-Control': 'no-cache'}
     try:
-        response = requests.delete(
+        response = client.delete(
             url,
             headers=headers,
-            timeout=5,
         )
         response.raise_for_status()
 
@@ -226,30 +220,31 @@ def deactivate_user_account(user, notify_user=True):
             email_user(subject, context, text_template_path, html_template_path)
         return response
     except Exception as e:
-        user.profile.reset_account_status()
+        if reset_on_failure:
+            user.profile.reset_account_status()
         raise e
 
 
 @job
-def activate_user_account(user, notify_user=True):
+def activate_user_account(user, notify_user=True, reset_on_failure=True):
     """
     Activate an existing user's LDAP account.
 
     Args:
         user(CustomUser): User instance - required
         notify_user(bool): Issue a notification email to the user? - optional
+        reset_on_failure (bool): Reset the user's account status if the request fails? - optional
     """
     url = ''.join([settings.OPENLDAP_HOST, 'user/enable/', user.email, '/'])
     headers = {'Cache-Control': 'no-cache'}
     try:
-        response = requests.put(
+        response = client.put(
             url,
             headers=headers,
-            timeout=5,
         )
         response.raise_for_status()
         response = decode_response(response)
-        jsonschema.validate(response, activate_user_json)
+        activate_user_validator.validate(response)
         raise_for_data_error(response.get('data'))
 
         if notify_user:
@@ -264,5 +259,6 @@ def activate_user_account(user, notify_user=True):
             email_user(subject, context, text_template_path, html_template_path)
         return response
     except Exception as e:
-        user.profile.reset_account_status()
+        if reset_on_failure:
+            user.profile.reset_account_status()
         raise e
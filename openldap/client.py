@@ -0,0 +1,90 @@
+import threading
+
+import requests
+
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_session = None
+# Guards creating and closing the session, which the batch propagation's
+# threads share.
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Return the session shared by the OpenLDAP API calls of this process,
+    creating it on first use.
+
+    Its connection pool keeps connections to the API alive between calls.
+    Connection errors are retried with exponential backoff, as are 5xx
+    responses and read timeouts of idempotent requests. POST requests may
+    already have been applied, so are not retried once sent.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            # Another thread may have created it while this one waited
+            if _session is None:
+                _session = _create_session()
+    return _session
+
+
+def _create_session():
+    retry = Retry(
+        total=settings.OPENLDAP_RETRIES,
+        backoff_factor=settings.OPENLDAP_RETRY_BACKOFF,
+        status_forcelist=[500, 502, 503, 504],
+        # Return the last response, for raise_for_status to raise
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=settings.OPENLDAP_POOL_SIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def close_session():
+    """
+    Close the shared session and its pooled connections.
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def request(method, url, **kwargs):
+    """
+    Send a request to the OpenLDAP API through the shared session.
+
+    Args:
+        method (str): HTTP method - required
+        url (str): Request URL - required
+        kwargs: Arguments of requests.Session.request - optional
+    """
+    kwargs.setdefault('timeout', settings.OPENLDAP_TIMEOUT)
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+
+def put(url, **kwargs):
+    return request('PUT', url, **kwargs)
+
+
+def delete(url, **kwargs):
+    return request('DELETE', url, **kwargs)
@@ -0,0 +1,97 @@
+import time
+from types import SimpleNamespace
+
+import jsonschema
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from openldap.schemas.user.get_user import get_user_json
+from openldap.schemas.user.get_user import get_user_validator
+from openldap.util import decode_response
+from security.json_web_token import JSONWebToken
+
+BENCHMARK_JWT_SETTINGS = {
+    'OPENLDAP_JWT_KEY': 'benchmark-key',
+    'OPENLDAP_JWT_ISSUER': 'https://openldap.example.com/',
+    'OPENLDAP_JWT_AUDIENCE': 'https://openldap.example.com/',
+    'OPENLDAP_JWT_ALGORITHM': 'HS256',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Report the per call overhead of decoding and validating OpenLDAP API responses, '
+        'for a bulk sync of the given number of users.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', default=3000, help='Number of user responses to process', type=int)
+
+    def responses(self, number_users):
+        """
+        Return signed get user responses for the given number of users.
+        """
+        now = int(time.time())
+        responses = []
+        for i in range(number_users):
+            uid = 'e.user{i}'.format(i=i)
+            payload = {
+                'iss': settings.OPENLDAP_JWT_ISSUER,
+                'aud': settings.OPENLDAP_JWT_AUDIENCE,
+                'iat': now,
+                'nbf': now,
+                'data': {
+                    '0': {
+                        'uid': {'0': uid, 'count': 1},
+                        'mail': {'0': '{uid}@example.ac.uk'.format(uid=uid), 'count': 1},
+                        'displayname': {'0': 'User {i}'.format(i=i), 'count': 1},
+                        'gidNumber': {'0': str(5000000 + i), 'count': 1},
+                        'uidnumber': {'0': str(5000000 + i), 'count': 1},
+                        'telephone': '00000-000-000',
+                    },
+                    'error': '',
+                    'count': 1,
+                },
+            }
+            token = JSONWebToken.encode(payload, settings.OPENLDAP_JWT_KEY)
+            responses.append(SimpleNamespace(content=token.encode()))
+        return responses
+
+    def uncached(self, response):
+        # Settings read and schema checked on every call
+        data = JSONWebToken.decode(
+            data=response.content.strip(),
+            key=settings.OPENLDAP_JWT_KEY,
+            audience=settings.OPENLDAP_JWT_AUDIENCE,
+            algorithms=[settings.OPENLDAP_JWT_ALGORITHM],
+        )
+        jsonschema.validate(data, get_user_json)
+
+    def cached(self, response):
+        get_user_validator.validate(decode_response(response))
+
+    def benchmark(self, label, method, responses):
+        start = time.perf_counter()
+        for response in responses:
+            method(response)
+        seconds = time.perf_counter() - start
+        self.stdout.write(
+            '{label}: {total:.2f} s, {per_call:.1f} us per call'.format(
+                label=label,
+                total=seconds,
+                per_call=seconds / len(responses) * 1e6,
+            )
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with override_settings(**BENCHMARK_JWT_SETTINGS):
+                responses = self.responses(options['users'])
+                self.stdout.write(
+                    self.style.SUCCESS('Decoding and validating {count} responses'.format(count=len(responses)))
+                )
+                self.benchmark('jsonschema.validate', self.uncached, responses)
+                self.benchmark('Compiled validator', self.cached, responses)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(str(e)))
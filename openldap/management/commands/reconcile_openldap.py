@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from openldap.reconcile import apply_operations
+from openldap.reconcile import plan_reconciliation
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconcile OpenLDAP with the user accounts, projects and project memberships in the database. '
+        'Only reports the operations required, unless --apply is given. '
+        'OpenLDAP only lists which accounts and projects exist, not whether they are enabled, so a listed '
+        'account or project is taken to be active: a disabled one is deactivated again on every run when '
+        'deactivated in the database, and not reactivated when approved.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--apply', action='store_true', help='Apply the operations reconciling OpenLDAP')
+
+    def handle(self, *args, **options):
+        try:
+            stages = plan_reconciliation()
+            number_operations = sum(len(operations) for operations in stages)
+            for operations in stages:
+                for operation in operations:
+                    self.stdout.write(str(operation))
+
+            if not options['apply']:
+                message = '{count} operations required to reconcile OpenLDAP.'.format(count=number_operations)
+                self.stdout.write(self.style.SUCCESS(message))
+                return
+
+            number_failed = 0
+            for operations in stages:
+                summary = apply_operations(operations)
+                for name in summary['succeeded']:
+                    self.stdout.write(self.style.SUCCESS('Applied {name}'.format(name=name)))
+                for name, error in summary['failed'].items():
+                    self.stdout.write(self.style.ERROR('Failed {name}: {error}'.format(name=name, error=error)))
+                number_failed += len(summary['failed'])
+            message = 'Applied {count} operations, {failed} failed.'.format(
+                count=number_operations - number_failed,
+                failed=number_failed,
+            )
+            self.stdout.write(self.style.SUCCESS(message))
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(str(e)))
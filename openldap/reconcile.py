@@ -0,0 +1,184 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from openldap.api import project_api
+from openldap.api import project_membership_api
+from openldap.api import user_api
+from openldap.util import propagate_batch
+from project.models import Project
+from project.models import ProjectUserMembership
+from project.openldap import openldap_project_job
+from project.openldap import openldap_project_membership_job
+from users.models import Profile
+from users.openldap import openldap_user_job
+
+DEACTIVATED_USER_STATES = [
+    Profile.REVOKED,
+    Profile.SUSPENDED,
+    Profile.CLOSED,
+]
+DEACTIVATED_PROJECT_STATES = [
+    Project.REVOKED,
+    Project.SUSPENDED,
+    Project.CLOSED,
+]
+DELETED_PROJECT_MEMBERSHIP_STATES = [
+    ProjectUserMembership.REVOKED,
+    ProjectUserMembership.SUSPENDED,
+]
+
+
+class Operation:
+    """
+    An OpenLDAP API job that brings an OpenLDAP entry in line with the database.
+    """
+
+    def __init__(self, instance, api_job, **kwargs):
+        self.instance = instance
+        self.api_job = api_job
+        self.kwargs = kwargs
+
+    def apply(self):
+        # Reconciling drift is not a change the user needs to be told about,
+        # and a failure is reported rather than resetting the database status
+        # that OpenLDAP is being reconciled with.
+        self.api_job(notify_user=False, reset_on_failure=False, **self.kwargs)
+
+    def __str__(self):
+        return '{job}: {instance}'.format(job=self.api_job.__name__, instance=self.instance)
+
+
+def listing_values(data):
+    """
+    Return the values of an OpenLDAP API listing, which are keyed by their
+    index alongside the listing's count.
+    """
+    return [value for key, value in data.items() if key.isdigit()]
+
+
+def project_members(response):
+    """
+    Return the usernames of the members listed in a project memberships
+    response.
+    """
+    members = set()
+    for entry in listing_values(response['data']):
+        members.update(listing_values(entry['member']))
+    return members
+
+
+def plan_users(usernames):
+    """
+    Plan the operations bringing the OpenLDAP user accounts in line with the
+    account status of each profile.
+
+    The OpenLDAP listing doesn't include whether an account is enabled, so a
+    listed account is taken to be active. An approved account missing from
+    the listing is created, as there is no entry to enable.
+
+    Args:
+        usernames (set): Usernames of the OpenLDAP user accounts - required
+    """
+    profiles = Profile.objects.filter(
+        account_status__in=[Profile.APPROVED] + DEACTIVATED_USER_STATES,
+    ).select_related('user')
+    operations = []
+    for profile in profiles:
+        is_listed = profile.scw_username in usernames
+        if profile.account_status == Profile.APPROVED and not is_listed:
+            operations.append(Operation(profile.user, user_api.create_user, user=profile.user))
+        elif profile.account_status != Profile.APPROVED and is_listed:
+            operations.append(Operation(profile.user, openldap_user_job(profile), user=profile.user))
+    return operations
+
+
+def plan_projects(codes):
+    """
+    Plan the operations bringing the OpenLDAP projects in line with the status
+    of each project.
+
+    The OpenLDAP listing doesn't include whether a project is enabled, so a
+    listed project is taken to be active. An approved project missing from
+    the listing is created, as there is no entry to enable.
+
+    Args:
+        codes (set): Lower case codes of the OpenLDAP projects - required
+    """
+    projects = Project.objects.filter(
+        status__in=[Project.APPROVED] + DEACTIVATED_PROJECT_STATES,
+    ).select_related('tech_lead')
+    operations = []
+    for project in projects:
+        is_listed = project.code.lower() in codes
+        if project.status == Project.APPROVED and not is_listed:
+            operations.append(Operation(project, project_api.create_project, project=project))
+        elif project.status != Project.APPROVED and is_listed:
+            operations.append(Operation(project, openldap_project_job(project), project=project))
+    return operations
+
+
+def plan_project_memberships(members):
+    """
+    Plan the operations bringing the members of the OpenLDAP projects in line
+    with the status of each project membership.
+
+    Args:
+        members (dict): Usernames of the members of each OpenLDAP project, keyed
+            by project id - required
+    """
+    project_memberships = ProjectUserMembership.objects.filter(
+        project__in=members.keys(),
+        status__in=[ProjectUserMembership.AUTHORISED] + DELETED_PROJECT_MEMBERSHIP_STATES,
+    ).exclude(
+        # Users without an OpenLDAP account can't be members yet.
+        user__profile__scw_username='',
+    ).select_related('project', 'user__profile')
+    operations = []
+    for project_membership in project_memberships:
+        is_member = project_membership.user.profile.scw_username in members[project_membership.project_id]
+        if (project_membership.status == ProjectUserMembership.AUTHORISED) != is_member:
+            operations.append(
+                Operation(
+                    project_membership,
+                    openldap_project_membership_job(project_membership),
+                    project_membership=project_membership,
+                )
+            )
+    return operations
+
+
+def plan_reconciliation():
+    """
+    Fetch the OpenLDAP listings, and plan the operations that reconcile them
+    with the database.
+
+    Returns the operations in the order they must be applied: the user account
+    and project operations, then the project membership operations. Only the
+    memberships of projects already in OpenLDAP are reconciled, so projects
+    and accounts created by this reconciliation have their memberships
+    reconciled by the next.
+    """
+    usernames = set(listing_values(user_api.list_users()['data']))
+    codes = {code.lower() for code in listing_values(project_api.list_projects()['data'])}
+
+    projects = [project for project in Project.objects.filter(status=Project.APPROVED) if project.code.lower() in codes]
+    with ThreadPoolExecutor(max_workers=settings.OPENLDAP_BATCH_WORKERS) as executor:
+        responses = executor.map(
+            lambda project: project_membership_api.list_project_memberships(project.code),
+            projects,
+        )
+        members = {project.id: project_members(response) for project, response in zip(projects, responses)}
+
+    return [
+        plan_users(usernames) + plan_projects(codes),
+        plan_project_memberships(members),
+    ]
+
+
+def apply_operations(operations):
+    """
+    Apply a stage of the reconciliation, returning a summary of the operations
+    that succeeded and the error of each that failed.
+    """
+    return propagate_batch(lambda operation: operation.apply(), operations)
@@ -0,0 +1,11 @@
+import jsonschema
+
+
+def compile_schema(schema):
+    """
+    Return a validator for a JSON schema, checking the schema once at import
+    rather than on every validation.
+    """
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
@@ -1,3 +1,5 @@
+from openldap.schemas import compile_schema
+
 activate_project_json = {
     "$schema": "http://json-schema.org/draft-06/schema#",
     "$ref": "#/definitions/ActivateProject",
@@ -46,3 +48,5 @@ activate_project_json = {
         }
     }
 }
+
+activate_project_validator = compile_schema(activate_project_json)
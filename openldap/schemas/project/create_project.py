@@ -1,3 +1,5 @@
+from openldap.schemas import compile_schema
+
 create_project_json = {
     "$schema": "http://json-schema.org/draft-06/schema#",
     "$ref": "#/definitions/CreateProject",
@@ -66,3 +68,5 @@ create_project_json = {
         }
     }
 }
+
+create_project_validator = compile_schema(create_project_json)
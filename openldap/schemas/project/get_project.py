@@ -1,3 +1,5 @@
+from openldap.schemas import compile_schema
+
 get_project_json = {
     "$schema": "http://json-schema.org/draft-06/schema#",
     "$ref": "#/definitions/GetProject",
@@ -88,3 +90,5 @@ get_project_json = {
         }
     }
 }
+
+get_project_validator = compile_schema(get_project_json)
@@ -1,3 +1,5 @@
+from openldap.schemas import compile_schema
+
 list_projects_json = {
     "$schema": "http://json-schema.org/draft-06/schema#",
     "$ref": "#/definitions/ListProjects",
@@ -56,3 +58,5 @@ list_projects_json = {
         }
     }
 }
+
+list_projects_validator = compile_schema(list_projects_json)
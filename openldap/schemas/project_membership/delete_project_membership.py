@@ -1,3 +1,5 @@
+from openldap.schemas import compile_schema
+
 delete_project_membership_json = {
     "$schema": "http://json-schema.org/draft-06/schema#",
     "$ref": "#/definitions/DeleteProjectMembership",
@@ -69,3 +71,5 @@ delete_project_membership_json = {
         }
     }
 }
+
+delete_project_membership_validator = compile_schema(delete_project_membership_json)
@@ -1,3 +1,5 @@
+from openldap.schemas import compile_schema
+
 list_project_memberships_json = {
     "$schema": "http://json-schema.org/draft-06/schema#",
     "$ref": "#/definitions/ListProjectMemberships",
@@ -75,3 +77,5 @@ list_project_memberships_json = {
         }
     }
 }
+
+list_project_memberships_validator = compile_schema(list_project_memberships_json)
@@ -1,3 +1,5 @@
+from openldap.schemas import compile_schema
+
 activate_user_json = {
     "$schema": "http://json-schema.org/draft-06/schema#",
     "$ref": "#/definitions/EnableAccount",
@@ -46,3 +48,5 @@ activate_user_json = {
         }
     }
 }
+
+activate_user_validator = compile_schema(activate_user_json)
@@ -1,3 +1,5 @@
+from openldap.schemas import compile_schema
+
 list_users_json = {
     "$schema": "http://json-schema.org/draft-06/schema#",
     "$ref": "#/definitions/ListUsers",
@@ -50,3 +52,5 @@ list_users_json = {
         }
     }
 }
+
+list_users_validator = compile_schema(list_users_json)
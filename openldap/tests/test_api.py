@@ -2,12 +2,19 @@ import jsonschema
 import mock
 import requests
 
-from django.conf import settings
 from django.test import TestCase
+from django.test import override_settings
 
 from users.models import CustomUser
 
 
+@override_settings(
+    OPENLDAP_HOST='https://example.com/',
+    OPENLDAP_JWT_KEY='K2tAb8QC7eychxEr',
+    OPENLDAP_JWT_ISSUER='https://openldap.example.com/',
+    OPENLDAP_JWT_AUDIENCE='https://openldap.example.com/',
+    OPENLDAP_JWT_ALGORITHM='HS256',
+)
 class OpenLDAPBaseAPITests(TestCase):
 
     fixtures = [
@@ -16,12 +23,6 @@ class OpenLDAPBaseAPITests(TestCase):
     ]
 
     def setUp(self):
-        settings.OPENLDAP_HOST = 'https://example.com/'
-        settings.OPENLDAP_JWT_KEY = 'K2tAb8QC7eychxEr'
-        settings.OPENLDAP_JWT_ISSUER = 'https://openldap.example.com/'
-        settings.OPENLDAP_JWT_AUDIENCE = 'https://openldap.example.com/'
-        settings.OPENLDAP_JWT_ALGORITHM = 'HS256'
-
         self.user = CustomUser.objects.get(email='shibboleth.user@example.ac.uk')
 
     def _mock_response(self, content=None, status=200, json_data=None, raise_for_status=None):
@@ -35,10 +36,10 @@ class OpenLDAPBaseAPITests(TestCase):
             mock_resp.json = mock.Mock(return_value=json_data)
         return mock_resp
 
-    @mock.patch('requests.get')
-    @mock.patch('requests.post')
-    @mock.patch('requests.put')
-    @mock.patch('requests.delete')
+    @mock.patch('openldap.client.get')
+    @mock.patch('openldap.client.post')
+    @mock.patch('openldap.client.put')
+    @mock.patch('openldap.client.delete')
     def _test_query_with_invalid_json_schema(self, query, query_kwargs, delete_mock, put_mock, post_mock, get_mock):
         """
         Ensure a ValidationError is raised if the decoded JWT does not conform to the required
@@ -54,10 +55,10 @@ class OpenLDAPBaseAPITests(TestCase):
         with self.assertRaises(jsonschema.exceptions.ValidationError):
             query(**query_kwargs) if query_kwargs else query()
 
-    @mock.patch('requests.get')
-    @mock.patch('requests.post')
-    @mock.patch('requests.put')
-    @mock.patch('requests.delete')
+    @mock.patch('openldap.client.get')
+    @mock.patch('openldap.client.post')
+    @mock.patch('openldap.client.put')
+    @mock.patch('openldap.client.delete')
     def _test_query_with_connection_error(self, query, query_kwargs, delete_mock, put_mock, post_mock, get_mock):
         """
         Ensure a ConnectionError is raised if the request fails to connect.
@@ -73,10 +74,10 @@ class OpenLDAPBaseAPITests(TestCase):
         with self.assertRaises(requests.exceptions.ConnectionError):
             query(**query_kwargs) if query_kwargs else query()
 
-    @mock.patch('requests.get')
-    @mock.patch('requests.post')
-    @mock.patch('requests.put')
-    @mock.patch('requests.delete')
+    @mock.patch('openldap.client.get')
+    @mock.patch('openldap.client.post')
+    @mock.patch('openldap.client.put')
+    @mock.patch('openldap.client.delete')
     def _test_query_with_http_error(self, query, query_kwargs, delete_mock, put_mock, post_mock, get_mock):
         """
         Ensure a HTTPError is raised if the the request returns a HTTP error status.
@@ -92,10 +93,10 @@ class OpenLDAPBaseAPITests(TestCase):
         with self.assertRaises(requests.exceptions.HTTPError):
             query(**query_kwargs) if query_kwargs else query()
 
-    @mock.patch('requests.get')
-    @mock.patch('requests.post')
-    @mock.patch('requests.put')
-    @mock.patch('requests.delete')
+    @mock.patch('openldap.client.get')
+    @mock.patch('openldap.client.post')
+    @mock.patch('openldap.client.put')
+    @mock.patch('openldap.client.delete')
     def _test_query_with_timeout_error(self, query, query_kwargs, delete_mock, put_mock, post_mock, get_mock):
         """
         Ensure a Timeout error is raised if the request times out.
@@ -0,0 +1,19 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+
+class BenchmarkOpenLDAPCommandTests(SimpleTestCase):
+
+    def test_benchmark_openldap(self):
+        """
+        Ensure the responses are decoded and validated with and without the
+        compiled validators.
+        """
+        out = StringIO()
+        call_command('benchmark_openldap', '--users=2', stdout=out)
+        output = out.getvalue()
+        self.assertIn('Decoding and validating 2 responses', output)
+        self.assertIn('jsonschema.validate: ', output)
+        self.assertIn('Compiled validator: ', output)
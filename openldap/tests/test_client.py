@@ -0,0 +1,74 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import mock
+
+from django.test import SimpleTestCase
+from django.test import override_settings
+
+from openldap import client
+
+
+@override_settings(OPENLDAP_TIMEOUT=5, OPENLDAP_RETRIES=3, OPENLDAP_RETRY_BACKOFF=0.5, OPENLDAP_POOL_SIZE=10)
+class OpenLDAPClientTests(SimpleTestCase):
+
+    def setUp(self):
+        client.close_session()
+        self.addCleanup(client.close_session)
+
+    def test_session_is_created_once_across_threads(self):
+        """
+        Ensure threads asking for the session at once share one session.
+        """
+        barrier = threading.Barrier(4)
+        create_session = client._create_session
+
+        def slow_create_session():
+            time.sleep(0.05)
+            return create_session()
+
+        def get_session():
+            barrier.wait()
+            return client.get_session()
+
+        with mock.patch('openldap.client._create_session', side_effect=slow_create_session) as create_mock:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                sessions = list(executor.map(lambda _: get_session(), range(4)))
+        self.assertEqual(create_mock.call_count, 1)
+        self.assertEqual(len(set(map(id, sessions))), 1)
+
+    def test_session_is_shared(self):
+        """
+        Ensure requests share one session, which retries failed requests and
+        pools connections.
+        """
+        session = client.get_session()
+        self.assertIs(client.get_session(), session)
+
+        adapter = session.get_adapter('https://example.com/')
+        self.assertEqual(adapter._pool_maxsize, 10)
+        self.assertEqual(adapter.max_retries.total, 3)
+        self.assertEqual(adapter.max_retries.backoff_factor, 0.5)
+        self.assertTrue(adapter.max_retries.is_retry('GET', 503))
+        self.assertFalse(adapter.max_retries.is_retry('POST', 503))
+
+        client.close_session()
+        self.assertIsNot(client.get_session(), session)
+
+    @mock.patch('requests.Session.request')
+    def test_request_timeout(self, request_mock):
+        """
+        Ensure requests time out after the configured number of seconds, unless
+        a timeout is given.
+        """
+        client.get('https://example.com/user/', headers={'Cache-Control': 'no-cache'})
+        request_mock.assert_called_once_with(
+            'GET',
+            'https://example.com/user/',
+            headers={'Cache-Control': 'no-cache'},
+            timeout=5,
+        )
+
+        client.post('https://example.com/user/', data={}, timeout=30)
+        request_mock.assert_called_with('POST', 'https://example.com/user/', data={}, timeout=30)
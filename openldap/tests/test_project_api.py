@@ -13,7 +13,7 @@ from openldap.tests.test_api import OpenLDAPBaseAPITests
 
 class OpenLDAPProjectAPITests(OpenLDAPBaseAPITests):
 
-    @mock.patch('requests.get')
+    @mock.patch('openldap.client.get')
     def test_list_projects_query(self, get_mock):
         """
         List a list of all projects.
@@ -41,7 +41,7 @@ class OpenLDAPProjectAPITests(OpenLDAPBaseAPITests):
         result = project_api.list_projects()
         self.assertEqual(result, expected_response)
 
-    @mock.patch('requests.get')
+    @mock.patch('openldap.client.get')
     def test_get_project_query(self, get_mock):
         """
         Get an existing OpenLDAP project.
@@ -79,7 +79,7 @@ class OpenLDAPProjectAPITests(OpenLDAPBaseAPITests):
         self.assertEqual(result, expected_response)
 
     @skip("Pending implementation")
-    @mock.patch('requests.post')
+    @mock.patch('openldap.client.post')
     def test_create_project_query(self, post_mock):
         """
         Create an OpenLDAP Project.
@@ -87,7 +87,7 @@ class OpenLDAPProjectAPITests(OpenLDAPBaseAPITests):
         pass
 
     @skip("Pending implementation")
-    @mock.patch('requests.put')
+    @mock.patch('openldap.client.put')
     def test_activate_project_query(self, mock_get):
         """
         Activate an existing OpenLDAP project.
@@ -95,7 +95,7 @@ class OpenLDAPProjectAPITests(OpenLDAPBaseAPITests):
         pass
 
     @skip("Pending implementation")
-    @mock.patch('requests.delete')
+    @mock.patch('openldap.client.delete')
     def test_deactivate_project_query(self, mock_get):
         """
         Deactivate an existing OpenLDAP project.
@@ -14,7 +14,7 @@ from openldap.tests.test_api import OpenLDAPBaseAPITests
 class OpenLDAPProjectMembershipAPITests(OpenLDAPBaseAPITests):
 
     @skip("Pending implementation")
-    @mock.patch('requests.post')
+    @mock.patch('openldap.client.post')
     def test_create_project_membership_query(self, mock_get):
         """
         Create a project membership.
@@ -22,7 +22,7 @@ class OpenLDAPProjectMembershipAPITests(OpenLDAPBaseAPITests):
         pass
 
     @skip("Pending implementation")
-    @mock.patch('requests.put')
+    @mock.patch('openldap.client.put')
     def test_update_project_membership_query(self, mock_get):
         """
         Update an existing project membership.
@@ -30,7 +30,7 @@ class OpenLDAPProjectMembershipAPITests(OpenLDAPBaseAPITests):
         pass
 
     @skip("Pending implementation")
-    @mock.patch('requests.delete')
+    @mock.patch('openldap.client.delete')
     def test_delete_project_membership_query(self, mock_get):
         """
         Delete a project membership.
@@ -0,0 +1,136 @@
+import datetime
+from io import StringIO
+
+import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.test import override_settings
+
+from openldap.reconcile import plan_users
+from project.models import Project
+from project.models import ProjectUserMembership
+from users.models import CustomUser
+from users.models import Profile
+
+
+@override_settings(OPENLDAP_BATCH_WORKERS=2)
+@mock.patch('openldap.api.project_membership_api.delete_project_membership', autospec=True)
+@mock.patch('openldap.api.project_membership_api.create_project_membership', autospec=True)
+@mock.patch('openldap.api.project_api.deactivate_project', autospec=True)
+@mock.patch('openldap.api.project_api.activate_project', autospec=True)
+@mock.patch('openldap.api.project_api.create_project', autospec=True)
+@mock.patch('openldap.api.user_api.deactivate_user_account', autospec=True)
+@mock.patch('openldap.api.user_api.activate_user_account', autospec=True)
+@mock.patch('openldap.api.user_api.create_user', autospec=True)
+@mock.patch('openldap.api.project_membership_api.list_project_memberships')
+@mock.patch('openldap.api.project_api.list_projects')
+@mock.patch('openldap.api.user_api.list_users')
+class ReconcileOpenLDAPTests(TestCase):
+
+    fixtures = [
+        'institution/fixtures/tests/institutions.json',
+        'users/fixtures/tests/users.json',
+        'project/fixtures/tests/funding_sources.json',
+        'project/fixtures/tests/categories.json',
+        'project/fixtures/tests/projects.json',
+        'project/fixtures/tests/memberships.json',
+    ]
+
+    def setUp(self):
+        self.revoked_user = CustomUser.objects.get(email='issa16@cardiff.ac.uk')
+        Profile.objects.filter(user=self.revoked_user).update(account_status=Profile.REVOKED)
+        self.new_user = CustomUser.objects.get(email='admin.user@example.ac.uk')
+        # Approved, with an OpenLDAP username, but missing from OpenLDAP
+        self.missing_user = CustomUser.objects.get(email='norman.gordon@example.ac.uk')
+
+        Project.objects.filter(code='scw1000').update(status=Project.REVOKED)
+        Project.objects.filter(code='scw1124').update(status=Project.APPROVED, gid_number='5000001')
+        self.project = Project.objects.get(code='scw1158')
+        self.revoked_membership = ProjectUserMembership.objects.create(
+            project=self.project,
+            user=CustomUser.objects.get(email='guest.user@external.ac.uk'),
+            status=ProjectUserMembership.REVOKED,
+            date_joined=datetime.date(2018, 6, 26),
+        )
+
+    def _mock_listings(self, list_users_mock, list_projects_mock, list_project_memberships_mock):
+        list_users_mock.return_value = {
+            'data': {'0': 'e.shibboleth.user', '1': 'x.guest.user', '2': 'c.issa16', 'error': '', 'count': 3},
+        }
+        list_projects_mock.return_value = {
+            'data': {'0': 'SCW1000', '1': 'SCW1158', 'error': '', 'count': 2},
+        }
+        list_project_memberships_mock.return_value = {
+            'data': {'0': {'member': {'0': 'x.guest.user', 'count': 1}}, 'error': '', 'count': 1},
+        }
+
+    def test_dry_run(self, list_users_mock, list_projects_mock, list_project_memberships_mock, create_user_mock,
+                     activate_user_mock, deactivate_user_mock, create_project_mock, activate_project_mock,
+                     deactivate_project_mock, create_membership_mock, delete_membership_mock):
+        """
+        Ensure a dry run reports only the operations required, without applying
+        them.
+        """
+        self._mock_listings(list_users_mock, list_projects_mock, list_project_memberships_mock)
+        out = StringIO()
+        call_command('reconcile_openldap', stdout=out)
+        output = out.getvalue()
+
+        self.assertIn('create_user: {user}'.format(user=self.new_user), output)
+        self.assertIn('create_user: {user}'.format(user=self.missing_user), output)
+        self.assertIn('deactivate_user_account: {user}'.format(user=self.revoked_user), output)
+        self.assertIn('create_project: scw1124', output)
+        self.assertIn('deactivate_project: scw1000', output)
+        self.assertIn('delete_project_membership: {membership}'.format(membership=self.revoked_membership), output)
+        self.assertIn('7 operations required to reconcile OpenLDAP.', output)
+        list_project_memberships_mock.assert_called_once_with('scw1158')
+        create_user_mock.assert_not_called()
+        delete_membership_mock.assert_not_called()
+
+    def test_apply(self, list_users_mock, list_projects_mock, list_project_memberships_mock, create_user_mock,
+                   activate_user_mock, deactivate_user_mock, create_project_mock, activate_project_mock,
+                   deactivate_project_mock, create_membership_mock, delete_membership_mock):
+        """
+        Ensure only the operations required are applied, and that failures are
+        reported.
+        """
+        self._mock_listings(list_users_mock, list_projects_mock, list_project_memberships_mock)
+        deactivate_project_mock.side_effect = ValueError('Error Detected: Unknown Project')
+        out = StringIO()
+        call_command('reconcile_openldap', '--apply', stdout=out)
+
+        create_user_mock.assert_has_calls(
+            [
+                mock.call(user=self.new_user, notify_user=False, reset_on_failure=False),
+                mock.call(user=self.missing_user, notify_user=False, reset_on_failure=False),
+            ],
+            any_order=True,
+        )
+        self.assertEqual(create_user_mock.call_count, 2)
+        activate_user_mock.assert_not_called()
+        deactivate_user_mock.assert_called_once_with(user=self.revoked_user, notify_user=False, reset_on_failure=False)
+        create_project_mock.assert_called_once_with(
+            project=Project.objects.get(code='scw1124'),
+            notify_user=False,
+            reset_on_failure=False,
+        )
+        activate_project_mock.assert_not_called()
+        create_membership_mock.assert_called_once_with(
+            project_membership=ProjectUserMembership.objects.get(project=self.project, user__email='shibboleth.user@example.ac.uk'),
+            notify_user=False,
+            reset_on_failure=False,
+        )
+        delete_membership_mock.assert_called_once_with(project_membership=self.revoked_membership, notify_user=False, reset_on_failure=False)
+        self.assertIn('Failed deactivate_project: scw1000: Error Detected: Unknown Project', out.getvalue())
+        self.assertIn('Applied 6 operations, 1 failed.', out.getvalue())
+
+    def test_missing_approved_account_is_created(self, *mocks):
+        """
+        Ensure an approved account missing from OpenLDAP is created, rather
+        than enabled, even if it has an OpenLDAP username.
+        """
+        operations = plan_users({'e.shibboleth.user', 'x.guest.user', 'c.issa16'})
+        operation = next(operation for operation in operations if operation.instance == self.missing_user)
+        self.assertEqual(str(operation), 'create_user: {user}'.format(user=self.missing_user))
+        self.assertEqual(operation.kwargs, {'user': self.missing_user})
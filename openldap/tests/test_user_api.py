@@ -14,7 +14,7 @@ from users.tests.test_models import CustomUserTests
 
 class OpenLDAPUserAPITests(OpenLDAPBaseAPITests):
 
-    @mock.patch('requests.get')
+    @mock.patch('openldap.client.get')
     def test_list_users_query(self, get_mock):
         """
         Retrieve a list of all users.
@@ -41,7 +41,7 @@ class OpenLDAPUserAPITests(OpenLDAPBaseAPITests):
         result = user_api.list_users()
         self.assertEqual(result, expected_response)
 
-    @mock.patch('requests.post')
+    @mock.patch('openldap.client.post')
     def test_create_user_query(self, post_mock):
         """
         Create a User.
@@ -91,7 +91,7 @@ class OpenLDAPUserAPITests(OpenLDAPBaseAPITests):
         self.assertEqual("5000001", self.user.profile.uid_number)
         self.assertEqual("e.joe.bloggs", self.user.profile.scw_username)
 
-    @mock.patch('requests.get')
+    @mock.patch('openldap.client.get')
     def test_get_user_by_id_query(self, get_mock):
         """
         Get an existing user by id.
@@ -144,7 +144,7 @@ class OpenLDAPUserAPITests(OpenLDAPBaseAPITests):
         result = user_api.get_user_by_id(user_id='e.joe.bloggs')
         self.assertEqual(result, expected_response)
 
-    @mock.patch('requests.get')
+    @mock.patch('openldap.client.get')
     def test_get_user_by_email_address_query(self, get_mock):
         """
         Get an existing user by email address.
@@ -198,7 +198,7 @@ class OpenLDAPUserAPITests(OpenLDAPBaseAPITests):
         self.assertEqual(result, expected_response)
 
     @skip("Pending OpenLDAP fix")
-    @mock.patch('requests.delete')
+    @mock.patch('openldap.client.delete')
     def test_deactivate_user_account_query(self, delete_mock):
         """
         Deactivate an existing user's OpenDLAP account
@@ -224,7 +224,7 @@ class OpenLDAPUserAPITests(OpenLDAPBaseAPITests):
         result = user_api.deactivate_user_account(user=self.user)
         self.assertEqual(result, expected_response)
 
-    @mock.patch('requests.post')
+    @mock.patch('openldap.client.post')
     def test_reset_user_password_query(self, post_mock):
         """
         Reset a user's password.
@@ -249,7 +249,7 @@ class OpenLDAPUserAPITests(OpenLDAPBaseAPITests):
         result = user_api.reset_user_password(user=self.user, password=12345678)
         self.assertEqual(result, expected_response)
 
-    @mock.patch('requests.put')
+    @mock.patch('openldap.client.put')
     def test_activate_user_account_query(self, put_mock):
         """
         Activate an existing user's OpenLDAP account.
@@ -276,6 +276,25 @@ class OpenLDAPUserAPITests(OpenLDAPBaseAPITests):
         result = user_api.activate_user_account(user=self.user)
         self.assertEqual(result, expected_response)
 
+    @mock.patch('users.models.Profile.reset_account_status')
+    @mock.patch('openldap.client.put')
+    def test_activate_user_account_reset_on_failure(self, put_mock, reset_account_status_mock):
+        """
+        Ensure the account status is reset when the request fails, unless the
+        caller opts out.
+        """
+        put_mock.return_value = self._mock_response(
+            status=504,
+            raise_for_status=requests.exceptions.ConnectionError('ConnectionError.'),
+        )
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            user_api.activate_user_account(user=self.user, reset_on_failure=False)
+        reset_account_status_mock.assert_not_called()
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            user_api.activate_user_account(user=self.user)
+        reset_account_status_mock.assert_called_once_with()
+
     def test_query_exceptions(self):
         """
         Ensure each query raises the correct error/exception.
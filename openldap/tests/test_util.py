@@ -0,0 +1,43 @@
+from django.test import SimpleTestCase
+from django.test import override_settings
+
+from openldap.util import jwt_decode_options
+from openldap.util import propagate_batch
+
+
+@override_settings(OPENLDAP_BATCH_WORKERS=2)
+class PropagateBatchTests(SimpleTestCase):
+
+    def test_propagate_batch(self):
+        """
+        Ensure every instance of a batch is propagated, and that failures are
+        summarised without stopping the rest of the batch.
+        """
+        propagated = []
+
+        def propagate(instance):
+            if instance == 'scw0001':
+                raise ValueError('Error Detected: Existing Project')
+            propagated.append(instance)
+
+        summary = propagate_batch(propagate, ['scw0000', 'scw0001', 'scw0002'])
+        self.assertEqual(sorted(propagated), ['scw0000', 'scw0002'])
+        self.assertEqual(summary, {
+            'succeeded': ['scw0000', 'scw0002'],
+            'failed': {'scw0001': 'Error Detected: Existing Project'},
+        })
+
+
+class JWTDecodeOptionsTests(SimpleTestCase):
+
+    def test_jwt_decode_options(self):
+        """
+        Ensure the JWT decode options are read from the settings once, and read
+        again when the settings change.
+        """
+        with override_settings(OPENLDAP_JWT_KEY='key', OPENLDAP_JWT_AUDIENCE='aud', OPENLDAP_JWT_ALGORITHM='HS256'):
+            options = jwt_decode_options()
+            self.assertEqual(options, {'key': 'key', 'audience': 'aud', 'algorithms': ['HS256']})
+            self.assertIs(jwt_decode_options(), options)
+            with override_settings(OPENLDAP_JWT_KEY='new-key'):
+                self.assertEqual(jwt_decode_options()['key'], 'new-key')
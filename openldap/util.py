@@ -1,15 +1,38 @@
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connection
+from django.dispatch import receiver
 
 from security.json_web_token import JSONWebToken
+from users.notifications import email_batch
+
+
+@functools.lru_cache(maxsize=None)
+def jwt_decode_options():
+    """
+    Return the key, audience and algorithms used to decode the OpenLDAP API's
+    responses, which are read from the settings once.
+    """
+    return {
+        'key': settings.OPENLDAP_JWT_KEY,
+        'audience': settings.OPENLDAP_JWT_AUDIENCE,
+        'algorithms': [settings.OPENLDAP_JWT_ALGORITHM],
+    }
+
+
+@receiver(setting_changed)
+def clear_jwt_decode_options(setting, **kwargs):
+    if setting.startswith('OPENLDAP_JWT_'):
+        jwt_decode_options.cache_clear()
 
 
 def decode_response(response):
-    return JSONWebToken.decode(
-        data=response.content.strip(),
-        key=settings.OPENLDAP_JWT_KEY,
-        audience=settings.OPENLDAP_JWT_AUDIENCE,
-        algorithms=[settings.OPENLDAP_JWT_ALGORITHM],
-    )
+    return JSONWebToken.decode(data=response.content.strip(), **jwt_decode_options())
+
 
 def verify_payload_data(payload, data, mapping):
     """
@@ -30,3 +53,38 @@ def raise_for_data_error(data):
     """
     if data.get('error', None):
         raise ValueError('Error Detected: {error}'.format(error=data['error']))
+
+
+def propagate_batch(propagate, instances):
+    """
+    Propagate a batch of instances to OpenLDAP, waiting on up to
+    OPENLDAP_BATCH_WORKERS API requests at once.
+
+    Args:
+        propagate (callable): Propagates an instance, raising on failure - required
+        instances (iterable): Instances to propagate - required
+
+    Returns a summary of the instances that were propagated, and the error
+    of each that failed.
+    """
+    def run(instance):
+        try:
+            propagate(instance)
+        finally:
+            # Each worker thread opens its own database connection.
+            connection.close()
+
+    summary = {'succeeded': [], 'failed': {}}
+    # The batch's notification emails are sent through one connection.
+    with email_batch(), ThreadPoolExecutor(max_workers=settings.OPENLDAP_BATCH_WORKERS) as executor:
+        futures = [
+            (str(instance), executor.submit(contextvars.copy_context().run, run, instance))
+            for instance in instances
+        ]
+        for name, future in futures:
+            error = future.exception()
+            if error is None:
+                summary['succeeded'].append(name)
+            else:
+                summary['failed'][name] = str(error)
+    return summary
@@ -1,10 +1,12 @@
 from django.contrib import admin
+from django.utils import timezone
 
 from project.forms import ProjectAdminForm, ProjectUserMembershipAdminForm
 from project.models import (
     Project, ProjectCategory, ProjectFundingSource, ProjectSystemAllocation, ProjectUserMembership
 )
-from project.openldap import (update_openldap_project, update_openldap_project_membership)
+from openldap.admin import OpenLDAPBatchAdminMixin
+from project.openldap import (update_openldap_project_memberships, update_openldap_projects)
 
 
 @admin.register(ProjectCategory)
@@ -29,7 +31,7 @@ class ProjectSystemAllocationAdmin(admin.ModelAdmin):
 
 
 @admin.register(ProjectUserMembership)
-class ProjectUserMembershipAdmin(admin.ModelAdmin):
+class ProjectUserMembershipAdmin(OpenLDAPBatchAdminMixin, admin.ModelAdmin):
 
     def _project_membership_action_message(self, rows_updated):
         if rows_updated == 1:
@@ -39,24 +41,24 @@ class ProjectUserMembershipAdmin(admin.ModelAdmin):
         return message
 
     def activate_project_memberships(self, request, queryset):
-        rows_updated = 0
-        for membership in queryset:
-            membership.status = ProjectUserMembership.AUTHORISED
-            membership.save()
-            update_openldap_project_membership(membership)
-            rows_updated += 1
+        ids = list(queryset.values_list('pk', flat=True))
+        rows_updated = ProjectUserMembership.objects.filter(pk__in=ids).update(
+            status=ProjectUserMembership.AUTHORISED,
+            modified_time=timezone.now(),
+        )
+        self.queue_openldap_batch(request, update_openldap_project_memberships, ids)
         message = self._project_membership_action_message(rows_updated)
         self.message_user(request, '{message} successfully submitted for activation.'.format(message=message))
 
     activate_project_memberships.short_description = 'Activate selected project memberships in LDAP'
 
     def deactivate_project_memberships(self, request, queryset):
-        rows_updated = 0
-        for membership in queryset:
-            membership.status = ProjectUserMembership.REVOKED
-            membership.save()
-            update_openldap_project_membership(membership)
-            rows_updated += 1
+        ids = list(queryset.values_list('pk', flat=True))
+        rows_updated = ProjectUserMembership.objects.filter(pk__in=ids).update(
+            status=ProjectUserMembership.REVOKED,
+            modified_time=timezone.now(),
+        )
+        self.queue_openldap_batch(request, update_openldap_project_memberships, ids)
         message = self._project_membership_action_message(rows_updated)
         self.message_user(request, '{message} successfully submitted for deactivation.'.format(message=message))
 
@@ -84,7 +86,7 @@ class ProjectUserMembershipAdmin(admin.ModelAdmin):
 
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(OpenLDAPBatchAdminMixin, admin.ModelAdmin):
 
     def _project_action_message(self, rows_updated):
         if rows_updated == 1:
@@ -94,24 +96,24 @@ class ProjectAdmin(admin.ModelAdmin):
         return message
 
     def activate_projects(self, request, queryset):
-        rows_updated = 0
-        for project in queryset:
-            project.status = Project.APPROVED
-            project.save()
-            update_openldap_project(project)
-            rows_updated += 1
+        ids = list(queryset.values_list('pk', flat=True))
+        rows_updated = Project.objects.filter(pk__in=ids).update(
+            status=Project.APPROVED,
+            modified_time=timezone.now(),
+        )
+        self.queue_openldap_batch(request, update_openldap_projects, ids)
         message = self._project_action_message(rows_updated)
         self.message_user(request, '{message} successfully submitted for activation.'.format(message=message))
 
     activate_projects.short_description = 'Activate selected projects in LDAP'
 
     def deactivate_projects(self, request, queryset):
-        rows_updated = 0
-        for project in queryset:
-            project.status = Project.REVOKED
-            project.save()
-            update_openldap_project(project)
-            rows_updated += 1
+        ids = list(queryset.values_list('pk', flat=True))
+        rows_updated = Project.objects.filter(pk__in=ids).update(
+            status=Project.REVOKED,
+            modified_time=timezone.now(),
+        )
+        self.queue_openldap_batch(request, update_openldap_projects, ids)
         message = self._project_action_message(rows_updated)
         self.message_user(request, '{message} successfully submitted for deactivation.'.format(message=message))
 
@@ -127,6 +129,7 @@ class ProjectAdmin(admin.ModelAdmin):
         'start_date',
         'tech_lead',
         'status',
+        'get_last_job_date',
     )
     list_filter = ('status',)
     search_fields = (
@@ -144,3 +147,13 @@ class ProjectAdmin(admin.ModelAdmin):
     autocomplete_fields = [
         'tech_lead',
     ]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_last_job_date()
+
+    @classmethod
+    def get_last_job_date(cls, instance):
+        return instance.last_job_date
+
+    get_last_job_date.short_description = 'Last Job Date'
+    get_last_job_date.admin_order_field = 'last_job_date'
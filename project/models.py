@@ -2,9 +2,11 @@ import datetime
 import logging
 import re
 
+from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.contrib.auth.models import Group
 from django.db import models
+from django.db.models import Case, Max, Value, When
 from django.utils.translation import gettext_lazy as _
 from system.models import System
 
@@ -50,7 +52,58 @@ class ProjectFundingSource(models.Model):
         return self.name
 
 
-class ProjectManager(models.Manager):
+class ProjectQuerySet(models.QuerySet):
+
+    ACTIVE = 'Active'
+    DORMANT = 'Dormant'
+    INACTIVE = 'Inactive'
+    RETIRED = 'Retired'
+
+    def with_last_job_date(self):
+        '''
+        Annotate each project with the date of its latest compute stats, or
+        None if it has never run a job.
+        '''
+        return self.annotate(last_job_date=Max('computedaily__date'))
+
+    def with_activity_status(self, n_months=6):
+        '''
+        Annotate each project with its activity status.
+
+        Dormant projects have never run a job. Active projects have run a job
+        within the last n_months, inactive projects have not.
+        '''
+        date_start = datetime.date.today() + relativedelta(months=-n_months)
+        return self.with_last_job_date().annotate(
+            activity_status=Case(
+                When(last_job_date__isnull=True, then=Value(self.DORMANT)),
+                When(last_job_date__gte=date_start, then=Value(self.ACTIVE)),
+                default=Value(self.INACTIVE),
+                output_field=models.CharField(),
+            )
+        )
+
+    def activity_counts(self, n_months=6):
+        '''
+        Return the number of active, dormant, inactive and retired projects,
+        from a single query.
+
+        Closed projects are counted as retired as well as by their activity.
+        '''
+        data = {
+            self.ACTIVE: 0,
+            self.DORMANT: 0,
+            self.INACTIVE: 0,
+            self.RETIRED: 0,
+        }
+        for activity_status, status in self.with_activity_status(n_months).values_list('activity_status', 'status'):
+            data[activity_status] += 1
+            if status == Project.CLOSED and activity_status != self.DORMANT:
+                data[self.RETIRED] += 1
+        return data
+
+
+class ProjectManager(models.Manager.from_queryset(ProjectQuerySet)):
 
     def awaiting_approval(self, user):
         return Project.objects.filter(
@@ -300,6 +353,17 @@ class Project(models.Model):
         self.status = self.previous_status
         self.save()
 
+    def user_last_job_dates(self):
+        """
+        Return a map of user id to the date of the user's latest compute stats
+        for the project, from a single query.
+        """
+        return dict(
+            self.computedaily_set.order_by().values('user_id').annotate(
+                last_job_date=Max('date'),
+            ).values_list('user_id', 'last_job_date')
+        )
+
     def _assign_project_owner_project_membership(self):
         try:
             project_membership, created = ProjectUserMembership.objects.get_or_create(
@@ -3,7 +3,7 @@ from django.utils.translation import gettext_lazy as _
 from django_rq import job
 
 from institution.models import Institution
-from users.notifications import email_user
+from users.notifications import coalesce_email
 
 
 @job
@@ -22,7 +22,7 @@ def project_created_notification(project):
     }
     text_template_path = 'notifications/project/created.txt'
     html_template_path = 'notifications/project/created.html'
-    email_user(subject, context, text_template_path, html_template_path)
+    coalesce_email(subject, context, text_template_path, html_template_path)
 
 
 @job
@@ -41,4 +41,4 @@ def project_membership_created(membership):
     }
     text_template_path = 'notifications/project_membership/created.txt'
     html_template_path = 'notifications/project_membership/created.html'
-    email_user(subject, context, text_template_path, html_template_path)
+    coalesce_email(subject, context, text_template_path, html_template_path)
@@ -1,12 +1,14 @@
+from django_rq import job
 from openldap.api import project_api
 from openldap.api import project_membership_api
+from openldap.util import propagate_batch
 from project.models import Project
 from project.models import ProjectUserMembership
 
 
-def update_openldap_project(project):
+def openldap_project_job(project):
     """
-    Ensure project status updates are propagated to OpenLDAP.
+    Return the OpenLDAP API job that propagates the project's status, if any.
     """
     deactivate_project_states = [
         Project.REVOKED,
@@ -15,22 +17,84 @@ def update_openldap_project(project):
     ]
     if project.status == Project.APPROVED:
         if project.gid_number:
-            project_api.activate_project.delay(project=project)
-        else:
-            project_api.create_project.delay(project=project)
+            return project_api.activate_project
+        return project_api.create_project
     elif project.status in deactivate_project_states:
-        project_api.deactivate_project.delay(project=project)
+        return project_api.deactivate_project
+    return None
 
 
-def update_openldap_project_membership(project_membership):
+def update_openldap_project(project):
     """
-    Ensure project memberships are propagated to OpenLDAP.
+    Ensure project status updates are propagated to OpenLDAP.
+    """
+    api_job = openldap_project_job(project)
+    if api_job:
+        api_job.delay(project=project)
+
+
+@job
+def update_openldap_projects(project_ids):
+    """
+    Ensure the status updates of a batch of projects are propagated to OpenLDAP.
+
+    Args:
+        project_ids (list): Project ids - required
+    """
+    projects = list(Project.objects.filter(pk__in=project_ids).select_related('tech_lead'))
+    for project in projects:
+        # Project.save() assigns the owner membership, which bulk updates skip.
+        if project.status == Project.APPROVED:
+            project._assign_project_owner_project_membership()
+
+    def propagate(project):
+        api_job = openldap_project_job(project)
+        if api_job:
+            api_job(project=project)
+
+    return propagate_batch(propagate, projects)
+
+
+def openldap_project_membership_job(project_membership):
+    """
+    Return the OpenLDAP API job that propagates the project membership's
+    status, if any.
     """
     delete_project_membership_states = [
         ProjectUserMembership.REVOKED,
         ProjectUserMembership.SUSPENDED,
     ]
     if project_membership.status == ProjectUserMembership.AUTHORISED:
-        project_membership_api.create_project_membership.delay(project_membership=project_membership)
+        return project_membership_api.create_project_membership
     elif project_membership.status in delete_project_membership_states:
-        project_membership_api.delete_project_membership.delay(project_membership=project_membership)
+        return project_membership_api.delete_project_membership
+    return None
+
+
+def update_openldap_project_membership(project_membership):
+    """
+    Ensure project memberships are propagated to OpenLDAP.
+    """
+    api_job = openldap_project_membership_job(project_membership)
+    if api_job:
+        api_job.delay(project_membership=project_membership)
+
+
+@job
+def update_openldap_project_memberships(project_membership_ids):
+    """
+    Ensure a batch of project memberships are propagated to OpenLDAP.
+
+    Args:
+        project_membership_ids (list): Project membership ids - required
+    """
+    project_memberships = ProjectUserMembership.objects.filter(
+        pk__in=project_membership_ids,
+    ).select_related('project', 'user')
+
+    def propagate(project_membership):
+        api_job = openldap_project_membership_job(project_membership)
+        if api_job:
+            api_job(project_membership=project_membership)
+
+    return propagate_batch(propagate, project_memberships)
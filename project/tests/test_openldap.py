@@ -0,0 +1,96 @@
+import mock
+
+from django.test import TestCase
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from project.models import Project
+from project.models import ProjectUserMembership
+from project.openldap import update_openldap_project_memberships
+from project.openldap import update_openldap_projects
+from users.models import CustomUser
+
+
+@override_settings(OPENLDAP_BATCH_WORKERS=2)
+class ProjectOpenLDAPBatchTests(TestCase):
+
+    fixtures = [
+        'institution/fixtures/tests/institutions.json',
+        'users/fixtures/tests/users.json',
+        'project/fixtures/tests/funding_sources.json',
+        'project/fixtures/tests/categories.json',
+        'project/fixtures/tests/projects.json',
+        'project/fixtures/tests/memberships.json',
+    ]
+
+    @mock.patch('openldap.api.project_api.deactivate_project')
+    @mock.patch('openldap.api.project_api.create_project')
+    def test_update_openldap_projects(self, create_project_mock, deactivate_project_mock):
+        """
+        Ensure a batch of projects is propagated to OpenLDAP in one job, which
+        summarises the result for each project.
+        """
+        create_project_mock.side_effect = ValueError('Error Detected: Existing Project')
+        Project.objects.filter(code='scw0000').update(status=Project.APPROVED)
+        Project.objects.filter(code__in=['scw1000', 'scw1124']).update(status=Project.REVOKED)
+        ids = list(Project.objects.filter(code__in=['scw0000', 'scw1000', 'scw1124']).values_list('pk', flat=True))
+
+        summary = update_openldap_projects(ids)
+        self.assertEqual(sorted(summary['succeeded']), ['scw1000', 'scw1124'])
+        self.assertEqual(summary['failed'], {'scw0000': 'Error Detected: Existing Project'})
+        create_project_mock.assert_called_once_with(project=Project.objects.get(code='scw0000'))
+        self.assertEqual(deactivate_project_mock.call_count, 2)
+
+    @mock.patch('openldap.api.project_membership_api.delete_project_membership')
+    @mock.patch('openldap.api.project_membership_api.create_project_membership')
+    def test_update_openldap_project_memberships(self, create_membership_mock, delete_membership_mock):
+        """
+        Ensure a batch of project memberships is propagated to OpenLDAP in one
+        job.
+        """
+        ProjectUserMembership.objects.filter(pk=2).update(status=ProjectUserMembership.REVOKED)
+
+        summary = update_openldap_project_memberships([1, 2])
+        self.assertEqual(len(summary['succeeded']), 2)
+        self.assertEqual(summary['failed'], {})
+        create_membership_mock.assert_called_once_with(project_membership=ProjectUserMembership.objects.get(pk=1))
+        delete_membership_mock.assert_called_once_with(project_membership=ProjectUserMembership.objects.get(pk=2))
+
+    @mock.patch('django_rq.get_queue')
+    @mock.patch('project.openldap.update_openldap_projects.delay')
+    def test_admin_activate_projects(self, delay_mock, get_queue_mock):
+        """
+        Ensure the admin activates the selected projects in one update, queues
+        one batch job, and reports the job's results once it has finished.
+        """
+        delay_mock.return_value = mock.Mock(id='batch-job')
+        self.client.force_login(CustomUser.objects.get(is_staff=True))
+        ids = list(Project.objects.filter(code__in=['scw0000', 'scw1000']).values_list('pk', flat=True))
+        url = reverse('admin:project_project_changelist')
+        start = timezone.now()
+
+        response = self.client.post(url, {'action': 'activate_projects', '_selected_action': ids})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Project.objects.filter(pk__in=ids, status=Project.APPROVED).count(), 2)
+        self.assertEqual(Project.objects.filter(pk__in=ids, modified_time__gte=start).count(), 2)
+        delay_mock.assert_called_once()
+        self.assertEqual(sorted(delay_mock.call_args[0][0]), sorted(ids))
+
+        # The job has not finished
+        get_queue_mock.return_value.fetch_job.return_value = mock.Mock(is_finished=False, is_failed=False)
+        response = self.client.get(url)
+        self.assertNotContains(response, 'LDAP update')
+
+        get_queue_mock.return_value.fetch_job.return_value = mock.Mock(
+            is_finished=True,
+            result={'succeeded': ['scw1000'], 'failed': {'scw0000': 'Error Detected: Existing Project'}},
+        )
+        response = self.client.get(url)
+        get_queue_mock.return_value.fetch_job.assert_called_with('batch-job')
+        self.assertContains(response, 'LDAP updates succeeded for: scw1000.')
+        self.assertContains(response, 'LDAP update failed for scw0000: Error Detected: Existing Project')
+
+        # Results are only reported once
+        response = self.client.get(url)
+        self.assertNotContains(response, 'LDAP update')
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from stats.models import ComputeDaily, StorageWeekly
+from stats.models import ComputeDaily, ComputeMonthly, StorageWeekly
 
 
 @admin.register(ComputeDaily)
@@ -27,6 +27,30 @@ class ComputeDaily(admin.ModelAdmin):
     )
 
 
+@admin.register(ComputeMonthly)
+class ComputeMonthly(admin.ModelAdmin):
+    list_display = (
+        'month',
+        'user',
+        'project',
+        'partition',
+        'number_jobs',
+        'total_processors',
+        'wait_time',
+        'cpu_time',
+        'wall_time',
+        'modified_time',
+    )
+    autocomplete_fields = [
+        'user',
+        'project',
+    ]
+    search_fields = (
+        'project__code',
+        'user__profile__scw_username',
+    )
+
+
 @admin.register(StorageWeekly)
 class StorageWeekly(admin.ModelAdmin):
     list_display = (
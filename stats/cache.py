@@ -0,0 +1,65 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+VERSION_KEY = 'stats:version'
+
+
+def get_stats_version():
+    '''
+    Return the version stamp of the stats tables, creating it if the cache
+    has none.
+    '''
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # A new stamp, so entries cached under an evicted one are never reused
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_stats_version():
+    '''
+    Invalidate the cached stats responses. Called after the stats tables
+    are written.
+    '''
+    cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def stats_cache_enabled():
+    '''
+    Return whether the stats responses are cached. The import commands bump
+    the version stamp in their own process, so responses are only cached when
+    the cache is shared between processes (CACHE_URL is set). A per-process
+    cache would keep serving stale stats.
+    '''
+    return bool(settings.CACHE_URL)
+
+
+def stats_cache_key(endpoint, *args):
+    '''
+    Return the cache key of an endpoint's response for the given arguments
+    (e.g. project code, partition filter and date range).
+    '''
+    digest = hashlib.md5(repr(args).encode()).hexdigest()
+    # A per-process cache has a version stamp per process, which would give
+    # each process a different key for the same response.
+    version = get_stats_version() if stats_cache_enabled() else 0
+    return f'stats:{endpoint}:{version}:{digest}'
+
+
+def cached_stats(endpoint, args, build):
+    '''
+    Return the cached response of an endpoint for the given arguments,
+    calling build() and caching its result on a miss.
+    '''
+    if not stats_cache_enabled():
+        return build()
+    key = stats_cache_key(endpoint, *args)
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, settings.DATA_ANALYTICS_CACHE_TIMEOUT)
+    return data
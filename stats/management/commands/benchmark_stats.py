@@ -0,0 +1,232 @@
+import datetime
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
+from project.models import Project, ProjectUserMembership
+from stats.models import ComputeDaily, ComputeMonthly, StorageWeekly
+from stats.parsers.project_stats_parser import ProjectStatsParser
+from stats.views import build_project_stats
+from system.models import Partition
+from users.models import CustomUser
+
+# Indexes added for the stats parser access patterns
+BENCHMARK_INDEXES = {
+    ComputeDaily: [
+        'cd_date_idx',
+        'cd_project_date_idx',
+        'cd_project_user_date_idx',
+        'cd_project_partition_date_idx',
+    ],
+    StorageWeekly: [
+        'sw_project_date_idx',
+    ],
+}
+
+NUMBER_PROCESSORS = [1, 4, 8, 40, 80, 160]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a multi-year stats dataset and report the query plans and '
+        'timings of the project stats parser methods, with and without the '
+        'stats indexes. The seeded data is rolled back. Databases that commit '
+        'schema changes, such as MySQL, are only timed with the indexes '
+        'unless --without-indexes is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('-p', required=True, help='Code of the project to benchmark', type=str)
+        parser.add_argument('--years', default=3, help='Years of stats to seed', type=int)
+        parser.add_argument('--projects', default=20, help='Number of projects to seed stats for', type=int)
+        parser.add_argument('--users', default=5, help='Number of users per project', type=int)
+        parser.add_argument('--repeat', default=5, help='Number of timed runs per method', type=int)
+        parser.add_argument('--explain', action='store_true', help='Print the query plan of each query')
+        parser.add_argument(
+            '--without-indexes',
+            action='store_true',
+            help=(
+                'Also time the methods without the stats indexes on databases that commit schema changes. '
+                'The seeded data is committed and then deleted, so only use a scratch database'
+            ),
+        )
+
+    def seed(self, projects, years, n_users):
+        '''
+        Seed daily compute stats for each project's users, and weekly storage
+        stats for each project, over the given number of years.
+        '''
+        rng = random.Random(0)
+        end_date = datetime.date.today()
+        start_date = end_date - datetime.timedelta(days=365 * years)
+        partitions = list(Partition.objects.all())
+        users = list(CustomUser.objects.all()[:n_users * len(projects)])
+        if not partitions or not users:
+            raise Exception('Partitions and users are required to seed stats.')
+
+        compute = []
+        storage = []
+        for project in projects:
+            project_users = list(
+                CustomUser.objects.filter(
+                    id__in=ProjectUserMembership.objects.filter(project=project).values('user')
+                )[:n_users]
+            ) or rng.sample(users, min(n_users, len(users)))
+            date = start_date
+            while date <= end_date:
+                for user in project_users:
+                    # Users don't run jobs every day
+                    if rng.random() < 0.4:
+                        continue
+                    number_jobs = rng.randint(1, 50)
+                    wall_time = number_jobs * rng.randint(60, 36000)
+                    compute.append(
+                        ComputeDaily(
+                            date=date,
+                            number_jobs=number_jobs,
+                            number_processors=rng.choice(NUMBER_PROCESSORS),
+                            wait_time=number_jobs * rng.randint(0, 3600),
+                            cpu_time=round(wall_time * rng.uniform(0.2, 1.0)),
+                            wall_time=wall_time,
+                            user=user,
+                            project=project,
+                            partition=rng.choice(partitions),
+                        )
+                    )
+                if date.weekday() == 5:
+                    storage.append(
+                        StorageWeekly(
+                            date=date,
+                            project=project,
+                            home_space_used=rng.randint(0, 10**8),
+                            home_files_used=rng.randint(0, 10**6),
+                            scratch_space_used=rng.randint(0, 10**9),
+                            scratch_files_used=rng.randint(0, 10**7),
+                        )
+                    )
+                date += datetime.timedelta(days=1)
+
+        ComputeDaily.objects.bulk_create(compute, batch_size=1000, ignore_conflicts=True)
+        StorageWeekly.objects.bulk_create(storage, batch_size=1000)
+        ComputeMonthly.objects.rebuild()
+        return len(compute), len(storage)
+
+    def methods(self, project):
+        '''
+        Return the parser methods to benchmark, keyed by name.
+        '''
+        parser = ProjectStatsParser(
+            project,
+            'all',
+            datetime.date.today() - datetime.timedelta(days=365),
+            datetime.date.today(),
+        )
+        return {
+            'build_project_stats': lambda: build_project_stats(parser, {}),
+            'compute_stats': parser.compute_stats,
+            'pi_projects': parser.pi_projects,
+            'user_status': parser.user_status,
+            'partitions_used': lambda: list(parser.partitions_used()),
+            'storage_stats_in_date_range': parser.storage_stats_in_date_range,
+            'efficiency': parser.efficiency,
+        }
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}')
+            return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+
+    def benchmark(self, label, project, repeat, explain):
+        self.stdout.write(self.style.SUCCESS(f'-- {label}'))
+        for name, method in self.methods(project).items():
+            timings = []
+            for _ in range(repeat):
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    method()
+                    timings.append((time.perf_counter() - start) * 1000)
+            self.stdout.write(
+                f'{name}: {len(queries)} queries, best {min(timings):.1f} ms, '
+                f'mean {statistics.mean(timings):.1f} ms'
+            )
+            if explain:
+                for query in queries:
+                    self.stdout.write(f'  {query["sql"]}')
+                    self.stdout.write('    ' + self.explain(query['sql']).replace('\n', '\n    '))
+
+    def set_indexes(self, add):
+        # Not entered as a context manager, which SQLite refuses inside a
+        # transaction. Adding and removing indexes needs no deferred SQL.
+        schema_editor = connection.schema_editor()
+        for model, names in BENCHMARK_INDEXES.items():
+            for index in model._meta.indexes:
+                if index.name in names:
+                    if add:
+                        schema_editor.add_index(model, index)
+                    else:
+                        schema_editor.remove_index(model, index)
+
+    def run(self, project, projects, options, without_indexes):
+        '''
+        Seed the stats and time the parser methods, first without the stats
+        indexes if asked to.
+        '''
+        compute_count, storage_count = self.seed(projects, options['years'], options['users'])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Seeded {compute_count} compute daily and {storage_count} storage weekly records '
+                f'for {len(projects)} projects'
+            )
+        )
+
+        if without_indexes:
+            self.set_indexes(add=False)
+            try:
+                self.benchmark('Without indexes', project, options['repeat'], options['explain'])
+            finally:
+                self.set_indexes(add=True)
+        else:
+            self.stdout.write(
+                self.style.WARNING(
+                    'Skipping the run without indexes, as the database cannot roll back schema changes. '
+                    'Use --without-indexes against a scratch database to include it'
+                )
+            )
+        self.benchmark('With indexes', project, options['repeat'], options['explain'])
+
+    def run_committed(self, project, projects, options):
+        '''
+        Run the benchmark without a transaction, for databases where dropping
+        an index commits the seeded data, then delete the seeded data.
+        '''
+        seeded_models = [ComputeDaily, StorageWeekly]
+        last_ids = {model: model.objects.aggregate(Max('id'))['id__max'] or 0 for model in seeded_models}
+        try:
+            self.run(project, projects, options, without_indexes=True)
+        finally:
+            for model, last_id in last_ids.items():
+                model.objects.filter(id__gt=last_id).delete()
+            ComputeMonthly.objects.rebuild()
+
+    def handle(self, *args, **options):
+        try:
+            project = Project.objects.get(code=options['p'])
+            projects = [project] + list(Project.objects.exclude(pk=project.pk)[:options['projects'] - 1])
+
+            # Dropping an index inside the transaction would commit the seeded
+            # data on databases without transactional DDL
+            if connection.features.can_rollback_ddl or not options['without_indexes']:
+                with transaction.atomic():
+                    self.run(project, projects, options, without_indexes=connection.features.can_rollback_ddl)
+
+                    # Discard the seeded data and schema changes
+                    transaction.set_rollback(True)
+            else:
+                self.run_committed(project, projects, options)
+
+        except Exception as e:
+            self.stderr.write(self.style.ERROR(str(e)))
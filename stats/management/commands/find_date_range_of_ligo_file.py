@@ -3,6 +3,7 @@ import os
 from datetime import datetime
 
 from django.core.management.base import BaseCommand
+from stats.slurm.LogFile import openLogFile
 
 
 def parse_file(log_file,):
@@ -26,7 +27,7 @@ def parse_file(log_file,):
     latest = 0
     count = 0
 
-    with open(log_file) as tsvfile:
+    with openLogFile(log_file) as tsvfile:
         reader = csv.DictReader(
             tsvfile,
             dialect="excel-tab",
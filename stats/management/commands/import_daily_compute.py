@@ -3,13 +3,9 @@ import os
 
 import pandas as pd
 from django.core.management.base import BaseCommand
-from project.models import Project
-from stats.models import ComputeDaily
 from stats.slurm.StatsParserSlurm import StatsParserSlurm
-from system.models import AccessMethod, Application, Partition
-from users.models import Profile
 
-from .util import get_system
+from .util import ComputeDailyBulkImporter, DimensionResolver, get_system
 
 
 class Command(BaseCommand):
@@ -43,98 +39,97 @@ class Command(BaseCommand):
             get_system(system)
 
             date = datetime.datetime(day=day, month=month, year=year)
+            number_days = 31
             start_date = date
-            end_date = start_date + datetime.timedelta(days=30)
+            end_date = start_date + datetime.timedelta(days=number_days - 1)
             daterange = pd.date_range(start_date, end_date)
 
+            # Parse the log file once, splitting the jobs into per-day buckets
+            sp = StatsParserSlurm(stats_file, start_date, numberDays=number_days)
+            sp.ParseNow()
+
+            # Dimension tables are loaded once and shared by every day
+            resolver = DimensionResolver()
+
             for date in daterange:
-                sp = StatsParserSlurm(stats_file, date)
-                sp.ParseNow()
-
-                msg = f'INFO: Parsed array size {sp.getArraySize()} jobs'
-                self.stdout.write(self.style.SUCCESS(msg))
-
-                count = 0
-                countNew = 0
-                countUpdated = 0
-
-                for i in sp.getResultsArray():
-                    # Find the user record
-                    try:
-                        userProfile = Profile.objects.get(scw_username__iexact=i['userName'])
-                        myUser = userProfile.user
-                    except Profile.DoesNotExist:
-                        msg = f"No matching user: {i['userName']}"
-                        self.stdout.write(msg)
-                        continue
-                    # Find the project record
-                    try:
-                        myProject = Project.objects.get(code__iexact=i['projectCode'])
-                    except Project.DoesNotExist:
-                        msg = f"No matching project: {i['projectCode']}"
-                        self.stdout.write(msg)
-                        continue
-                    # Find the submission method
-                    try:
-                        mySubMethod = AccessMethod.objects.get(name__iexact=i['subMethod'])
-                    except AccessMethod.DoesNotExist:
-                        msg = f"No matching Access/Submission Method: {i['subMethod']}"
-                        self.stdout.write(msg)
-                        continue
-                    # Find the execution application profile
-                    try:
-                        myExecApp = Application.objects.get(name__iexact=i['execApp'])
-                    except Application.DoesNotExist:
-                        msg = f"No matching application profile: {i['execApp']}"
-                        self.stdout.write(msg)
-                        continue
-                    # Find the partition (queue)
-                    try:
-                        modParitionName = system + "-" + i['execQueue']
-                        myParition = Partition.objects.get(name__iexact=modParitionName)
-                    except Partition.DoesNotExist:
-                        msg = f"No matching partition entry: {modParitionName}"
-                        self.stdout.write(msg)
-                        continue
-                    # Check for existing record for the matching dimensions of measurement
-                    obj, created = ComputeDaily.objects.get_or_create(
-                        user=myUser,
-                        project=myProject,
-                        partition=myParition,
-                        application=myExecApp,
-                        access_method=mySubMethod,
-                        number_processors=i['execNCPU'],
-                        date=date,
-                        defaults={
-                            'number_jobs': i['nJobs'],
-                            'wait_time': i['waitTime'],
-                            'cpu_time': i['cpuTime'],
-                            'wall_time': i['wallTime'],
-                        }
-                    )
-                    if not created:
-                        obj.number_jobs = i['nJobs']
-                        obj.wait_time = i['waitTime']
-                        obj.cpu_time = i['cpuTime']
-                        obj.wall_time = i['wallTime']
-                        obj.save()
-                        countUpdated += 1
-                        msg = (
-                            f"INFO: Updated: {obj.id} {date} {obj.user} {obj.project} {obj.partition} {obj.application} {obj.access_method}"
-                            f" {obj.number_processors} {i['waitTime']} {i['cpuTime']} {i['wallTime']} {i['nJobs']}"
-                        )
-                    else:
-                        countNew += 1
-                        msg = (
-                            f"INFO: Added new: {obj.id} {date} {obj.user} {obj.project} {obj.partition} {obj.application} {obj.access_method}"
-                            f" {obj.number_processors} {i['waitTime']} {i['cpuTime']} {i['wallTime']} {i['nJobs']}"
-                        )
-
-                    self.stdout.write(self.style.SUCCESS(msg))
-                    count += 1
-
-                msg = f'END - {countNew} new records, {countUpdated} updated records'
-                self.stdout.write(self.style.SUCCESS(msg))
-            
+                self.import_day(date, sp.getResultsArray(date), system, resolver)
+
         except Exception as e:
             self.stdout.write(self.style.ERROR(e))
+
+    def import_day(self, date, stats, system, resolver):
+        '''
+        Write the aggregated stats of the jobs that ended on date.
+        '''
+        msg = f'INFO: Parsed array size {stats.getSize()} jobs'
+        self.stdout.write(self.style.SUCCESS(msg))
+
+        importer = ComputeDailyBulkImporter(date)
+
+        for i in stats:
+            # Find the user record
+            myUser = resolver.get('user', i['userName'])
+            if myUser is None:
+                if resolver.is_new_miss('user', i['userName']):
+                    msg = f"No matching user: {i['userName']}"
+                    self.stdout.write(msg)
+                continue
+            # Find the project record
+            myProject = resolver.get('project', i['projectCode'])
+            if myProject is None:
+                if resolver.is_new_miss('project', i['projectCode']):
+                    msg = f"No matching project: {i['projectCode']}"
+                    self.stdout.write(msg)
+                continue
+            # Find the submission method
+            mySubMethod = resolver.get('access_method', i['subMethod'])
+            if mySubMethod is None:
+                if resolver.is_new_miss('access_method', i['subMethod']):
+                    msg = f"No matching Access/Submission Method: {i['subMethod']}"
+                    self.stdout.write(msg)
+                continue
+            # Find the execution application profile
+            myExecApp = resolver.get('application', i['execApp'])
+            if myExecApp is None:
+                if resolver.is_new_miss('application', i['execApp']):
+                    msg = f"No matching application profile: {i['execApp']}"
+                    self.stdout.write(msg)
+                continue
+            # Find the partition (queue)
+            modParitionName = system + "-" + i['execQueue']
+            myParition = resolver.get('partition', modParitionName)
+            if myParition is None:
+                if resolver.is_new_miss('partition', modParitionName):
+                    msg = f"No matching partition entry: {modParitionName}"
+                    self.stdout.write(msg)
+                continue
+            importer.add(
+                user=myUser,
+                project=myProject,
+                partition=myParition,
+                application=myExecApp,
+                access_method=mySubMethod,
+                number_processors=i['execNCPU'],
+                number_jobs=i['nJobs'],
+                wait_time=i['waitTime'],
+                cpu_time=i['cpuTime'],
+                wall_time=i['wallTime'],
+            )
+
+        # Write all records for the day in one transaction
+        created, updated = importer.save()
+        for obj in updated:
+            msg = (
+                f"INFO: Updated: {obj.id} {date} {obj.user} {obj.project} {obj.partition} {obj.application} {obj.access_method}"
+                f" {obj.number_processors} {datetime.timedelta(seconds=obj.wait_time)} {datetime.timedelta(seconds=obj.cpu_time)} {datetime.timedelta(seconds=obj.wall_time)} {obj.number_jobs}"
+            )
+            self.stdout.write(self.style.SUCCESS(msg))
+        for obj in created:
+            msg = (
+                f"INFO: Added new: {obj.id} {date} {obj.user} {obj.project} {obj.partition} {obj.application} {obj.access_method}"
+                f" {obj.number_processors} {datetime.timedelta(seconds=obj.wait_time)} {datetime.timedelta(seconds=obj.cpu_time)} {datetime.timedelta(seconds=obj.wall_time)} {obj.number_jobs}"
+            )
+            self.stdout.write(self.style.SUCCESS(msg))
+
+        msg = f'END - {len(created)} new records, {len(updated)} updated records'
+        self.stdout.write(self.style.SUCCESS(msg))
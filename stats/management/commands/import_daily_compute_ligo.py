@@ -3,12 +3,13 @@ import os
 
 import pandas as pd
 from django.core.management.base import BaseCommand
-from project.models import Project, ProjectUserMembership
-from stats.models import ComputeDaily
+from project.models import ProjectUserMembership
 from stats.slurm.StatsParserCondorLigo import StatsParserCondorLigo
-from system.models import AccessMethod, Application, Partition
+from system.models import Application
 from users.models import CustomUser, Profile
 
+from .util import ComputeDailyBulkImporter, DimensionResolver
+
 '''
 15/12/2020
 The userName supplied in the LIGO file does not match the
@@ -54,147 +55,141 @@ class Command(BaseCommand):
             sp = StatsParserCondorLigo(acctf, my_date)
             sp.ParseNow()
 
-            msg = f'INFO: Parsed array size {sp.getArraySize()} jobs'
-            self.stdout.write(self.style.SUCCESS(msg))
+            self.import_day(my_date, sp.getResultsArray(), DimensionResolver())
 
-            count = 0
-            countNew = 0
-            countUpdated = 0
-            sumWall = datetime.timedelta(0)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(e))
 
-            for i in sp.getResultsArray():
-                # Find the project
-                try:
-                    myProject = Project.objects.get(code__iexact=i['projectCode'])
-                except Project.DoesNotExist:
+    def import_day(self, date, stats, resolver):
+        '''
+        Write the aggregated stats of the jobs that completed on date.
+        '''
+        msg = f'INFO: Parsed array size {stats.getSize()} jobs'
+        self.stdout.write(self.style.SUCCESS(msg))
+
+        importer = ComputeDailyBulkImporter(date)
+        sumWall = datetime.timedelta(0)
+
+        for i in stats:
+            # Find the project
+            myProject = resolver.get('project', i['projectCode'])
+            if myProject is None:
+                if resolver.is_new_miss('project', i['projectCode']):
                     msg = f"No matching project: {i['projectCode']}"
                     self.stdout.write(msg)
-                    continue
-                # Find or create user
-                try:
-                    firstname, lastname = i['userName'].split('.')
-                    email = f'{firstname}.{lastname}@ligo.org'.lower()
+                continue
+            # Find or create user
+            try:
+                firstname, lastname = i['userName'].split('.')
+                username = f'{firstname}.{lastname}'.lower()
+                email = f'{firstname}.{lastname}@ligo.org'.lower()
+                user = resolver.get('username', username)
+                created = False
+                if user is None:
                     user, created = CustomUser.objects.get_or_create(
-                        username=f'{firstname}.{lastname}'.lower(),
+                        username=username,
                         email=email,
                         first_name=firstname.title(),
                         last_name=lastname.title(),
                         is_shibboleth_login_required=False,
                     )
-                    if created:
-                        # Reset password
-                        user.set_password(CustomUser.objects.make_random_password())
-                        user.save()
-
-                        # Create user profile
-                        profile = user.profile
-                        profile.description = 'Imported via LIGO daily compute script'
-                        profile.account_status = Profile.APPROVED
-                        profile.save()
-
-                        # Create a user membership
-                        project_user_membership = ProjectUserMembership(
-                            user=user,
-                            project=myProject,
-                            status=ProjectUserMembership.AUTHORISED,
-                            date_joined=datetime.date.today(),
-                        )
-                        project_user_membership.save()
-
-                        msg = f'Successfully created user account, profile and project membership for {email}'
-                        self.stdout.write(self.style.SUCCESS(msg))
-                    else:
-                        msg = f'{email} already exists.'
-                        self.stdout.write(self.style.SUCCESS(msg))
-                    myUser = user
-                except Exception as e:
-                    self.stdout.write(self.style.ERROR(e))
-                    continue
-                # Find the submission method
-                try:
-                    mySubMethod = AccessMethod.objects.get(name__iexact=i['subMethod'])
-                except AccessMethod.DoesNotExist:
-                    msg = f"No matching Access/Submission Method: {i['subMethod']}"
-                    self.stdout.write(msg)
-                    continue
-                # Find the execution application profile
-                try:
-                    myExecApp, state = Application.objects.get_or_create(
-                        name__iexact=i['execApp'],
-                        defaults={'name': i['execApp']},
+                    resolver.add('username', username, user)
+                if created:
+                    # Reset password
+                    user.set_password(CustomUser.objects.make_random_password())
+                    user.save()
+
+                    # Create user profile
+                    profile = user.profile
+                    profile.description = 'Imported via LIGO daily compute script'
+                    profile.account_status = Profile.APPROVED
+                    profile.save()
+
+                    # Create a user membership
+                    project_user_membership = ProjectUserMembership(
+                        user=user,
+                        project=myProject,
+                        status=ProjectUserMembership.AUTHORISED,
+                        date_joined=datetime.date.today(),
                     )
-                    if state:
-                        self.stdout.write(f'Created new Application {myExecApp}')
-                except Application.DoesNotExist:
-                    msg = f"No matching application profile: {i['execApp']}"
-                    self.stdout.write(msg)
-                    continue
-                if not myExecApp:
-                    msg = "ERROR: app not parsed from ligo search tag record"
+                    project_user_membership.save()
+
+                    msg = f'Successfully created user account, profile and project membership for {email}'
+                    self.stdout.write(self.style.SUCCESS(msg))
+                else:
+                    msg = f'{email} already exists.'
+                    self.stdout.write(self.style.SUCCESS(msg))
+                myUser = user
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(e))
+                continue
+            # Find the submission method
+            mySubMethod = resolver.get('access_method', i['subMethod'])
+            if mySubMethod is None:
+                if resolver.is_new_miss('access_method', i['subMethod']):
+                    msg = f"No matching Access/Submission Method: {i['subMethod']}"
                     self.stdout.write(msg)
-                '''
-                NumberOfProcessors model has been removed and replaced with a
-                field in the ComputeDaily model.
-                '''
-                myExecNCPU = i['execNCPU']
-                # Find the partition (queue)
-                try:
-                    myPartition = Partition.objects.get(name__iexact=i['execQueue'])
-                except Partition.DoesNotExist:
+                continue
+            # Find or create the execution application profile
+            myExecApp = resolver.get('application', i['execApp'])
+            if myExecApp is None:
+                myExecApp = Application.objects.create(name=i['execApp'])
+                resolver.add('application', i['execApp'], myExecApp)
+                self.stdout.write(f'Created new Application {myExecApp}')
+            if not myExecApp:
+                msg = "ERROR: app not parsed from ligo search tag record"
+                self.stdout.write(msg)
+            '''
+            NumberOfProcessors model has been removed and replaced with a
+            field in the ComputeDaily model.
+            '''
+            myExecNCPU = i['execNCPU']
+            # Find the partition (queue)
+            myPartition = resolver.get('partition', i['execQueue'])
+            if myPartition is None:
+                if resolver.is_new_miss('partition', i['execQueue']):
                     msg = f"No matching partition entry: {i['execQueue']}"
                     self.stdout.write(msg)
-                    continue
-                if not myPartition:
-                    msg = "ERROR: queue not parsed from ligo machineattr record"
-                    self.stdout.write(msg)
-
-                sumWall += i['wallTime']
-
-                # Check for existing record for the matching dimensions of measurement
-                obj, created = ComputeDaily.objects.get_or_create(
-                    user=myUser,
-                    project=myProject,
-                    partition=myPartition,
-                    application=myExecApp,
-                    access_method=mySubMethod,
-                    number_processors=myExecNCPU,
-                    date=my_date,
-                    defaults={
-                        'number_jobs': i['nJobs'],
-                        'wait_time': i['waitTime'],
-                        'cpu_time': i['cpuTime'],
-                        'wall_time': i['wallTime'],
-                    }
-                )
-                if not created:  # i.e. update!
-                    obj.number_jobs = i['nJobs']
-                    obj.wait_time = i['waitTime']
-                    obj.cpu_time = i['cpuTime']
-                    obj.wall_time = i['wallTime']
-                    obj.save()
-                    countUpdated += 1
-                    msg = (
-                        f"INFO: Updated: {obj.id} {obj.date} {obj.user} {obj.project} {obj.partition} {obj.application} {obj.access_method}"
-                        f" {obj.number_processors} {i['waitTime']} {i['cpuTime']} {i['wallTime']} {i['nJobs']}"
-                    )
-                else:
-                    countNew += 1
-                    msg = (
-                        f"INFO: Added new: {obj.id} {obj.date} {obj.user} {obj.project} {obj.partition} {obj.application} {obj.access_method}"
-                        f" {obj.number_processors} {i['waitTime']} {i['cpuTime']} {i['wallTime']} {i['nJobs']}"
-                    )
-                self.stdout.write(self.style.SUCCESS(msg))
-                count += 1
-
-            msg = f'END - {countNew} new records, {countUpdated} updated records'
+                continue
+            if not myPartition:
+                msg = "ERROR: queue not parsed from ligo machineattr record"
+                self.stdout.write(msg)
+
+            sumWall += i['wallTime']
+
+            importer.add(
+                user=myUser,
+                project=myProject,
+                partition=myPartition,
+                application=myExecApp,
+                access_method=mySubMethod,
+                number_processors=myExecNCPU,
+                number_jobs=i['nJobs'],
+                wait_time=i['waitTime'],
+                cpu_time=i['cpuTime'],
+                wall_time=i['wallTime'],
+            )
+
+        # Write all records for the day in one transaction
+        created, updated = importer.save()
+        for obj in updated:
+            msg = (
+                f"INFO: Updated: {obj.id} {obj.date} {obj.user} {obj.project} {obj.partition} {obj.application} {obj.access_method}"
+                f" {obj.number_processors} {datetime.timedelta(seconds=obj.wait_time)} {datetime.timedelta(seconds=obj.cpu_time)} {datetime.timedelta(seconds=obj.wall_time)} {obj.number_jobs}"
+            )
             self.stdout.write(self.style.SUCCESS(msg))
-
-            msg = f'SUM WALL TIME={sumWall}'
+        for obj in created:
+            msg = (
+                f"INFO: Added new: {obj.id} {obj.date} {obj.user} {obj.project} {obj.partition} {obj.application} {obj.access_method}"
+                f" {obj.number_processors} {datetime.timedelta(seconds=obj.wait_time)} {datetime.timedelta(seconds=obj.cpu_time)} {datetime.timedelta(seconds=obj.wall_time)} {obj.number_jobs}"
+            )
             self.stdout.write(self.style.SUCCESS(msg))
 
-            msg = f'MAX WALL TIME={datetime.timedelta(hours=(24 * ((40 * 60) + (24 * 60))))}'
-            self.stdout.write(self.style.SUCCESS(msg))
+        msg = f'END - {len(created)} new records, {len(updated)} updated records'
+        self.stdout.write(self.style.SUCCESS(msg))
 
-            
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(e))
+        msg = f'SUM WALL TIME={sumWall}'
+        self.stdout.write(self.style.SUCCESS(msg))
+
+        msg = f'MAX WALL TIME={datetime.timedelta(hours=(24 * ((40 * 60) + (24 * 60))))}'
+        self.stdout.write(self.style.SUCCESS(msg))
@@ -1,67 +1,102 @@
-import os
-
-from django.core.management.base import BaseCommand
-
-
-class Command(BaseCommand):
-    help = 'Import historical daily compute stats from bz2 files.'
-
-    def add_arguments(self, parser):
-        parser.add_argument('--input_dir', required=True, help='Path to bz2 files to import', type=str)
-
-    def handle(self, *args, **options):
-        try:
-            input_dir = options['input_dir']
-
-            # Validate path
-            if os.path.exists(input_dir) is False:
-                raise Exception(f'{input_dir} does not exist.')
-
-            # Process bz2 files
-            for filename in os.listdir(input_dir):
-                if filename.endswith('bz2'):
-                    self.stdout.write(self.style.SUCCESS(f'Processing {os.path.join(input_dir, filename)}'))
-
-                    # Parse data attributes
-                    filepath = os.path.join(input_dir, filename)
-
-                    data = filename.split('_')
-                    code = data[0]
-                    system = None
-                    day = 1
-                    month = data[1]
-                    year = data[2][:4]
-
-                    if code == 'hawk':
-                        system = 'CF'
-                    elif code == 'sunbird':
-                        system = 'SW'
-                    else:
-                        self.stderr.write(self.style.ERROR(f'Invalid system code for {filepath}'))
-                        continue
-
-                    try:
-                        # Extract file
-                        os.system(f'bzip2 -d {filepath}')
-
-                        # Process extracted file
-                        filepath = filepath[:-4]  # Remove .bz2 extension
-                        self.stdout.write(self.style.SUCCESS(f'Processing day {day} of {filepath}'))
-
-                        # Call daily compute import script
-                        os.system(
-                            f"python3 manage.py import_daily_compute  \
-                                --file {filepath} \
-                                -d {day} \
-                                -m {month} \
-                                -y {year} \
-                                -s {system}"
-                        )
-                        self.stdout.write(self.style.SUCCESS(f'Finished processing {filepath}'))
-                    except Exception as e:
-                        self.stderr.write(self.style.ERROR(e))
-
-        except Exception as e:
-            self.stderr.write(self.style.ERROR(e))
-
-        self.stdout.write(self.style.SUCCESS('Finished processing bz2 files.'))
+import datetime
+import os
+
+from django.core.management.base import BaseCommand
+from stats.slurm.StatsParserSlurm import StatsParserSlurm
+
+from . import import_daily_compute
+from .util import DimensionResolver, get_system, run_in_workers
+
+
+def parse_archive(archive):
+    '''
+    Parse a monthly Slurm completion log archive, returning the stats of each
+    day keyed by date. Runs in a worker process, so it must not touch the
+    database.
+    '''
+    filepath, start_date, system = archive
+
+    # The archive is decompressed as it is read and left in place
+    sp = StatsParserSlurm(filepath, start_date, numberDays=31)
+    sp.ParseNow()
+    return sp.getDailyResultsArrays()
+
+
+class Command(BaseCommand):
+    help = 'Import historical daily compute stats from bz2 files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--input_dir', required=True, help='Path to bz2 files to import', type=str)
+        parser.add_argument(
+            '--workers',
+            default=1,
+            help=f'Number of files to parse in parallel (this machine has {os.cpu_count()} cores)',
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        try:
+            input_dir = options['input_dir']
+            workers = options['workers']
+
+            # Validate path
+            if os.path.exists(input_dir) is False:
+                raise Exception(f'{input_dir} does not exist.')
+            if workers < 1:
+                raise Exception('--workers must be at least 1.')
+
+            # Collect bz2 files
+            archives = []
+            for filename in sorted(os.listdir(input_dir)):
+                if filename.endswith('bz2'):
+                    # Parse data attributes
+                    filepath = os.path.join(input_dir, filename)
+
+                    data = filename.split('_')
+                    code = data[0]
+                    system = None
+                    day = 1
+                    month = data[1]
+                    year = data[2][:4]
+
+                    if code == 'hawk':
+                        system = 'CF'
+                    elif code == 'sunbird':
+                        system = 'SW'
+                    else:
+                        self.stderr.write(self.style.ERROR(f'Invalid system code for {filepath}'))
+                        continue
+
+                    try:
+                        start_date = datetime.datetime(day=day, month=int(month), year=int(year))
+                    except ValueError as e:
+                        self.stderr.write(self.style.ERROR(f'Invalid date for {filepath}: {e}'))
+                        continue
+                    archives.append((filepath, start_date, system))
+
+            for system in {archive[2] for archive in archives}:
+                # Verify system
+                get_system(system)
+
+            # Parse the files in worker processes and write the results from this one
+            daily_compute = import_daily_compute.Command(stdout=self.stdout, stderr=self.stderr)
+            resolver = DimensionResolver()
+            for archive, daily_stats, error in run_in_workers(parse_archive, archives, workers):
+                filepath, start_date, system = archive
+                if error is not None:
+                    self.stderr.write(self.style.ERROR(f'Failed to process {filepath}: {error}'))
+                    continue
+
+                try:
+                    self.stdout.write(self.style.SUCCESS(f'Processing {filepath}'))
+                    for date, stats in daily_stats.items():
+                        date = datetime.datetime.combine(date, datetime.time())
+                        daily_compute.import_day(date, stats, system, resolver)
+                    self.stdout.write(self.style.SUCCESS(f'Finished processing {filepath}'))
+                except Exception as e:
+                    self.stderr.write(self.style.ERROR(str(e)))
+
+        except Exception as e:
+            self.stderr.write(self.style.ERROR(str(e)))
+
+        self.stdout.write(self.style.SUCCESS('Finished processing bz2 files.'))
@@ -1,56 +1,84 @@
-import os
-from datetime import datetime
-
-from django.core.management.base import BaseCommand
-
-from . import find_date_range_of_ligo_file
-
-
-class Command(BaseCommand):
-    help = 'Import historical daily compute stats for LIGO from bz2 files.'
-
-    def add_arguments(self, parser):
-        parser.add_argument(
-            '--input_dir',
-            required=True,
-            help='Path to bz2 files to import',
-            type=str,
-        )
-
-    def parse_file(self, filepath):
-        try:
-            # Call daily compute ligo import script
-            os.system(f"python3 manage.py import_daily_compute_ligo --file {filepath}")
-            self.stdout.write(self.style.SUCCESS(f'Finished processing {filepath}'))
-        except Exception as e:
-            self.stderr.write(self.style.ERROR(e))
-
-    def handle(self, *args, **options):
-        try:
-            input_dir = options['input_dir']
-
-            # Validate path
-            if os.path.exists(input_dir) is False:
-                raise Exception(f'{input_dir} does not exist.')
-
-            # Process bz2 files
-            for filename in os.listdir(input_dir):
-                if filename.endswith('.bz2'):
-                    try:
-                        filepath = os.path.join(input_dir, filename)
-                        self.stdout.write(self.style.SUCCESS(f'Processing {filepath}'))
-
-                        # Extract file
-                        os.system(f'bzip2 -d {filepath}')
-
-                        # Process extracted file
-                        filepath = filepath[:-4]  # Remove .bz2 extension
-                        self.parse_file(filepath)
-
-                    except Exception as e:
-                        self.stderr.write(self.style.ERROR(e))
-
-        except Exception as e:
-            self.stderr.write(self.style.ERROR(e))
-
-        self.stdout.write(self.style.SUCCESS('Finished processing bz2 files.'))
+import datetime
+import os
+
+from django.core.management.base import BaseCommand
+from stats.slurm.StatsParserCondorLigo import StatsParserCondorLigo
+
+from . import find_date_range_of_ligo_file, import_daily_compute_ligo
+from .util import DimensionResolver, run_in_workers
+
+
+def parse_archive(filepath):
+    '''
+    Parse a Condor LIGO log archive, returning the stats of each day it
+    covers keyed by date. Runs in a worker process, so it must not touch the
+    database.
+    '''
+    # The archive is decompressed as it is read and left in place
+    count, earliest, latest = find_date_range_of_ligo_file.parse_file(filepath)
+    if latest == 0:
+        return {}
+    start_date = datetime.datetime.combine(datetime.datetime.utcfromtimestamp(earliest).date(), datetime.time())
+    number_days = (datetime.datetime.utcfromtimestamp(latest) - start_date).days + 1
+
+    sp = StatsParserCondorLigo(filepath, start_date, numberDays=number_days)
+    sp.ParseNow()
+    return sp.getDailyResultsArrays()
+
+
+class Command(BaseCommand):
+    help = 'Import historical daily compute stats for LIGO from bz2 files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--input_dir',
+            required=True,
+            help='Path to bz2 files to import',
+            type=str,
+        )
+        parser.add_argument(
+            '--workers',
+            default=1,
+            help=f'Number of files to parse in parallel (this machine has {os.cpu_count()} cores)',
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        try:
+            input_dir = options['input_dir']
+            workers = options['workers']
+
+            # Validate path
+            if os.path.exists(input_dir) is False:
+                raise Exception(f'{input_dir} does not exist.')
+            if workers < 1:
+                raise Exception('--workers must be at least 1.')
+
+            # Collect bz2 files
+            archives = [
+                os.path.join(input_dir, filename)
+                for filename in sorted(os.listdir(input_dir))
+                if filename.endswith('.bz2')
+            ]
+
+            # Parse the files in worker processes and write the results from this one
+            daily_compute = import_daily_compute_ligo.Command(stdout=self.stdout, stderr=self.stderr)
+            resolver = DimensionResolver()
+            for filepath, daily_stats, error in run_in_workers(parse_archive, archives, workers):
+                if error is not None:
+                    self.stderr.write(self.style.ERROR(f'Failed to process {filepath}: {error}'))
+                    continue
+
+                try:
+                    self.stdout.write(self.style.SUCCESS(f'Processing {filepath}'))
+                    for date, stats in daily_stats.items():
+                        date = datetime.datetime.combine(date, datetime.time())
+                        daily_compute.import_day(date, stats, resolver)
+                    self.stdout.write(self.style.SUCCESS(f'Finished processing {filepath}'))
+                except Exception as e:
+                    self.stderr.write(self.style.ERROR(str(e)))
+
+        except Exception as e:
+            self.stderr.write(self.style.ERROR(str(e)))
+
+        self.stdout.write(self.style.SUCCESS('Finished processing bz2 files.'))
@@ -4,6 +4,7 @@ import os
 
 from django.core.management.base import BaseCommand
 from project.models import Project
+from stats.cache import bump_stats_version
 from stats.models import StorageWeekly
 
 from .util import get_system
@@ -112,9 +113,11 @@ class Command(BaseCommand):
                     created_count += 1
                 else:
                     updated_count += 1
-            
+
         except Exception as e:
             self.stdout.write(self.style.ERROR(e))
 
+        if created_count or updated_count:
+            bump_stats_version()
         self.stdout.write(self.style.SUCCESS('Finished processing csv files.'))
         self.stdout.write(self.style.SUCCESS(f'New records: {created_count}, Updated records: {updated_count}\n'))
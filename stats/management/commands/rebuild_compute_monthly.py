@@ -0,0 +1,32 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from stats.cache import bump_stats_version
+from stats.models import ComputeMonthly
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the compute monthly rollup from the compute daily stats.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-m', help='Month, rebuild only this month', type=int)
+        parser.add_argument('-y', help='Year, rebuild only this month', type=int)
+
+    def handle(self, *args, **options):
+        try:
+            month = options['m']
+            year = options['y']
+
+            if month is None and year is None:
+                ComputeMonthly.objects.rebuild()
+            elif month is None or year is None:
+                raise Exception('-m and -y must be supplied together.')
+            else:
+                ComputeMonthly.objects.refresh(datetime.date(year=year, month=month, day=1))
+            bump_stats_version()
+
+            msg = f'END - {ComputeMonthly.objects.count()} compute monthly records'
+            self.stdout.write(self.style.SUCCESS(msg))
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(str(e)))
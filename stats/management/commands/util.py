@@ -1,4 +1,23 @@
-from system.models import System
+import datetime
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from project.models import Project
+from stats.cache import bump_stats_version
+from stats.models import ComputeDaily, ComputeMonthly
+from system.models import AccessMethod, Application, Partition, System
+from users.models import CustomUser, Profile
+
+
+def duration_seconds(duration):
+    '''
+    Return a duration (a timedelta or a number of seconds) in whole seconds.
+    '''
+    if isinstance(duration, datetime.timedelta):
+        duration = duration.total_seconds()
+    return round(duration)
 
 
 def get_system(system):
@@ -10,3 +29,252 @@ def get_system(system):
         return System.objects.get(name__iexact=valid_systems[system])
     except Exception:
         raise Exception(f"System '{system}' not found.")
+
+
+def _call(func, item):
+    '''
+    Return the (result, error) of calling func on item, so one failing item
+    doesn't end the run.
+    '''
+    try:
+        return func(item), None
+    except Exception as e:
+        return None, e
+
+
+def run_in_workers(func, items, workers=1):
+    '''
+    Call func on each item, in a pool of worker processes when workers > 1.
+
+    Yield an (item, result, error) tuple per item, in the order of items, so
+    the caller can write the results from the main process. error is None
+    unless func raised. Each result is released once it's been yielded, so
+    the results of a long run aren't all held in memory.
+    '''
+    items = list(items)
+    if workers > 1:
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for item, (result, error) in zip(items, executor.map(functools.partial(_call, func), items)):
+                yield item, result, error
+    else:
+        for item in items:
+            result, error = _call(func, item)
+            yield item, result, error
+
+
+class DimensionResolver:
+    '''
+    Resolve the user, project, access method, application and partition
+    names found in the stats logs to their database records.
+
+    Each dimension table is loaded once, on first use, into a dict keyed on
+    the lower-cased name, which replaces a case-insensitive get() per record.
+    Misses are remembered so they can be reported once per import.
+    '''
+
+    def __init__(self):
+        self._tables = {}
+        self._misses = set()
+
+    def _load(self, dimension):
+        if dimension == 'user':
+            # Slurm logs identify users by their SCW username
+            rows = (
+                (profile.scw_username, profile.user)
+                for profile in Profile.objects.select_related('user').exclude(scw_username__isnull=True)
+            )
+        elif dimension == 'username':
+            rows = ((user.username, user) for user in CustomUser.objects.all())
+        elif dimension == 'project':
+            rows = ((project.code, project) for project in Project.objects.all())
+        elif dimension == 'access_method':
+            rows = ((access_method.name, access_method) for access_method in AccessMethod.objects.all())
+        elif dimension == 'application':
+            rows = ((application.name, application) for application in Application.objects.all())
+        elif dimension == 'partition':
+            rows = ((partition.name, partition) for partition in Partition.objects.all())
+        else:
+            raise ValueError(f'Unknown dimension {dimension}')
+
+        table = {}
+        for name, obj in rows:
+            # Keep the first match, as get() would have failed on duplicates
+            table.setdefault(str(name).lower(), obj)
+        return table
+
+    def _table(self, dimension):
+        if dimension not in self._tables:
+            self._tables[dimension] = self._load(dimension)
+        return self._tables[dimension]
+
+    def get(self, dimension, name):
+        '''
+        Return the record matching name (case-insensitive), or None.
+        '''
+        return self._table(dimension).get(str(name).lower())
+
+    def add(self, dimension, name, obj):
+        '''
+        Register a record created during the import.
+        '''
+        key = str(name).lower()
+        self._table(dimension)[key] = obj
+        self._misses.discard((dimension, key))
+
+    def is_new_miss(self, dimension, name):
+        '''
+        Return True the first time a name is missed for a dimension.
+        '''
+        key = (dimension, str(name).lower())
+        if key in self._misses:
+            return False
+        self._misses.add(key)
+        return True
+
+
+class ComputeDailyBulkImporter:
+    '''
+    Collect the aggregated compute stats for a single date and write them to
+    the ComputeDaily table in one transaction, refreshing the ComputeMonthly
+    rollup of the projects written and invalidating the cached stats.
+    '''
+
+    dimension_fields = [
+        'date',
+        'user',
+        'project',
+        'partition',
+        'application',
+        'access_method',
+        'number_processors',
+    ]
+    value_fields = [
+        'number_jobs',
+        'wait_time',
+        'cpu_time',
+        'wall_time',
+    ]
+
+    def __init__(self, date, batch_size=500):
+        self.date = date
+        self.batch_size = batch_size
+        self._records = {}
+
+    def _key(self, user_id, project_id, partition_id, application_id, access_method_id, number_processors):
+        return (user_id, project_id, partition_id, application_id, access_method_id, int(number_processors))
+
+    def _object_key(self, obj):
+        return self._key(
+            obj.user_id,
+            obj.project_id,
+            obj.partition_id,
+            obj.application_id,
+            obj.access_method_id,
+            obj.number_processors,
+        )
+
+    def add(
+        self,
+        user,
+        project,
+        partition,
+        application,
+        access_method,
+        number_processors,
+        number_jobs,
+        wait_time,
+        cpu_time,
+        wall_time,
+    ):
+        '''
+        Queue a record. A later record for the same dimensions replaces an
+        earlier one.
+        '''
+        key = self._key(user.id, project.id, partition.id, application.id, access_method.id, number_processors)
+        self._records[key] = ComputeDaily(
+            date=self.date,
+            user=user,
+            project=project,
+            partition=partition,
+            application=application,
+            access_method=access_method,
+            number_processors=int(number_processors),
+            number_jobs=number_jobs,
+            wait_time=duration_seconds(wait_time),
+            cpu_time=duration_seconds(cpu_time),
+            wall_time=duration_seconds(wall_time),
+        )
+
+    def _bulk_create_kwargs(self):
+        '''
+        Guard against rows created by a concurrent import between reading the
+        existing rows and inserting the new ones, where the backend allows it.
+        '''
+        kwargs = {'batch_size': self.batch_size}
+        if connection.features.supports_update_conflicts:
+            kwargs['update_conflicts'] = True
+            kwargs['update_fields'] = self.value_fields + ['modified_time']
+            if connection.features.supports_update_conflicts_with_target:
+                kwargs['unique_fields'] = self.dimension_fields
+        return kwargs
+
+    def save(self):
+        '''
+        Write the queued records and return the created and updated
+        ComputeDaily instances.
+        '''
+        created = []
+        updated = []
+        with transaction.atomic():
+            existing = {
+                self._object_key(obj): obj
+                for obj in ComputeDaily.objects.filter(date=self.date).select_related(
+                    'user', 'project', 'partition', 'application', 'access_method'
+                )
+            }
+            now = timezone.now()
+            for key, record in self._records.items():
+                obj = existing.get(key)
+                if obj is None:
+                    created.append(record)
+                    continue
+                for field in self.value_fields:
+                    setattr(obj, field, getattr(record, field))
+                obj.modified_time = now
+                updated.append(obj)
+
+            if updated:
+                ComputeDaily.objects.bulk_update(
+                    updated,
+                    self.value_fields + ['modified_time'],
+                    batch_size=self.batch_size,
+                )
+            if created:
+                ComputeDaily.objects.bulk_create(created, **self._bulk_create_kwargs())
+
+                # Not every backend returns primary keys from a bulk insert
+                if any(obj.pk is None for obj in created):
+                    ids = {
+                        self._key(*row[1:]): row[0] for row in ComputeDaily.objects.filter(date=self.date).values_list(
+                            'id',
+                            'user_id',
+                            'project_id',
+                            'partition_id',
+                            'application_id',
+                            'access_method_id',
+                            'number_processors',
+                        )
+                    }
+                    for obj in created:
+                        obj.pk = ids.get(self._object_key(obj))
+
+            # Keep the monthly rollup in step with the projects written
+            project_ids = {obj.project_id for obj in created + updated}
+            if project_ids:
+                ComputeMonthly.objects.refresh(self.date, project_ids)
+        if created or updated:
+            bump_stats_version()
+        self._records = {}
+        return created, updated
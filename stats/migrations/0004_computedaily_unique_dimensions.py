@@ -0,0 +1,55 @@
+from django.db import migrations, models
+
+
+def remove_duplicate_compute_daily(apps, schema_editor):
+    '''
+    Remove duplicate rows for the same measurement dimensions, keeping the
+    most recently modified row, so the unique constraint can be applied.
+    '''
+    ComputeDaily = apps.get_model('stats', 'ComputeDaily')
+    dimensions = (
+        'date',
+        'user_id',
+        'project_id',
+        'partition_id',
+        'application_id',
+        'access_method_id',
+        'number_processors',
+    )
+    seen = set()
+    duplicates = []
+    rows = ComputeDaily.objects.order_by('-modified_time', '-id').values_list('id', *dimensions)
+    for row in rows.iterator():
+        key = row[1:]
+        if key in seen:
+            duplicates.append(row[0])
+        else:
+            seen.add(key)
+    for i in range(0, len(duplicates), 500):
+        ComputeDaily.objects.filter(id__in=duplicates[i:i + 500]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stats', '0003_auto_20210510_2208'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_compute_daily, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='computedaily',
+            constraint=models.UniqueConstraint(
+                fields=(
+                    'date',
+                    'user',
+                    'project',
+                    'partition',
+                    'application',
+                    'access_method',
+                    'number_processors',
+                ),
+                name='unique_compute_daily_dimensions',
+            ),
+        ),
+    ]
@@ -0,0 +1,85 @@
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth
+import django.db.models.deletion
+
+
+def populate_compute_monthly(apps, schema_editor):
+    '''
+    Roll up the existing ComputeDaily rows by month, project, user and
+    partition.
+    '''
+    ComputeDaily = apps.get_model('stats', 'ComputeDaily')
+    ComputeMonthly = apps.get_model('stats', 'ComputeMonthly')
+    months = ComputeDaily.objects.annotate(month=TruncMonth('date')).values_list('month', flat=True).distinct()
+    for month in sorted(months):
+        rows = ComputeDaily.objects.filter(
+            date__gte=month,
+            date__lt=month + relativedelta(months=1),
+        ).values('project_id', 'user_id', 'partition_id').annotate(
+            number_jobs_sum=Sum('number_jobs'),
+            total_processors_sum=Sum(F('number_jobs') * F('number_processors')),
+            wait_time_sum=Sum('wait_time'),
+            cpu_time_sum=Sum('cpu_time'),
+            wall_time_sum=Sum('wall_time'),
+        ).order_by()
+        ComputeMonthly.objects.bulk_create(
+            [
+                ComputeMonthly(
+                    month=month,
+                    project_id=row['project_id'],
+                    user_id=row['user_id'],
+                    partition_id=row['partition_id'],
+                    number_jobs=row['number_jobs_sum'],
+                    total_processors=row['total_processors_sum'],
+                    wait_time=row['wait_time_sum'],
+                    cpu_time=row['cpu_time_sum'],
+                    wall_time=row['wall_time_sum'],
+                ) for row in rows
+            ],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('system', '0005_partition_partition_type'),
+        ('project', '0038_auto_20210510_2208'),
+        ('stats', '0004_computedaily_unique_dimensions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ComputeMonthly',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('number_jobs', models.PositiveBigIntegerField()),
+                ('total_processors', models.PositiveBigIntegerField()),
+                ('wait_time', models.DurationField()),
+                ('cpu_time', models.DurationField()),
+                ('wall_time', models.DurationField()),
+                ('created_time', models.DateTimeField(auto_now_add=True)),
+                ('modified_time', models.DateTimeField(auto_now=True)),
+                ('partition', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='system.partition')),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='project.project')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Compute Monthly',
+                'get_latest_by': 'month',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='computemonthly',
+            constraint=models.UniqueConstraint(
+                fields=('month', 'project', 'user', 'partition'),
+                name='unique_compute_monthly_dimensions',
+            ),
+        ),
+        migrations.RunPython(populate_compute_monthly, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.3 on 2026-10-17 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stats', '0005_computemonthly'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='computedaily',
+            index=models.Index(fields=['date'], name='cd_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='computedaily',
+            index=models.Index(fields=['project', 'date'], name='cd_project_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='computedaily',
+            index=models.Index(fields=['project', 'user', 'date'], name='cd_project_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='computedaily',
+            index=models.Index(fields=['project', 'partition', 'date'], name='cd_project_partition_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='storageweekly',
+            index=models.Index(fields=['project', 'date'], name='sw_project_date_idx'),
+        ),
+    ]
@@ -0,0 +1,132 @@
+import datetime
+
+from django.db import migrations, models
+
+MODELS = ['computedaily', 'computemonthly']
+FIELDS = ['wait_time', 'cpu_time', 'wall_time']
+
+
+def seconds_field(field, **kwargs):
+    '''
+    Return the integer seconds field of a duration. Wait times are negative
+    for jobs recorded as starting before they were submitted.
+    '''
+    if field == 'wait_time':
+        return models.BigIntegerField(**kwargs)
+    return models.PositiveBigIntegerField(**kwargs)
+
+
+# SQL converting a duration column to whole seconds, and back. SQLite and
+# MySQL store durations as bigint microseconds, PostgreSQL as an interval.
+TO_SECONDS_SQL = {
+    'mysql': 'ROUND({column} / 1000000)',
+    'postgresql': 'ROUND(EXTRACT(EPOCH FROM {column}))',
+    'sqlite': 'CAST(ROUND({column} / 1000000.0) AS INTEGER)',
+}
+TO_DURATION_SQL = {
+    'mysql': '{column} * 1000000',
+    'postgresql': "{column} * INTERVAL '1 second'",
+    'sqlite': '{column} * 1000000',
+}
+
+
+def convert(apps, schema_editor, sql, to_value, source, target):
+    '''
+    Copy each duration field from its source column to its target column, in
+    SQL where the database has a conversion, otherwise row by row with
+    to_value.
+    '''
+    connection = schema_editor.connection
+    for model_name in MODELS:
+        model = apps.get_model('stats', model_name)
+        if connection.vendor not in sql:
+            convert_rows(model, to_value, source, target)
+            continue
+        columns = ', '.join(
+            '{} = {}'.format(
+                connection.ops.quote_name(target.format(field)),
+                sql[connection.vendor].format(column=connection.ops.quote_name(source.format(field))),
+            ) for field in FIELDS
+        )
+        schema_editor.execute(f'UPDATE {connection.ops.quote_name(model._meta.db_table)} SET {columns}')
+
+
+def convert_rows(model, to_value, source, target, batch_size=2000):
+    sources = [source.format(field) for field in FIELDS]
+    targets = [target.format(field) for field in FIELDS]
+    batch = []
+    for obj in model.objects.only(*sources).iterator(chunk_size=batch_size):
+        for source_field, target_field in zip(sources, targets):
+            setattr(obj, target_field, to_value(getattr(obj, source_field)))
+        batch.append(obj)
+        if len(batch) == batch_size:
+            model.objects.bulk_update(batch, targets)
+            batch = []
+    model.objects.bulk_update(batch, targets)
+
+
+def durations_to_seconds(apps, schema_editor):
+    '''
+    Copy the durations to the integer seconds columns in one statement per
+    table, rather than loading every row as timedeltas.
+    '''
+    convert(
+        apps,
+        schema_editor,
+        TO_SECONDS_SQL,
+        lambda duration: round(duration.total_seconds()),
+        '{}',
+        '{}_seconds',
+    )
+
+
+def seconds_to_durations(apps, schema_editor):
+    convert(
+        apps,
+        schema_editor,
+        TO_DURATION_SQL,
+        lambda seconds: datetime.timedelta(seconds=seconds),
+        '{}_seconds',
+        '{}',
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stats', '0006_compute_daily_storage_weekly_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name=model_name,
+            name=f'{field}_seconds',
+            field=seconds_field(field, default=0),
+        ) for model_name in MODELS for field in FIELDS
+    ] + [
+        # A default lets the durations be added back when reversing
+        migrations.AlterField(
+            model_name=model_name,
+            name=field,
+            field=models.DurationField(default=datetime.timedelta(0)),
+        ) for model_name in MODELS for field in FIELDS
+    ] + [
+        migrations.RunPython(durations_to_seconds, seconds_to_durations),
+    ] + [
+        migrations.RemoveField(
+            model_name=model_name,
+            name=field,
+        ) for model_name in MODELS for field in FIELDS
+    ] + [
+        migrations.RenameField(
+            model_name=model_name,
+            old_name=f'{field}_seconds',
+            new_name=field,
+        ) for model_name in MODELS for field in FIELDS
+    ] + [
+        migrations.AlterField(
+            model_name=model_name,
+            name=field,
+            field=seconds_field(field),
+        ) for model_name in MODELS for field in FIELDS
+    ]
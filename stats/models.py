@@ -1,4 +1,9 @@
-from django.db import models
+import datetime
+
+from dateutil.relativedelta import relativedelta
+from django.db import models, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth
 from django.utils.translation import gettext_lazy as _
 from system.models import AccessMethod, Application, Partition, System
 from users.models import CustomUser
@@ -12,13 +17,37 @@ class ComputeDaily(models.Model):
     class Meta:
         verbose_name_plural = _('Compute Daily')
         get_latest_by = "date"
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    'date',
+                    'user',
+                    'project',
+                    'partition',
+                    'application',
+                    'access_method',
+                    'number_processors',
+                ],
+                name='unique_compute_daily_dimensions',
+            ),
+        ]
+        # Every stats parser filters by project and date, and the user and
+        # partition charts group within them
+        indexes = [
+            models.Index(fields=['date'], name='cd_date_idx'),
+            models.Index(fields=['project', 'date'], name='cd_project_date_idx'),
+            models.Index(fields=['project', 'user', 'date'], name='cd_project_user_date_idx'),
+            models.Index(fields=['project', 'partition', 'date'], name='cd_project_partition_date_idx'),
+        ]
 
     date = models.DateField()
     number_jobs = models.PositiveIntegerField()
     number_processors = models.PositiveIntegerField(default=0)
-    wait_time = models.DurationField()
-    cpu_time = models.DurationField()
-    wall_time = models.DurationField()
+    # Durations in seconds. Jobs recorded as starting before they were
+    # submitted, e.g. from clock skew, have a negative wait time.
+    wait_time = models.BigIntegerField()
+    cpu_time = models.PositiveBigIntegerField()
+    wall_time = models.PositiveBigIntegerField()
     user = models.ForeignKey(
         CustomUser,
         on_delete=models.SET_NULL,
@@ -61,6 +90,116 @@ class ComputeDaily(models.Model):
         return f'{self.date}:{self.number_jobs}:{self.number_processors}:{self.user}:{self.project}:{self.partition}:{self.application}:{self.access_method}:{self.wait_time}:{self.cpu_time}:{self.wall_time}'
 
 
+class ComputeMonthlyManager(models.Manager):
+
+    def refresh(self, month, project_ids=None):
+        '''
+        Rebuild the rollup rows of a month from the ComputeDaily table,
+        optionally limited to a set of projects.
+        '''
+        if isinstance(month, datetime.datetime):
+            month = month.date()
+        month = month.replace(day=1)
+        daily = ComputeDaily.objects.filter(date__gte=month, date__lt=month + relativedelta(months=1))
+        monthly = self.filter(month=month)
+        if project_ids is not None:
+            daily = daily.filter(project_id__in=project_ids)
+            monthly = monthly.filter(project_id__in=project_ids)
+        rows = daily.values('project_id', 'user_id', 'partition_id').annotate(
+            number_jobs_sum=Sum('number_jobs'),
+            total_processors_sum=Sum(F('number_jobs') * F('number_processors')),
+            wait_time_sum=Sum('wait_time'),
+            cpu_time_sum=Sum('cpu_time'),
+            wall_time_sum=Sum('wall_time'),
+        ).order_by()
+        with transaction.atomic():
+            monthly.delete()
+            self.bulk_create(
+                [
+                    self.model(
+                        month=month,
+                        project_id=row['project_id'],
+                        user_id=row['user_id'],
+                        partition_id=row['partition_id'],
+                        number_jobs=row['number_jobs_sum'],
+                        total_processors=row['total_processors_sum'],
+                        wait_time=row['wait_time_sum'],
+                        cpu_time=row['cpu_time_sum'],
+                        wall_time=row['wall_time_sum'],
+                    ) for row in rows
+                ],
+                batch_size=500,
+            )
+
+    def rebuild(self):
+        '''
+        Rebuild every month of the rollup from the ComputeDaily table.
+        '''
+        months = ComputeDaily.objects.annotate(month=TruncMonth('date')).values_list('month', flat=True).distinct()
+        with transaction.atomic():
+            self.all().delete()
+            for month in sorted(months):
+                self.refresh(month)
+
+
+class ComputeMonthly(models.Model):
+    """
+    Represents the compute daily statistics rolled up by month, project,
+    user and partition.
+    """
+
+    class Meta:
+        verbose_name_plural = _('Compute Monthly')
+        get_latest_by = "month"
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    'month',
+                    'project',
+                    'user',
+                    'partition',
+                ],
+                name='unique_compute_monthly_dimensions',
+            ),
+        ]
+
+    # First day of the month
+    month = models.DateField()
+    number_jobs = models.PositiveBigIntegerField()
+    # Sum of number_jobs * number_processors
+    total_processors = models.PositiveBigIntegerField()
+    # Durations in seconds. Jobs recorded as starting before they were
+    # submitted, e.g. from clock skew, have a negative wait time.
+    wait_time = models.BigIntegerField()
+    cpu_time = models.PositiveBigIntegerField()
+    wall_time = models.PositiveBigIntegerField()
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+    )
+    project = models.ForeignKey(
+        'project.Project',  # To avoid circular imports issue
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+    )
+    partition = models.ForeignKey(
+        Partition,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+    )
+    created_time = models.DateTimeField(auto_now_add=True)
+    modified_time = models.DateTimeField(auto_now=True)
+
+    objects = ComputeMonthlyManager()
+
+    def __str__(self):
+        return f'{self.month:%Y-%m}:{self.number_jobs}:{self.user}:{self.project}:{self.partition}:{self.wait_time}:{self.cpu_time}:{self.wall_time}'
+
+
 class StorageWeekly(models.Model):
     """
     Represents the weekly storage statistics.
@@ -69,6 +208,9 @@ class StorageWeekly(models.Model):
     class Meta:
         verbose_name_plural = _('Storage Weekly')
         get_latest_by = "date"
+        indexes = [
+            models.Index(fields=['project', 'date'], name='sw_project_date_idx'),
+        ]
 
     project = models.ForeignKey(
         'project.Project',  # To avoid circular imports issue
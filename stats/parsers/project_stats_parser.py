@@ -1,14 +1,44 @@
 import datetime
 from statistics import mean
 
+import numpy as np
+import pandas as pd
 from dateutil.relativedelta import relativedelta
 from django.db.models import Avg, Count, F, Q, Sum
 from django.db.models.functions import TruncMonth
 from project.models import Project, ProjectUserMembership
-from stats.models import ComputeDaily, StorageWeekly
+from stats.models import ComputeDaily, ComputeMonthly, StorageWeekly
 from system.models import Partition
 
-from .util import kb_to_gb, parse_efficiency_result_set, seconds_to_hours
+from .util import (
+    efficiencies,
+    kb_to_gb,
+    month_labels,
+    parse_efficiency_result_set,
+    result_set_frame,
+    seconds_to_hours,
+    split_date_range_by_month,
+)
+
+COMPUTE_FIELDS = ['number_jobs', 'total_processors', 'wait_time', 'cpu_time', 'wall_time']
+
+STORAGE_FIELDS = [
+    'month',
+    'home_space_used_sum',
+    'scratch_space_used_sum',
+    'home_files_used_sum',
+    'scratch_files_used_sum',
+]
+
+# ComputeDaily sums of the compute fields, suffixed to avoid clashing with the
+# model's fields
+COMPUTE_DAILY_SUMS = {
+    'number_jobs_sum': Sum('number_jobs'),
+    'total_processors_sum': Sum(F('number_jobs') * F('number_processors')),
+    'wait_time_sum': Sum('wait_time'),
+    'cpu_time_sum': Sum('cpu_time'),
+    'wall_time_sum': Sum('wall_time'),
+}
 
 
 class ProjectStatsParser:
@@ -28,46 +58,6 @@ class ProjectStatsParser:
         self.start_date = start_date
         self.end_date = end_date + datetime.timedelta(days=1)
 
-    def _parse_project_statuses(self, projects):
-        '''
-        Given a list of projects, parse the projects statuses into
-        a dict.
-        '''
-        # Define date range for active and inactive query
-        n_months = 6
-        date_start = datetime.date.today() + relativedelta(months=-n_months)
-        date_end = datetime.date.today()
-        data = {
-            'Active': 0,
-            'Dormant': 0,
-            'Inactive': 0,
-            'Retired': 0,
-        }
-        for project in projects:
-            # Dormant projects - defined by never running a job
-            # (i.e. no entires in ComputeDaily table)
-            if not ComputeDaily.objects.filter(project=project).exists():
-                data['Dormant'] += 1
-                continue
-
-            # Active projects - defined by running a job within the
-            # last n_months
-            # Inactive projects - defined by not running a job over
-            # the last n_months
-            active = ComputeDaily.objects.filter(
-                project=project,
-                date__range=[date_start, date_end],
-            ).exists()
-            if active:
-                data['Active'] += 1
-            else:
-                data['Inactive'] += 1
-
-            # Retired projects - defined by project state = closed
-            if project.status == Project.CLOSED:
-                data['Retired'] += 1
-        return data
-
     def pi_projects(self):
         '''
         Return the number of active, dormant, inactive and retired projects
@@ -80,8 +70,8 @@ class ProjectStatsParser:
                 projects = Project.objects.filter(pi_email=pi_email)
             else:
                 # No match found, use current project
-                projects = self.project
-            project_statuses = self._parse_project_statuses(projects)
+                projects = Project.objects.filter(pk=self.project.pk)
+            project_statuses = projects.activity_counts()
 
             # Build response
             data = [
@@ -94,7 +84,7 @@ class ProjectStatsParser:
             data = []
         return data
 
-    def user_status(self):
+    def user_status(self, last_job_dates=None):
         '''
         Return the number of active, dormant and inactive users.
         '''
@@ -104,34 +94,28 @@ class ProjectStatsParser:
             date_start = datetime.date.today() + relativedelta(months=-n_months)
             date_end = datetime.date.today()
 
+            # Query the project's memberships and each user's last job date
+            memberships = ProjectUserMembership.objects.filter(project=self.project).values_list('user_id', 'status')
+            if last_job_dates is None:
+                last_job_dates = self.project.user_last_job_dates()
+
             # Active users - Defined by current project membership active
-            active_users = ProjectUserMembership.objects.filter(
-                project=self.project,
-                status=ProjectUserMembership.AUTHORISED,
-            )
-            active_users_count = 0
+            active_user_ids = {user_id for user_id, status in memberships if status == ProjectUserMembership.AUTHORISED}
 
             # Dormant users - Defined by current project membership active but
             # no usage for X months.
-            dormant_users_count = 0
-            for active_user in active_users:
-                # Check ComputeDaily table for recent activity
-                active = ComputeDaily.objects.filter(
-                    project=self.project,
-                    user=active_user.user,
-                    date__range=[date_start, date_end],
-                ).exists()
-                if active:
-                    active_users_count += 1
-                else:
-                    dormant_users_count += 1
+            recent_user_ids = {
+                user_id for user_id, last_job_date in last_job_dates.items() if date_start <= last_job_date <= date_end
+            }
+            active_users_count = len(active_user_ids & recent_user_ids)
+            dormant_users_count = len(active_user_ids - recent_user_ids)
 
             # Inactive users - Defined by current project membership revoked or
             # suspended.
-            inactive_users_count = ProjectUserMembership.objects.filter(
-                Q(status=ProjectUserMembership.REVOKED) | Q(status=ProjectUserMembership.SUSPENDED),
-                project=self.project,
-            ).count()
+            inactive_users_count = len([
+                user_id for user_id, status in memberships
+                if status in (ProjectUserMembership.REVOKED, ProjectUserMembership.SUSPENDED)
+            ])
 
             # Build response
             data = [
@@ -166,15 +150,18 @@ class ProjectStatsParser:
             'scratch_files_used_avg': 0,
         }
 
+        result = StorageWeekly.objects.filter(
+            project=self.project,
+            date__range=[start_date, end_date],
+        ).aggregate(
+            Avg('home_space_used'),
+            Avg('scratch_space_used'),
+            Avg('home_files_used'),
+            Avg('scratch_files_used'),
+        )
+
         # Calculate average disk space usage per week
         try:
-            result = StorageWeekly.objects.filter(
-                project=self.project,
-                date__range=[start_date, end_date],
-            ).aggregate(
-                Avg('home_space_used'),
-                Avg('scratch_space_used'),
-            )
             data['home_space_used_avg'] = kb_to_gb(result['home_space_used__avg'])
             data['scratch_space_used_avg'] = kb_to_gb(result['scratch_space_used__avg'])
         except Exception:
@@ -182,88 +169,64 @@ class ProjectStatsParser:
 
         # Calculate average file count per week
         try:
-            result = StorageWeekly.objects.filter(
-                project=self.project,
-                date__range=[start_date, end_date],
-            ).aggregate(
-                Avg('home_files_used'),
-                Avg('scratch_files_used'),
-            )
             data['home_files_used_avg'] = result['home_files_used__avg']
             data['scratch_files_used_avg'] = result['scratch_files_used__avg']
         except Exception:
             pass
         return data
 
-    def disk_space(self):
+    def _storage_per_month(self):
+        '''
+        Return the project's storage totals per month for the date range.
+        '''
+        return StorageWeekly.objects.filter(
+            project=self.project,
+            date__range=[self.start_date, self.end_date],
+        ).annotate(month=TruncMonth('date')).values('month').annotate(
+            c=Count('id'),
+            home_space_used_sum=Sum('home_space_used'),
+            scratch_space_used_sum=Sum('scratch_space_used'),
+            home_files_used_sum=Sum('home_files_used'),
+            scratch_files_used_sum=Sum('scratch_files_used'),
+        ).order_by('month')
+
+    def disk_space(self, result=None):
         '''
         Return disk space usage for a date range (grouped by month).
         '''
         try:
             # Query disk space usage
-            result = StorageWeekly.objects.filter(
-                project=self.project,
-                date__range=[self.start_date, self.end_date],
-            ).annotate(month=TruncMonth('date')).values('month').annotate(
-                c=Count('id'),
-                home_space_used_sum=Sum('home_space_used'),
-                scratch_space_used_sum=Sum('scratch_space_used'),
-            ).order_by('month')
-
-            # Parse results
-            dates = []
-            home = []
-            scratch = []
-            total = []
-            for row in result:
-                dates.append(row['month'].strftime('%b %Y'))
-                home.append(kb_to_gb(row['home_space_used_sum']))
-                scratch.append(kb_to_gb(row['scratch_space_used_sum']))
-                total.append(kb_to_gb(row['home_space_used_sum'] + row['scratch_space_used_sum']))
+            if result is None:
+                result = self._storage_per_month()
+            result = result_set_frame(result, ['month', 'home_space_used_sum', 'scratch_space_used_sum'])
 
             # Build response
             data = {
-                'dates': dates,
-                'home': home,
-                'scratch': scratch,
-                'total': total,
+                'dates': month_labels(result['month']),
+                'home': kb_to_gb(result['home_space_used_sum']).tolist(),
+                'scratch': kb_to_gb(result['scratch_space_used_sum']).tolist(),
+                'total': kb_to_gb(result['home_space_used_sum'] + result['scratch_space_used_sum']).tolist(),
             }
         except Exception:
             data = {}
         return data
 
-    def file_count(self):
+    def file_count(self, result=None):
         '''
         Return file count usage for a date range (grouped by month).
         '''
         try:
             # Query file count usage
-            result = StorageWeekly.objects.filter(
-                project=self.project,
-                date__range=[self.start_date, self.end_date],
-            ).annotate(month=TruncMonth('date')).values('month').annotate(
-                c=Count('id'),
-                home_files_used_sum=Sum('home_files_used'),
-                scratch_files_used_sum=Sum('scratch_files_used'),
-            ).order_by('month')
-
-            # Parse result
-            dates = []
-            home = []
-            scratch = []
-            total = []
-            for row in result:
-                dates.append(row['month'].strftime('%b %Y'))
-                home.append(row['home_files_used_sum'])
-                scratch.append(row['scratch_files_used_sum'])
-                total.append(row['home_files_used_sum'] + row['scratch_files_used_sum'])
+            if result is None:
+                result = self._storage_per_month()
+            result = result_set_frame(result, ['month', 'home_files_used_sum', 'scratch_files_used_sum'])
 
             # Build response
             data = {
-                'dates': dates,
-                'home': home,
-                'scratch': scratch,
-                'total': total,
+                'dates': month_labels(result['month']),
+                'home': result['home_files_used_sum'].tolist(),
+                'scratch': result['scratch_files_used_sum'].tolist(),
+                'total': (result['home_files_used_sum'] + result['scratch_files_used_sum']).tolist(),
             }
         except Exception:
             data = {}
@@ -310,242 +273,296 @@ class ProjectStatsParser:
                 )
         return ids
 
-    def rate_of_usage(self):
+    def _compute_per_month(self, start_date=None, end_date=None):
+        '''
+        Return the project's compute totals per month, for the partitions in
+        the filter and an inclusive date range (defaults to all time).
+
+        Whole months are read from the ComputeMonthly rollup. Only the part
+        months at either end of a date range are summed from ComputeDaily.
+        '''
+        monthly_sums = {f'{field}_sum': Sum(field) for field in COMPUTE_FIELDS}
+
+        monthly = ComputeMonthly.objects.filter(
+            project=self.project,
+            partition__in=self.partition_ids,
+        )
+        if start_date is None:
+            queries = [monthly.values('month').annotate(**monthly_sums)]
+        else:
+            months, part_months = split_date_range_by_month(start_date, end_date)
+            queries = []
+            if months:
+                queries.append(monthly.filter(month__range=months).values('month').annotate(**monthly_sums))
+            for part_month in part_months:
+                queries.append(
+                    ComputeDaily.objects.filter(
+                        project=self.project,
+                        partition__in=self.partition_ids,
+                        date__range=part_month,
+                    ).annotate(month=TruncMonth('date')).values('month').annotate(**COMPUTE_DAILY_SUMS)
+                )
+
+        # Merge the rows by month
+        result = {}
+        for query in queries:
+            for row in query.order_by():
+                totals = result.setdefault(row['month'], {'month': row['month']})
+                for field in COMPUTE_FIELDS:
+                    value = row[f'{field}_sum']
+                    totals[field] = totals[field] + value if field in totals else value
+        return [result[month] for month in sorted(result)]
+
+    def _compute_frames(self):
+        '''
+        Return the project's compute totals grouped by month, user and
+        partition as three DataFrames: all time for every partition, all time
+        for the partitions in the filter, and the date range for the
+        partitions in the filter.
+        '''
+        dimensions = ['month', 'user__first_name', 'user__last_name', 'partition_id', 'partition__name']
+
+        # Whole months are read from the ComputeMonthly rollup
+        all_time = pd.DataFrame.from_records(
+            ComputeMonthly.objects.filter(project=self.project).values(*dimensions, *COMPUTE_FIELDS).order_by(),
+            columns=dimensions + COMPUTE_FIELDS,
+        )
+        to_present = all_time[all_time['partition_id'].isin([int(partition_id) for partition_id in self.partition_ids])]
+        months, part_months = split_date_range_by_month(self.start_date, self.end_date)
+        if months:
+            frames = [to_present[to_present['month'].between(*months)]]
+        else:
+            frames = [to_present.iloc[0:0]]
+
+        # Part months at either end of the date range are summed from ComputeDaily
+        if part_months:
+            date_filter = Q()
+            for part_month in part_months:
+                date_filter |= Q(date__range=part_month)
+            daily = ComputeDaily.objects.filter(
+                date_filter,
+                project=self.project,
+                partition__in=self.partition_ids,
+            ).annotate(month=TruncMonth('date')).values(*dimensions).annotate(**COMPUTE_DAILY_SUMS).order_by()
+            frames.append(
+                pd.DataFrame.from_records(
+                    daily,
+                    columns=dimensions + [f'{field}_sum' for field in COMPUTE_FIELDS],
+                ).rename(columns=lambda column: column[:-len('_sum')] if column.endswith('_sum') else column)
+            )
+        return all_time, to_present, pd.concat(frames, ignore_index=True)
+
+    def compute_stats(self):
+        '''
+        Return the compute and storage charts and the overall efficiency.
+
+        The charts are derived in memory from one grouped query per stats
+        table, rather than a query (or two) per chart.
+        '''
+        all_time, to_present, in_date_range = self._compute_frames()
+        storage = result_set_frame(self._storage_per_month(), STORAGE_FIELDS)
+
+        # Group the compute totals
+        per_month_in_date_range = in_date_range.groupby('month')[COMPUTE_FIELDS].sum().reset_index()
+        per_month_to_present = to_present.groupby('month')[COMPUTE_FIELDS].sum().reset_index()
+        users = in_date_range.groupby(['user__first_name', 'user__last_name'], dropna=False)[['cpu_time', 'wall_time']]
+        users = users.sum().reset_index().sort_values('wall_time', ascending=False, kind='stable')
+        partitions = in_date_range.groupby('partition__name', dropna=False)['wall_time'].sum()
+        partitions = partitions.reset_index().rename(columns={'wall_time': 'wall_time_sum'})
+        wall_time = all_time['wall_time'].sum()
+
+        return {
+            'efficiency': all_time['cpu_time'].sum() / wall_time if wall_time else 0,
+            'rate_of_usage': self.rate_of_usage(per_month_in_date_range),
+            'cumulative_total_usage': self.cumulative_total_usage(per_month_in_date_range),
+            'top_users_usage': self.top_users_usage(users),
+            'usage_by_partition': self.usage_by_partition(partitions),
+            'efficiency_per_month': self.efficiency_per_month(per_month_in_date_range, per_month_to_present),
+            'num_jobs_per_month': self.num_jobs_per_month(per_month_in_date_range, per_month_to_present),
+            'per_job_avg_stats': self.per_job_avg_stats(per_month_in_date_range, per_month_to_present),
+            'core_count_node_utilisation': self.core_count_node_utilisation(
+                per_month_in_date_range,
+                per_month_to_present,
+            ),
+            'disk_space': self.disk_space(storage),
+            'file_count': self.file_count(storage),
+        }
+
+    def rate_of_usage(self, result=None):
         '''
         Return the rate of usage for a date range (grouped by month).
         '''
         try:
             # Query rate of usage
-            result = ComputeDaily.objects.filter(
-                project=self.project,
-                partition__in=self.partition_ids,
-                date__range=[self.start_date, self.end_date],
-            ).annotate(month=TruncMonth('date')).values('month').annotate(
-                c=Count('id'),
-                wait_time=Sum('wait_time'),
-                cpu_time=Sum('cpu_time'),
-                wall_time=Sum('wall_time'),
-            ).order_by('month')
-
-            # Parse result
-            dates = []
-            wait_time = []
-            cpu_time = []
-            wall_time = []
-            for row in result:
-                dates.append(row['month'].strftime('%b %Y'))
-                wait_time.append(seconds_to_hours(row['wait_time'].total_seconds()))
-                cpu_time.append(seconds_to_hours(row['cpu_time'].total_seconds()))
-                wall_time.append(seconds_to_hours(row['wall_time'].total_seconds()))
+            if result is None:
+                result = self._compute_per_month(self.start_date, self.end_date)
+            result = result_set_frame(result, ['month', 'wait_time', 'cpu_time', 'wall_time'])
 
             # Build response
             data = {
-                'dates': dates,
-                'wait_time': wait_time,
-                'cpu_time': cpu_time,
-                'wall_time': wall_time,
+                'dates': month_labels(result['month']),
+                'wait_time': seconds_to_hours(result['wait_time']).tolist(),
+                'cpu_time': seconds_to_hours(result['cpu_time']).tolist(),
+                'wall_time': seconds_to_hours(result['wall_time']).tolist(),
             }
         except Exception:
             data = {}
         return data
 
-    def cumulative_total_usage(self):
+    def cumulative_total_usage(self, result=None):
         '''
         Return the cumulative total usage for a date range (grouped by month).
         '''
         try:
             # Query cumulative total usage
-            result = ComputeDaily.objects.filter(
-                project=self.project,
-                partition__in=self.partition_ids,
-                date__range=[self.start_date, self.end_date],
-            ).annotate(month=TruncMonth('date')).values('month').annotate(
-                c=Count('id'),
-                wait_time=Sum('wait_time'),
-                cpu_time=Sum('cpu_time'),
-                wall_time=Sum('wall_time'),
-            ).order_by('month')
-
-            # Init response lists
-            dates = [result[0]['month'].strftime('%b %Y')]
-            wait_time = [seconds_to_hours(result[0]['wait_time'].total_seconds())]
-            cpu_time = [seconds_to_hours(result[0]['cpu_time'].total_seconds())]
-            wall_time = [seconds_to_hours(result[0]['wall_time'].total_seconds())]
-
-            # Build cumulative values
-            if len(result) > 1:
-                for row in result[1:]:
-                    dates.append(row['month'].strftime('%b %Y'))
-                    wait_time.append(seconds_to_hours(row['wait_time'].total_seconds()) + wait_time[-1])
-                    cpu_time.append(seconds_to_hours(row['cpu_time'].total_seconds()) + cpu_time[-1])
-                    wall_time.append(seconds_to_hours(row['wall_time'].total_seconds()) + wall_time[-1])
+            if result is None:
+                result = self._compute_per_month(self.start_date, self.end_date)
+            result = result_set_frame(result, ['month', 'wait_time', 'cpu_time', 'wall_time'])
+            if result.empty:
+                return {}
 
             # Build response
             data = {
-                'dates': dates,
-                'wait_time': wait_time,
-                'cpu_time': cpu_time,
-                'wall_time': wall_time,
+                'dates': month_labels(result['month']),
+                'wait_time': seconds_to_hours(result['wait_time']).cumsum().tolist(),
+                'cpu_time': seconds_to_hours(result['cpu_time']).cumsum().tolist(),
+                'wall_time': seconds_to_hours(result['wall_time']).cumsum().tolist(),
             }
         except Exception:
             data = {}
         return data
 
-    def top_users_usage(self):
+    def top_users_usage(self, result=None):
         '''
         Return top users usage and efficency for a date range.
         '''
         n_users = 10
         try:
             # Query top n users usage
-            result = ComputeDaily.objects.filter(
-                project=self.project,
-                partition__in=self.partition_ids,
-                date__range=[self.start_date, self.end_date],
-            ).annotate(Count('user', distinct=True)).values('user__first_name', 'user__last_name').annotate(
-                c=Count('id'),
-                cpu_time=Sum('cpu_time'),
-                wall_time=Sum('wall_time'),
-            ).order_by('-wall_time')[:n_users]
-
-            # Parse result
-            usernames = []
-            wall_time = []
-            efficiencies = []
-            for row in result:
-                try:
-                    # May throw ZeroDivisionError
-                    efficiencies.append(
-                        round((row['cpu_time'].total_seconds() / row['wall_time'].total_seconds()) * 100, 2),
-                    )
-                    usernames.append(f"{row['user__first_name'].title()} {row['user__last_name'].title()}")
-                    wall_time.append(seconds_to_hours(row['wall_time'].total_seconds()))
-                except ZeroDivisionError:
-                    pass
+            if result is None:
+                result = ComputeDaily.objects.filter(
+                    project=self.project,
+                    partition__in=self.partition_ids,
+                    date__range=[self.start_date, self.end_date],
+                ).annotate(Count('user', distinct=True)).values('user__first_name', 'user__last_name').annotate(
+                    c=Count('id'),
+                    cpu_time=Sum('cpu_time'),
+                    wall_time=Sum('wall_time'),
+                ).order_by('-wall_time')[:n_users]
+            result = result_set_frame(
+                result,
+                ['user__first_name', 'user__last_name', 'cpu_time', 'wall_time'],
+            ).head(n_users)
+
+            # Users without wall time have no efficiency
+            efficiencies_, valid = efficiencies(result['cpu_time'], result['wall_time'], decimals=2)
+            result = result[valid]
+            first_names = result['user__first_name'].fillna('').str.title()
+            last_names = result['user__last_name'].fillna('').str.title()
 
             # Build response
             data = {
-                'usernames': usernames,
-                'wall_times': wall_time,
-                'efficiencies': efficiencies,
+                'usernames': (first_names + ' ' + last_names).tolist(),
+                'wall_times': seconds_to_hours(result['wall_time']).tolist(),
+                'efficiencies': efficiencies_.tolist(),
             }
         except Exception:
             data = {}
         return data
 
-    def usage_by_partition(self):
+    def usage_by_partition(self, results=None):
         '''
         Return partition usage for a date range.
         '''
         try:
             # Query partition usage in date range
-            results = ComputeDaily.objects.filter(
-                project=self.project,
-                partition__in=self.partition_ids,
-                date__range=[self.start_date, self.end_date],
-            ).values('partition__name').annotate(
-                c=Count('id'),
-                wall_time_sum=Sum('wall_time'),
-            )
+            if results is None:
+                results = ComputeDaily.objects.filter(
+                    project=self.project,
+                    partition__in=self.partition_ids,
+                    date__range=[self.start_date, self.end_date],
+                ).values('partition__name').annotate(
+                    c=Count('id'),
+                    wall_time_sum=Sum('wall_time'),
+                )
+            results = result_set_frame(results, ['partition__name', 'wall_time_sum'])
 
             # Calculate total wall time
-            total_wall_time = sum([seconds_to_hours(row['wall_time_sum'].total_seconds()) for row in results])
-
-            # Calculate percentages for each partition
-            parition_names = []
-            partition_percentages = []
-            for row in results:
-                parition_names.append(row['partition__name'])
-                wall_time_sum = seconds_to_hours(row['wall_time_sum'].total_seconds())
-                partition_percentages.append(round((wall_time_sum / total_wall_time) * 100, 2))
+            wall_time_sum = seconds_to_hours(results['wall_time_sum'])
+            total_wall_time = wall_time_sum.sum()
+            if len(results) and not total_wall_time:
+                raise ZeroDivisionError('No wall time used')
 
             # Build response
             data = {
-                'parition_names': parition_names,
-                'partition_percentages': partition_percentages,
+                'parition_names': results['partition__name'].tolist(),
+                'partition_percentages': np.round(wall_time_sum / total_wall_time * 100, 2).tolist(),
             }
             return data
         except Exception:
             data = []
         return data
 
-    def efficiency_per_month(self):
+    def efficiency_per_month(self, results_in_date_range=None, results_to_present=None):
         '''
         Return the efficiency for a date range.
         '''
         try:
             # Query cpu and wall time in date range
-            results_in_date_range = ComputeDaily.objects.filter(
-                project=self.project,
-                partition__in=self.partition_ids,
-                date__range=[self.start_date, self.end_date],
-            ).annotate(month=TruncMonth('date')).values('month').annotate(
-                c=Count('id'),
-                cpu_time_sum=Sum('cpu_time'),
-                wall_time_sum=Sum('wall_time'),
-            ).order_by('month')
+            if results_in_date_range is None:
+                results_in_date_range = self._compute_per_month(self.start_date, self.end_date)
+            results_in_date_range = result_set_frame(results_in_date_range, ['month', 'cpu_time', 'wall_time'])
 
             # Parse in date range results
             data = {}
-            if results_in_date_range:
-                dates, efficiency = parse_efficiency_result_set(results_in_date_range)
+            if len(results_in_date_range):
+                dates, efficiency = parse_efficiency_result_set(results_in_date_range, 'cpu_time', 'wall_time')
                 data['dates'] = dates
                 data['efficiency'] = efficiency
                 data['avg_efficiency_in_date_range'] = round(sum(efficiency) / len(efficiency), 2)
 
             # Query cpu and wall time to present
-            results_to_present = ComputeDaily.objects.filter(
-                project=self.project,
-                partition__in=self.partition_ids,
-            ).annotate(month=TruncMonth('date')).values('month').annotate(
-                c=Count('id'),
-                cpu_time_sum=Sum('cpu_time'),
-                wall_time_sum=Sum('wall_time'),
-            ).order_by('month')
+            if results_to_present is None:
+                results_to_present = self._compute_per_month()
+            results_to_present = result_set_frame(results_to_present, ['month', 'cpu_time', 'wall_time'])
 
             # Parse to present results
-            if results_to_present:
-                __, efficiency_to_present = parse_efficiency_result_set(results_to_present)
+            if len(results_to_present):
+                __, efficiency_to_present = parse_efficiency_result_set(results_to_present, 'cpu_time', 'wall_time')
                 avg_efficiency_to_present = round(sum(efficiency_to_present) / len(efficiency_to_present), 2)
                 data['avg_efficiency_to_present'] = avg_efficiency_to_present
         except Exception:
             data = {}
         return data
 
-    def num_jobs_per_month(self):
+    def num_jobs_per_month(self, results_in_date_range=None, results_to_present=None):
         '''
         Return the number of jobs for a date range.
         '''
         try:
             # Query number of jobs in date range
-            results_in_date_range = ComputeDaily.objects.filter(
-                project=self.project,
-                partition__in=self.partition_ids,
-                date__range=[self.start_date, self.end_date],
-            ).annotate(month=TruncMonth('date')).values('month').annotate(
-                c=Count('id'),
-                number_jobs=Sum('number_jobs'),
-            ).order_by('month')
+            if results_in_date_range is None:
+                results_in_date_range = self._compute_per_month(self.start_date, self.end_date)
+            results_in_date_range = result_set_frame(results_in_date_range, ['month', 'number_jobs'])
 
             # Parse in date range results
-            dates = []
-            number_jobs = []
-            for row in results_in_date_range:
-                dates.append(row['month'].strftime('%b %Y'))
-                number_jobs.append(row['number_jobs'])
-            number_jobs_in_date_range = sum(number_jobs)
+            number_jobs = results_in_date_range['number_jobs'].tolist()
 
             # Query number of jobs to present
-            number_jobs_to_present = ComputeDaily.objects.filter(
-                project=self.project,
-                partition__in=self.partition_ids,
-            ).aggregate(number_jobs_sum=Sum('number_jobs'))['number_jobs_sum']
+            if results_to_present is None:
+                number_jobs_to_present = ComputeMonthly.objects.filter(
+                    project=self.project,
+                    partition__in=self.partition_ids,
+                ).aggregate(number_jobs_sum=Sum('number_jobs'))['number_jobs_sum']
+            else:
+                results_to_present = result_set_frame(results_to_present, ['number_jobs'])
+                number_jobs_to_present = int(results_to_present['number_jobs'].sum()) if len(results_to_present) else None
 
             # Build response
             data = {
-                'dates': dates,
+                'dates': month_labels(results_in_date_range['month']),
                 'number_jobs': number_jobs,
-                'number_jobs_in_date_range': number_jobs_in_date_range,
+                'number_jobs_in_date_range': sum(number_jobs),
                 'number_jobs_to_present': number_jobs_to_present,
             }
         except Exception:
@@ -557,37 +574,26 @@ class ProjectStatsParser:
         Return cpu time, wait time and wall time for a
         given result_set.
         '''
-        cpu_time = []
-        wait_time = []
-        wall_time = []
-        for row in result_set:
-            cpu_time.append(round(seconds_to_hours(row['cpu_time'].total_seconds()) / row['number_jobs'], 2))
-            wait_time.append(round(seconds_to_hours(row['wait_time'].total_seconds()) / row['number_jobs'], 2))
-            wall_time.append(round(seconds_to_hours(row['wall_time'].total_seconds()) / row['number_jobs'], 2))
-        return cpu_time, wait_time, wall_time
+        return tuple(
+            np.round(seconds_to_hours(result_set[field]) / result_set['number_jobs'], 2).tolist()
+            for field in ['cpu_time', 'wait_time', 'wall_time']
+        )
 
-    def per_job_avg_stats(self):
+    def per_job_avg_stats(self, results_in_date_range=None, results_to_present=None):
         '''
         Return the per-job average CPU, Wait and Wall time for a date range.
         '''
+        fields = ['month', 'number_jobs', 'cpu_time', 'wait_time', 'wall_time']
         try:
             # Query per-job avg stats in date range
-            results_in_date_range = ComputeDaily.objects.filter(
-                project=self.project,
-                partition__in=self.partition_ids,
-                date__range=[self.start_date, self.end_date],
-            ).annotate(month=TruncMonth('date')).values('month').annotate(
-                c=Count('id'),
-                cpu_time=Sum('cpu_time'),
-                wait_time=Sum('wait_time'),
-                wall_time=Sum('wall_time'),
-                number_jobs=Sum('number_jobs')
-            ).order_by('month')
+            if results_in_date_range is None:
+                results_in_date_range = self._compute_per_month(self.start_date, self.end_date)
+            results_in_date_range = result_set_frame(results_in_date_range, fields)
 
             # Parse in date range results
             data = {}
-            if results_in_date_range:
-                data['dates'] = [row['month'].strftime('%b %Y') for row in results_in_date_range]
+            if len(results_in_date_range):
+                data['dates'] = month_labels(results_in_date_range['month'])
                 cpu_time, wait_time, wall_time = self._parse_per_job_avg_result_set(results_in_date_range)
                 data['cpu_time'] = cpu_time
                 data['wait_time'] = wait_time
@@ -597,19 +603,12 @@ class ProjectStatsParser:
                 data['avg_wall_time_in_date_range'] = round(mean(wall_time), 2)
 
             # Query per-job avg stats to present
-            results_to_present = ComputeDaily.objects.filter(
-                project=self.project,
-                partition__in=self.partition_ids,
-            ).annotate(month=TruncMonth('date')).values('month').annotate(
-                c=Count('id'),
-                cpu_time=Sum('cpu_time'),
-                wait_time=Sum('wait_time'),
-                wall_time=Sum('wall_time'),
-                number_jobs=Sum('number_jobs')
-            ).order_by('month')
+            if results_to_present is None:
+                results_to_present = self._compute_per_month()
+            results_to_present = result_set_frame(results_to_present, fields)
 
             # Parse to present results
-            if results_to_present:
+            if len(results_to_present):
                 cpu_time_to_present, wait_time_to_present, wall_time_to_present = self._parse_per_job_avg_result_set(
                     results_to_present
                 )
@@ -625,35 +624,24 @@ class ProjectStatsParser:
         Return number processors and avg core per job for a
         given result_set.
         '''
-        number_processors = []
-        number_jobs = []
-        avg_cores_per_job = []
-        for row in result_set:
-            number_processors.append(row['number_processors'])
-            number_jobs.append(row['number_jobs'])
-            avg_cores_per_job.append(round(row['number_processors'] / row['number_jobs'], 2))
-        return number_processors, number_jobs, avg_cores_per_job
+        avg_cores_per_job = np.round(result_set['total_processors'] / result_set['number_jobs'], 2)
+        return result_set['total_processors'].tolist(), result_set['number_jobs'].tolist(), avg_cores_per_job.tolist()
 
-    def core_count_node_utilisation(self):
+    def core_count_node_utilisation(self, results_in_date_range=None, results_to_present=None):
         '''
         Return the number of cores used and average cores per job for a date range.
         '''
+        fields = ['month', 'number_jobs', 'total_processors']
         try:
             # Query number of cores in date range
-            results_in_date_range = ComputeDaily.objects.filter(
-                project=self.project,
-                partition__in=self.partition_ids,
-                date__range=[self.start_date, self.end_date],
-            ).annotate(month=TruncMonth('date')).values('month').annotate(
-                c=Count('id'),
-                number_processors=Sum(F('number_jobs') * F('number_processors')),
-                number_jobs=Sum('number_jobs'),
-            ).order_by('month')
+            if results_in_date_range is None:
+                results_in_date_range = self._compute_per_month(self.start_date, self.end_date)
+            results_in_date_range = result_set_frame(results_in_date_range, fields)
 
             # Parse date range results
             data = {}
-            if results_in_date_range:
-                data['dates'] = [row['month'].strftime('%b %Y') for row in results_in_date_range]
+            if len(results_in_date_range):
+                data['dates'] = month_labels(results_in_date_range['month'])
                 number_processors, number_jobs, avg_cores_per_job = self._parse_core_count_node_utilisation_result_set(
                     results_in_date_range
                 )
@@ -663,17 +651,12 @@ class ProjectStatsParser:
                 data['avg_cores_per_job_in_date_range'] = round(sum(number_processors) / sum(number_jobs), 2)
 
             # Query number of cores to present
-            results_to_present = ComputeDaily.objects.filter(
-                project=self.project,
-                partition__in=self.partition_ids,
-            ).annotate(month=TruncMonth('date')).values('month').annotate(
-                c=Count('id'),
-                number_processors=Sum(F('number_jobs') * F('number_processors')),
-                number_jobs=Sum('number_jobs'),
-            ).order_by('month')
+            if results_to_present is None:
+                results_to_present = self._compute_per_month()
+            results_to_present = result_set_frame(results_to_present, fields)
 
             # Parse to present results
-            if results_to_present:
+            if len(results_to_present):
                 number_processors_to_present, number_jobs_to_present, _ = self._parse_core_count_node_utilisation_result_set(
                     results_to_present
                 )
@@ -703,12 +686,27 @@ class ProjectStatsParser:
         result = ComputeDaily.objects.filter(project=self.project).aggregate(wait_time=Sum('wait_time'))['wait_time']
         return result if result else 0
 
-    def efficiency(self):
+    def project_totals(self):
+        '''
+        Return the total wall time, CPU time, wait time and number of jobs
+        over all time, from a single query.
+        '''
+        result = ComputeDaily.objects.filter(project=self.project).aggregate(
+            wall_time=Sum('wall_time'),
+            cpu_time=Sum('cpu_time'),
+            wait_time=Sum('wait_time'),
+            number_jobs=Sum('number_jobs'),
+        )
+        return {key: value if value else 0 for key, value in result.items()}
+
+    def efficiency(self, totals=None):
         '''
         Return the overall project efficiency (CPU/Elapsed).
         '''
         try:
-            return (self.total_cpu_hours() / self.total_core_hours())
+            if totals is None:
+                return (self.total_cpu_hours() / self.total_core_hours())
+            return totals['cpu_time'] / totals['wall_time']
         except ZeroDivisionError:
             return 0
 
@@ -738,28 +736,55 @@ class ProjectStatsParser:
         else:
             end_date = end_date + datetime.timedelta(days=1)
 
-        data = {
-            'cpu_time': 0,
-            'wait_time': 0,
-            'wall_time': 0,
-        }
-
-        data['cpu_time'] = ComputeDaily.objects.filter(
+        data = ComputeDaily.objects.filter(
             project=self.project,
             partition__partition_type__in=partition_type,
             date__range=[start_date, end_date],
-        ).aggregate(cpu_time=Sum('cpu_time'))['cpu_time']
+        ).aggregate(
+            cpu_time=Sum('cpu_time'),
+            wait_time=Sum('wait_time'),
+            wall_time=Sum('wall_time'),
+        )
 
-        data['wait_time'] = ComputeDaily.objects.filter(
-            project=self.project,
-            partition__partition_type__in=partition_type,
-            date__range=[start_date, end_date],
-        ).aggregate(wait_time=Sum('wait_time'))['wait_time']
+        return data
 
-        data['wall_time'] = ComputeDaily.objects.filter(
+    def partition_type_stats_in_date_range(
+        self,
+        start_date=None,
+        end_date=None,
+    ):
+        '''
+        Return the compute stats for project for a given date range, for the
+        core partitions, the research partitions and their total, from a
+        single query.
+        '''
+        # Use dates when instance was created, if not supplied
+        if start_date is None:
+            start_date = self.start_date
+        if end_date is None:
+            end_date = self.end_date
+        else:
+            end_date = end_date + datetime.timedelta(days=1)
+
+        partition_types = {
+            'core': [Partition.CORE],
+            'research': [Partition.RESEARCH],
+            'total': [Partition.CORE, Partition.RESEARCH],
+        }
+        fields = ['cpu_time', 'wait_time', 'wall_time']
+        result = ComputeDaily.objects.filter(
             project=self.project,
-            partition__partition_type__in=partition_type,
+            partition__partition_type__in=partition_types['total'],
             date__range=[start_date, end_date],
-        ).aggregate(wall_time=Sum('wall_time'))['wall_time']
+        ).aggregate(
+            **{
+                f'{name}_{field}': Sum(field, filter=Q(partition__partition_type__in=partition_type))
+                for name, partition_type in partition_types.items()
+                for field in fields
+            }
+        )
 
+        data = {}
+        for name in partition_types:
+            data[name] = {field: result[f'{name}_{field}'] for field in fields}
         return data
@@ -1,12 +1,13 @@
 from datetime import date
 
+import numpy as np
 from dateutil.relativedelta import relativedelta
 from django.db.models import Count, Sum
 from django.db.models.functions import TruncMonth
 from project.models import Project, ProjectUserMembership
 from stats.models import ComputeDaily
 
-from .util import parse_efficiency_result_set, seconds_to_hours
+from .util import month_labels, parse_efficiency_result_set, result_set_frame, sum_hours
 
 
 class UserStatsParser:
@@ -33,28 +34,20 @@ class UserStatsParser:
                 date__range=[self.start_date, self.end_date],
             ).annotate(month=TruncMonth('date')).values('month').annotate(
                 c=Count('id'),
-                wait_time=Sum('wait_time'),
-                cpu_time=Sum('cpu_time'),
-                wall_time=Sum('wall_time'),
+                wait_time=sum_hours('wait_time'),
+                cpu_time=sum_hours('cpu_time'),
+                wall_time=sum_hours('wall_time'),
             ).order_by('month')
 
             # Parse result
-            dates = []
-            wait_time = []
-            cpu_time = []
-            wall_time = []
-            for row in result:
-                dates.append(row['month'].strftime('%b %Y'))
-                wait_time.append(seconds_to_hours(row['wait_time'].total_seconds()))
-                cpu_time.append(seconds_to_hours(row['cpu_time'].total_seconds()))
-                wall_time.append(seconds_to_hours(row['wall_time'].total_seconds()))
+            result = result_set_frame(result, ['month', 'wait_time', 'cpu_time', 'wall_time'])
 
             # Build response
             data = {
-                'dates': dates,
-                'wait_time': wait_time,
-                'cpu_time': cpu_time,
-                'wall_time': wall_time,
+                'dates': month_labels(result['month']),
+                'wait_time': np.round(result['wait_time'], 2).tolist(),
+                'cpu_time': np.round(result['cpu_time'], 2).tolist(),
+                'wall_time': np.round(result['wall_time'], 2).tolist(),
             }
         except Exception:
             data = {}
@@ -72,31 +65,22 @@ class UserStatsParser:
                 date__range=[self.start_date, self.end_date],
             ).annotate(month=TruncMonth('date')).values('month').annotate(
                 c=Count('id'),
-                wait_time=Sum('wait_time'),
-                cpu_time=Sum('cpu_time'),
-                wall_time=Sum('wall_time'),
+                wait_time=sum_hours('wait_time'),
+                cpu_time=sum_hours('cpu_time'),
+                wall_time=sum_hours('wall_time'),
             ).order_by('month')
 
-            # Init response lists
-            dates = [result[0]['month'].strftime('%b %Y')]
-            wait_time = [seconds_to_hours(result[0]['wait_time'].total_seconds())]
-            cpu_time = [seconds_to_hours(result[0]['cpu_time'].total_seconds())]
-            wall_time = [seconds_to_hours(result[0]['wall_time'].total_seconds())]
-
-            # Build cumulative values
-            if len(result) > 1:
-                for row in result[1:]:
-                    dates.append(row['month'].strftime('%b %Y'))
-                    wait_time.append(seconds_to_hours(row['wait_time'].total_seconds()) + wait_time[-1])
-                    cpu_time.append(seconds_to_hours(row['cpu_time'].total_seconds()) + cpu_time[-1])
-                    wall_time.append(seconds_to_hours(row['wall_time'].total_seconds()) + wall_time[-1])
+            # Parse result
+            result = result_set_frame(result, ['month', 'wait_time', 'cpu_time', 'wall_time'])
+            if result.empty:
+                return {}
 
             # Build response
             data = {
-                'dates': dates,
-                'wait_time': wait_time,
-                'cpu_time': cpu_time,
-                'wall_time': wall_time,
+                'dates': month_labels(result['month']),
+                'wait_time': np.round(result['wait_time'], 2).cumsum().tolist(),
+                'cpu_time': np.round(result['cpu_time'], 2).cumsum().tolist(),
+                'wall_time': np.round(result['wall_time'], 2).cumsum().tolist(),
             }
         except Exception:
             data = {}
@@ -145,17 +129,12 @@ class UserStatsParser:
                 number_jobs=Sum('number_jobs'),
             ).order_by('month')
 
-            # Parse in date range results
-            dates = []
-            number_jobs = []
-            for row in results_in_date_range:
-                dates.append(row['month'].strftime('%b %Y'))
-                number_jobs.append(row['number_jobs'])
+            results_in_date_range = result_set_frame(results_in_date_range, ['month', 'number_jobs'])
 
             # Build response
             data = {
-                'dates': dates,
-                'number_jobs': number_jobs,
+                'dates': month_labels(results_in_date_range['month']),
+                'number_jobs': results_in_date_range['number_jobs'].tolist(),
             }
         except Exception:
             data = {}
@@ -1,29 +1,98 @@
+import datetime
+
 import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+from django.db.models import FloatField, Sum
+from django.db.models.functions import Cast
+
+
+def result_set_frame(result_set, columns):
+    '''
+    Return a result set (e.g. a queryset's values(), a list of dicts or a
+    DataFrame) as a DataFrame of the given columns, one row per result.
+    '''
+    if isinstance(result_set, pd.DataFrame):
+        result_set = result_set[columns].reset_index(drop=True)
+    else:
+        result_set = pd.DataFrame.from_records(list(result_set), columns=columns)
+    # Columns of an empty frame have no type to infer from their values
+    return result_set.infer_objects()
+
+
+def month_labels(months):
+    '''
+    Return the labels (e.g. 'Oct 2020') of a column of month start dates.
+    '''
+    return pd.to_datetime(pd.Series(months, dtype=object)).dt.strftime('%b %Y').tolist()
 
 
 def seconds_to_hours(seconds):
     '''
-    Convert seconds to hours.
+    Convert seconds (a number or a column of numbers) to hours.
+    '''
+    return np.round(np.asarray(seconds, dtype=float) / 3600, 2)
+
+
+def sum_hours(field):
+    '''
+    Return an aggregate of a duration field (in seconds) in hours, computed
+    in SQL.
     '''
-    return np.round(seconds / 3600, 2)
+    return Cast(Sum(field), FloatField()) / 3600
 
 
-def parse_efficiency_result_set(result_set):
+def efficiencies(cpu_time, wall_time, decimals=4):
+    '''
+    Return the efficiency percentage (CPU/Elapsed) of each row with wall
+    time, and the mask of those rows.
+    '''
+    cpu_time = np.asarray(cpu_time, dtype=float)
+    wall_time = np.asarray(wall_time, dtype=float)
+    valid = ~np.isnan(cpu_time) & (wall_time > 0)
+    return np.round(cpu_time[valid] / wall_time[valid] * 100, decimals), valid
+
+
+def parse_efficiency_result_set(result_set, cpu_time_key='cpu_time_sum', wall_time_key='wall_time_sum'):
     '''
     Return the efficiency for a given result set.
     '''
-    dates = []
-    efficiency = []
-    for row in result_set:
-        try:
-            cpu_time = row['cpu_time_sum'].total_seconds()
-            wall_time = row['wall_time_sum'].total_seconds()
-            efficiency.append(round((cpu_time / wall_time) * 100, 4))
-            dates.append(row['month'].strftime('%b %Y'))
-        except Exception:
-            pass
-    return dates, efficiency
+    result_set = result_set_frame(result_set, ['month', cpu_time_key, wall_time_key])
+    efficiency, valid = efficiencies(result_set[cpu_time_key], result_set[wall_time_key])
+    return month_labels(result_set['month'][valid]), efficiency.tolist()
 
 
 def kb_to_gb(kb):
     return round(kb / 1000000, 3)
+
+
+def split_date_range_by_month(start_date, end_date):
+    '''
+    Split an inclusive date range into the whole months it covers and the
+    part months at either end.
+
+    Return a (first_month, last_month) pair of month start dates, or None if
+    no whole month is covered, and a list of inclusive (start, end) date
+    pairs for the part months.
+    '''
+    if isinstance(start_date, datetime.datetime):
+        start_date = start_date.date()
+    if isinstance(end_date, datetime.datetime):
+        end_date = end_date.date()
+
+    first_month = start_date.replace(day=1)
+    if first_month < start_date:
+        first_month += relativedelta(months=1)
+    # First day of the month after the last whole month
+    end_month = (end_date + datetime.timedelta(days=1)).replace(day=1)
+
+    if first_month >= end_month:
+        part_months = [(start_date, end_date)] if start_date <= end_date else []
+        return None, part_months
+
+    part_months = []
+    if start_date < first_month:
+        part_months.append((start_date, first_month - datetime.timedelta(days=1)))
+    if end_month <= end_date:
+        part_months.append((end_month, end_date))
+    return (first_month, end_month - relativedelta(months=1)), part_months
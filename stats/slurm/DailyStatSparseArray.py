@@ -1,60 +1,32 @@
 import datetime
 
-from .DailyStat import DailyStat
+ONE_SECOND = datetime.timedelta(seconds=1)
 
+# Positions of the counters held for each key
+NJOBS = 0
+WAITTIME = 1
+CPUTIME = 2
+WALLTIME = 3
 
-class DailyStatSparseArray:
 
-    def __init__(self):
-        self.__statsArray = {}  # Top-level empty dictionary
+def _toSeconds(value):
+    # Durations are accepted as timedeltas or as a number of seconds
+    if isinstance(value, datetime.timedelta):
+        return value // ONE_SECOND
+    return int(value)
 
-    # Create a new entry in the multi-dimenional dict
-    #  -parameters starting with a 'v' are values for the created object
-    def __Create(self, userName, projectCode, subMethod, execApp, execNCPU, execQueue):
-        # -dictionary creation
-        if not userName in self.__statsArray:
-            self.__statsArray[userName] = {}
-        if not projectCode in self.__statsArray[userName]:
-            self.__statsArray[userName][projectCode] = {}
-        if not subMethod in self.__statsArray[userName][projectCode]:
-            self.__statsArray[userName][projectCode][subMethod] = {}
-        if not execApp in self.__statsArray[userName][projectCode][subMethod]:
-            self.__statsArray[userName][projectCode][subMethod][execApp] = {}
-        if not execNCPU in self.__statsArray[userName][projectCode][subMethod][execApp]:
-            self.__statsArray[userName][projectCode][subMethod][execApp][execNCPU] = {}
-        if not execQueue in self.__statsArray[userName][projectCode][subMethod][execApp][execNCPU]:
-            self.__statsArray[userName][projectCode][subMethod][execApp][execNCPU][execQueue] = DailyStat()
 
-    def __Exists(self, userName, projectCode, subMethod, execApp, execNCPU, execQueue):
-        if userName in self.__statsArray:
-            if projectCode in self.__statsArray[userName]:
-                if subMethod in self.__statsArray[userName][projectCode]:
-                    if execApp in self.__statsArray[userName][projectCode][subMethod]:
-                        if execNCPU in self.__statsArray[userName][projectCode][subMethod][execApp]:
-                            if execQueue in self.__statsArray[userName][projectCode][subMethod][execApp][execNCPU]:
-                                return True
-                            else:
-                                return False
-                        else:
-                            return False
-                    else:
-                        return False
-                else:
-                    return False
-            else:
-                return False
-        else:
-            return False
+class DailyStatSparseArray:
 
-    # Add actual values, assume it exists
-    def __AddValues(
-        self, userName, projectCode, subMethod, execApp, execNCPU, execQueue, vNJobs, vWaitTime, vCPUTime, vWallTime
-    ):
-        self.__statsArray[userName][projectCode][subMethod][execApp][execNCPU][execQueue].addValues(
-            nj=vNJobs, twait=vWaitTime, tcpu=vCPUTime, twall=vWallTime
-        )
+    def __init__(self):
+        # Flat dictionary keyed on the
+        # (userName, projectCode, subMethod, execApp, execNCPU, execQueue) tuple,
+        # the values are [nJobs, waitSeconds, cpuSeconds, wallSeconds] integer counters
+        self.__statsArray = {}
+        self.__numberJobs = 0
 
-    # Trick function to handle addition/creation as necessary
+    # Handle addition/creation as necessary
+    #  -parameters starting with a 'v' are values to add to the entry
     def Add(
         self,
         userName,
@@ -68,91 +40,53 @@ class DailyStatSparseArray:
         vCPUTime=datetime.timedelta(0),
         vWallTime=datetime.timedelta(0)
     ):
-        if not self.__Exists(userName, projectCode, subMethod, execApp, execNCPU, execQueue):
-            self.__Create(userName, projectCode, subMethod, execApp, execNCPU, execQueue)
-        self.__AddValues(
-            userName, projectCode, subMethod, execApp, execNCPU, execQueue, vNJobs, vWaitTime, vCPUTime, vWallTime
-        )
+        key = (userName, projectCode, subMethod, execApp, execNCPU, execQueue)
+        counters = self.__statsArray.get(key)
+        if counters is None:
+            counters = self.__statsArray[key] = [0, 0, 0, 0]
+        counters[NJOBS] += vNJobs
+        counters[WAITTIME] += _toSeconds(vWaitTime)
+        counters[CPUTIME] += _toSeconds(vCPUTime)
+        counters[WALLTIME] += _toSeconds(vWallTime)
+        self.__numberJobs += vNJobs
 
     def Print(self):
         print(self.__statsArray)
 
     def PrintByUser(self):
-        for key in self.__statsArray.keys():
-            print(key, ":", self.__statsArray[key])
+        byUser = {}
+        for key, counters in self.__statsArray.items():
+            byUser.setdefault(key[0], {})[key[1:]] = counters
+        for userName, stats in byUser.items():
+            print(userName, ":", stats)
 
     def PrintAsTree(self):
-        for myUserName in self.__statsArray.keys():
-            for myProjectCode in self.__statsArray[myUserName].keys():
-                for mySubMethod in self.__statsArray[myUserName][myProjectCode].keys():
-                    for myExecApp in self.__statsArray[myUserName][myProjectCode][mySubMethod].keys():
-                        for myExecNCPU in self.__statsArray[myUserName][myProjectCode][mySubMethod][myExecApp].keys():
-                            for myExecQueue in self.__statsArray[myUserName][myProjectCode][mySubMethod][myExecApp][
-                                myExecNCPU].keys():
-                                print(
-                                    "DS:", myUserName, myProjectCode, mySubMethod, myExecApp, myExecNCPU, myExecQueue,
-                                    self.__statsArray[myUserName][myProjectCode][mySubMethod][myExecApp][myExecNCPU]
-                                    [myExecQueue].getNumberJobs(), self.__statsArray[myUserName][myProjectCode]
-                                    [mySubMethod][myExecApp][myExecNCPU][myExecQueue].getTotalWallTime(),
-                                    self.__statsArray[myUserName][myProjectCode][mySubMethod][myExecApp][myExecNCPU]
-                                    [myExecQueue].getTotalCPUTime()
-                                )
+        for key, counters in self.__statsArray.items():
+            print(
+                "DS:", *key, counters[NJOBS], datetime.timedelta(seconds=counters[WALLTIME]),
+                datetime.timedelta(seconds=counters[CPUTIME])
+            )
 
     def __iter__(self):
-        # iterator startup, first, 'multiply out' the dicts of dicts into a list
-        self.iterlist = list()
-        count = 0
-        for myUserName in self.__statsArray.keys():
-            for myProjectCode in self.__statsArray[myUserName].keys():
-                for mySubMethod in self.__statsArray[myUserName][myProjectCode].keys():
-                    for myExecApp in self.__statsArray[myUserName][myProjectCode][mySubMethod].keys():
-                        for myExecNCPU in self.__statsArray[myUserName][myProjectCode][mySubMethod][myExecApp].keys():
-                            for myExecQueue in self.__statsArray[myUserName][myProjectCode][mySubMethod][myExecApp][
-                                myExecNCPU].keys():
-                                myItem = {
-                                    'userName': myUserName,
-                                    'projectCode': myProjectCode,
-                                    'subMethod': mySubMethod,
-                                    'execApp': myExecApp,
-                                    'execNCPU': myExecNCPU,
-                                    'execQueue': myExecQueue,
-                                    'nJobs':
-                                        self.__statsArray[myUserName][myProjectCode][mySubMethod][myExecApp][myExecNCPU]
-                                        [myExecQueue].getNumberJobs(),
-                                    'waitTime':
-                                        self.__statsArray[myUserName][myProjectCode][mySubMethod][myExecApp][myExecNCPU]
-                                        [myExecQueue].getTotalWaitTime(),
-                                    'cpuTime':
-                                        self.__statsArray[myUserName][myProjectCode][mySubMethod][myExecApp][myExecNCPU]
-                                        [myExecQueue].getTotalCPUTime(),
-                                    'wallTime':
-                                        self.__statsArray[myUserName][myProjectCode][mySubMethod][myExecApp][myExecNCPU]
-                                        [myExecQueue].getTotalWallTime()
-                                }
-                                self.iterlist.append(myItem)
-                                count += 1
-        self.itercount = 0
-        return self
+        # Lazily yield one dict per entry, converting the counters back to timedeltas
+        for key, counters in self.__statsArray.items():
+            myUserName, myProjectCode, mySubMethod, myExecApp, myExecNCPU, myExecQueue = key
+            yield {
+                'userName': myUserName,
+                'projectCode': myProjectCode,
+                'subMethod': mySubMethod,
+                'execApp': myExecApp,
+                'execNCPU': myExecNCPU,
+                'execQueue': myExecQueue,
+                'nJobs': counters[NJOBS],
+                'waitTime': datetime.timedelta(seconds=counters[WAITTIME]),
+                'cpuTime': datetime.timedelta(seconds=counters[CPUTIME]),
+                'wallTime': datetime.timedelta(seconds=counters[WALLTIME]),
+            }
 
-    def getSize(self):
-        sum = 0
-        for myUserName in self.__statsArray.keys():
-            for myProjectCode in self.__statsArray[myUserName].keys():
-                for mySubMethod in self.__statsArray[myUserName][myProjectCode].keys():
-                    for myExecApp in self.__statsArray[myUserName][myProjectCode][mySubMethod].keys():
-                        for myExecNCPU in self.__statsArray[myUserName][myProjectCode][mySubMethod][myExecApp].keys():
-                            for myExecQueue in self.__statsArray[myUserName][myProjectCode][mySubMethod][myExecApp][
-                                myExecNCPU].keys():
-                                sum += (
-                                    self.__statsArray[myUserName][myProjectCode][mySubMethod][myExecApp][myExecNCPU]
-                                    [myExecQueue].getNumberJobs()
-                                )
-        return sum
+    def __len__(self):
+        return len(self.__statsArray)
 
-    def __next__(self):
-        # return the next member of the list until all done
-        if self.itercount < len(self.iterlist):
-            self.itercount += 1
-            return self.iterlist[(self.itercount - 1)]
-        else:
-            raise StopIteration
+    def getSize(self):
+        # Total number of jobs added
+        return self.__numberJobs
@@ -0,0 +1,19 @@
+import bz2
+import gzip
+import lzma
+
+# Openers for compressed accounting logs, chosen by file extension
+COMPRESSED_OPENERS = {
+    '.bz2': bz2.open,
+    '.gz': gzip.open,
+    '.xz': lzma.open,
+}
+
+
+# Open an accounting log for reading as text. Compressed logs are decompressed
+# as they are read, so no decompressed copy is written to disk.
+def openLogFile(logFile):
+    for extension, opener in COMPRESSED_OPENERS.items():
+        if logFile.endswith(extension):
+            return opener(logFile, 'rt')
+    return open(logFile, 'r')
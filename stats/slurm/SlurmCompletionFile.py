@@ -1,5 +1,3 @@
-import csv
-
 from .SlurmCompletionRecord import SlurmCompletionRecord
 
 
@@ -8,7 +6,7 @@ class SlurmCompletionFile:
     #  Slurm completion log
     # \param fh An open file object to the accounting file.
     def __init__(self, fh):
-        self.reader = csv.reader(fh, delimiter=' ', quotechar='"')
+        self.lines = iter(fh)
 
     def __iter__(self):
         return self
@@ -16,7 +14,7 @@ class SlurmCompletionFile:
     # Iterator function is called each iteration and parses the next line of file for a completion record
     def __next__(self):
         try:
-            j = SlurmCompletionRecord(self.reader.__next__())
+            j = SlurmCompletionRecord(next(self.lines))
         except ValueError:
             return 0
         return j
@@ -6,43 +6,66 @@
 
 class SlurmCompletionRecord:
 
-    def __init__(self, row=[]):
-        if len(row) == 0:
+    def __init__(self, line=''):
+        fields = self.splitFields(line)
+        if len(fields) == 0:
+            raise ValueError
+        try:
+            self.jobID = fields['JobId']
+            self.userID = fields['UserId']
+            self.groupID = fields['GroupId']
+            self.jobName = fields['Name']
+            self.jobState = fields['JobState']
+            self.partition = fields['Partition'].split(",")[0]
+            self.timeLimit = fields['TimeLimit']
+            self.startTime = fields['StartTime']
+            self.endTime = fields['EndTime']
+            self.nodeList = fields['NodeList']
+            self.nodeCount = fields['NodeCnt']
+            self.processorCount = fields['ProcCnt']
+            self.workDir = fields['WorkDir']
+            self.cpuTime = fields['cpuTime']
+            self.account = fields['account']
+            self.allocCPU = fields['alloccpu']
+            self.submitTime = fields['submit']
+        except KeyError:
+            # Truncated or otherwise malformed line
             raise ValueError
-        self.jobID = row.pop(0).split("=")[1].rstrip()
-        self.userID = row.pop(0).split("=")[1].rstrip()
         if self.userID.startswith('('):
             self.userID = "software.builder"  # system default, must have been during the pre-production with non-final name service content, so let's allocate by default to dear old s.b
-        self.groupID = row.pop(0).split("=")[1].rstrip()
-        self.jobName = row.pop(0).split("=")[1].rstrip()
-        while not row[0].startswith("JobState"):
-            row.pop(0)
-        self.jobState = row.pop(0).split("=")[1].rstrip()
-        while not row[0].startswith("Partition"):
-            row.pop(0)
-        if "," in row[0]:
-            self.partition = row.pop(0).split("=")[1].split(",")[0].rstrip()
-        else:
-            self.partition = row.pop(0).split("=")[1].rstrip()
-        self.timeLimit = row.pop(0).split("=")[1].rstrip()
-        self.startTime = row.pop(0).split("=")[1].rstrip()
-        self.endTime = row.pop(0).split("=")[1].rstrip()
-        self.nodeList = row.pop(0).split("=")[1].rstrip()
-        while not row[0].startswith("NodeCnt"):
-            row.pop(0)
-        self.nodeCount = row.pop(0).split("=")[1].rstrip()
-        self.processorCount = row.pop(0).split("=")[1].rstrip()
-        self.workDir = row.pop(0).split("=")[1].rstrip()
-        while row[0].split("=")[
-            0
-        ] != "cpuTime":  # A rare (once?) occurrence of an extra, (space seperated) output between jobName and jobState
-            row.pop(0)
-        self.cpuTime = row.pop(0).split("=")[1].rstrip()
-        self.account = row.pop(0).split("=")[1].rstrip()
         if self.account == '':
             self.account = "scw1001"  # system default, must have been during pre-production
-        self.allocCPU = row.pop(0).split("=")[1].rstrip()
-        self.submitTime = row.pop(0).split("=")[1].rstrip()
+
+    # Split a completion log line into a key -> value mapping in a single pass.
+    # Values may be double quoted to hold spaces (e.g. Name="my job"). Any other
+    # token without an '=', such as the "by 5000120" in "JobState=CANCELLED by 5000120"
+    # or a space in an unquoted job name, is an extra output and is skipped.
+    # When a key is repeated the first occurrence wins.
+    @staticmethod
+    def splitFields(line):
+        if '"' not in line:
+            # Common case, walk the tokens backwards so the first occurrence of a key wins
+            return {key: value for key, sep, value in [token.partition("=") for token in reversed(line.split())] if sep}
+        fields = {}
+        tokens = iter(line.split())
+        for token in tokens:
+            key, sep, value = token.partition("=")
+            if not sep:
+                continue
+            if value[:1] == '"':
+                # Gather the rest of a quoted value
+                parts = [value[1:]]
+                while not parts[-1].endswith('"'):
+                    token = next(tokens, None)
+                    if token is None:
+                        break
+                    parts.append(token)
+                value = " ".join(parts)
+                if value.endswith('"'):
+                    value = value[:-1]
+            if key not in fields:
+                fields[key] = value
+        return fields
 
     def __str__(self):
         retv = "JobID=" + self.jobID + " userID=" + self.userID + " groupID=" + self.groupID + " jobName=" + self.jobName + " jobState=" + self.jobState + " partition=" + self.partition + " timeLimit=" + self.timeLimit + " startTime=" + self.startTime + " endTime=" + self.endTime + " nodeList=" + self.nodeList + " nodeCount=" + self.nodeCount + " processorCount=" + self.processorCount + " workDir=" + self.workDir + " cpuTime=" + self.cpuTime + " account=" + self.account + " allocCPU=" + self.allocCPU + " submitTime=" + self.submitTime
@@ -7,18 +7,28 @@ from datetime import datetime, timedelta
 from .CondorLigoCompletionFile import CondorLigoCompletionFile
 from .CondorLigoCompletionRecord import CondorLigoCompletionRecord
 from .DailyStatSparseArray import DailyStatSparseArray
+from .LogFile import openLogFile
 
 
 class StatsParserCondorLigo:
 
-    def __init__(self, condorlogfile, fordate):
+    def __init__(self, condorlogfile, fordate, numberDays=1):
         # TODO: check input file present & readable
         self.__logFile = condorlogfile
         self.__startDate = fordate
-        self.__endDate = self.__startDate + timedelta(hours=23, minutes=59, seconds=59)
-        self.__statsArray = DailyStatSparseArray()
+        self.__endDate = self.__startDate + timedelta(days=numberDays) - timedelta(seconds=1)
+        # One DailyStatSparseArray per completion date, so a single pass over the
+        # log file can serve every day in the window
+        self.__dailyStatsArrays = {}
         print("StatsParserCondorLigo: Created for ", self.__startDate, " to ", self.__endDate)
 
+    def __bucketKey(self, fordate):
+        if fordate is None:
+            fordate = self.__startDate
+        if isinstance(fordate, datetime):
+            fordate = fordate.date()
+        return fordate
+
     def ParseNow(self):
         # Condor Ligo log field mapping:
         # owner -> user
@@ -40,10 +50,14 @@ class StatsParserCondorLigo:
 
         print("ParseNowCondorLigo Starting")
 
+        with openLogFile(self.__logFile) as fh:
+            self.__parseFile(fh)
+
+    def __parseFile(self, fh):
         countLog = 0
         countLine = 0
         ignoredRecs = 0
-        for i in CondorLigoCompletionFile(open(self.__logFile, 'r')):
+        for i in CondorLigoCompletionFile(fh):
             #
             #print(countLine,i)
             countLine = countLine + 1
@@ -111,7 +125,10 @@ class StatsParserCondorLigo:
 
                     #print(i.Owner,"scw1158","CONDOR",myApp,i.RequestCpus,myQueue,1,myWaitDuration,myCPUTime,myComputeWallDuration)
 
-                    self.__statsArray.Add(
+                    bucketKey = recordDate.date()
+                    if bucketKey not in self.__dailyStatsArrays:
+                        self.__dailyStatsArrays[bucketKey] = DailyStatSparseArray()
+                    self.__dailyStatsArrays[bucketKey].Add(
                         userName=i.Owner,
                         projectCode="scw1158",
                         subMethod="CONDOR",
@@ -128,14 +145,19 @@ class StatsParserCondorLigo:
                 print(i)
         print("Found " + str(ignoredRecs) + " ignored records")
 
-    def PrintResultsArray(self):
-        self.__statsArray.PrintByUser()
+    def PrintResultsArray(self, fordate=None):
+        self.getResultsArray(fordate).PrintByUser()
+
+    def PrintResultsArrayTree(self, fordate=None):
+        self.getResultsArray(fordate).PrintAsTree()
 
-    def PrintResultsArrayTree(self):
-        self.__statsArray.PrintAsTree()
+    # Return the stats of jobs that completed on fordate (defaults to the first day parsed)
+    def getResultsArray(self, fordate=None):
+        return self.__dailyStatsArrays.get(self.__bucketKey(fordate), DailyStatSparseArray())
 
-    def getResultsArray(self):
-        return self.__statsArray
+    # Return the per-day stats of every day that had at least one job complete, keyed by date
+    def getDailyResultsArrays(self):
+        return dict(sorted(self.__dailyStatsArrays.items()))
 
-    def getArraySize(self):
-        return (self.__statsArray.getSize())
+    def getArraySize(self, fordate=None):
+        return (self.getResultsArray(fordate).getSize())
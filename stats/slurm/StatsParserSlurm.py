@@ -1,38 +1,63 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 from .DailyStatSparseArray import DailyStatSparseArray
+from .LogFile import openLogFile
 from .SlurmCompletionFile import SlurmCompletionFile
 from .SlurmCompletionRecord import SlurmCompletionRecord
 
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+# Slurm writes fixed width ISO 8601 timestamps, which fromisoformat reads far faster
+# than strptime. Start and submit times repeat across the jobs of an array, so the
+# parsed values are cached.
+@lru_cache(maxsize=65536)
+def parseTimestamp(timestamp):
+    return datetime.fromisoformat(timestamp)
+
 
 class StatsParserSlurm:
 
-    def __init__(self, slurmfile, fordate):
+    def __init__(self, slurmfile, fordate, numberDays=1):
         print(slurmfile, fordate)
         # TODO: check input file present & readable
         self.__logFile = slurmfile
         self.__startDate = fordate
-        self.__endDate = self.__startDate + timedelta(hours=23, minutes=59, seconds=59)
-        self.__statsArray = DailyStatSparseArray()
+        self.__endDate = self.__startDate + timedelta(days=numberDays) - timedelta(seconds=1)
+        # The window as timestamp strings, so records outside it are rejected without parsing a date
+        self.__startTimestamp = self.__startDate.strftime(TIMESTAMP_FORMAT)
+        self.__endTimestamp = self.__endDate.strftime(TIMESTAMP_FORMAT)
+        # One DailyStatSparseArray per end date, so a single pass over the
+        # log file can serve every day in the window
+        self.__dailyStatsArrays = {}
         print("StatsParser: Created for ", self.__startDate, " to ", self.__endDate)
 
+    def __bucketKey(self, fordate):
+        if fordate is None:
+            fordate = self.__startDate
+        if isinstance(fordate, datetime):
+            fordate = fordate.date()
+        return fordate
+
     def ParseNow(self):
         # A line of SLurm completion log:
         # JobId=64652 UserId=ivan.scivetti(16780386) GroupId=ivan.scivetti(16780386) Name=vasp_test JobState=CANCELLED Partition=cpc TimeLimit=600 StartTime=2015-09-21T22:24:46 EndTime=2015-09-21T23:27:13 NodeList=ssc[029-032] NodeCnt=4 ProcCnt=64 WorkDir=/scratch/ivan.scivetti/LiMn2O4/Ni_BATTERY/PW91/K/conf1/no-U/ox_Ni_fixed/2-NiO2/K/3.66Ni_new/6K/18_h2o
         # jobid | userid | groupid | name | state | partition | timelimit | starttime | endtime | nodelist | nodecount | processor count | workdir
         print("ParseNowSlurm Starting")
 
+        with openLogFile(self.__logFile) as fh:
+            self.__parseFile(fh)
+
+    def __parseFile(self, fh):
         countLog = 0
         countLine = 0
-        for i in SlurmCompletionFile(open(self.__logFile, 'r')):
+        for i in SlurmCompletionFile(fh):
             countLine = countLine + 1
 
             # Skip non valids
             if isinstance(i, SlurmCompletionRecord):
-                recordDate = datetime.strptime(i.endTime, "%Y-%m-%dT%H:%M:%S")
-                if isinstance(
-                    i, SlurmCompletionRecord
-                ) and recordDate >= self.__startDate and recordDate <= self.__endDate:
+                if self.__startTimestamp <= i.endTime <= self.__endTimestamp:
                     countLog = countLog + 1
 
                     # Use allocCPU from Slurm where possible as this reflects the exclusive use of
@@ -49,9 +74,9 @@ class StatsParserSlurm:
                     #print(myProcessorCount)
 
                     # durations
-                    myStart = datetime.strptime(i.startTime, "%Y-%m-%dT%H:%M:%S")
-                    myEnd = datetime.strptime(i.endTime, "%Y-%m-%dT%H:%M:%S")
-                    mySubmit = datetime.strptime(i.submitTime, "%Y-%m-%dT%H:%M:%S")
+                    myStart = parseTimestamp(i.startTime)
+                    myEnd = parseTimestamp(i.endTime)
+                    mySubmit = parseTimestamp(i.submitTime)
                     myWallDuration = myEnd - myStart
                     myWaitDuration = myStart - mySubmit
                     myComputeWallDuration = myWallDuration * int(myProcessorCount)
@@ -93,7 +118,10 @@ class StatsParserSlurm:
                     else:
                         myAccount = i.account
 
-                    self.__statsArray.Add(
+                    bucketKey = myEnd.date()
+                    if bucketKey not in self.__dailyStatsArrays:
+                        self.__dailyStatsArrays[bucketKey] = DailyStatSparseArray()
+                    self.__dailyStatsArrays[bucketKey].Add(
                         myUser,
                         myAccount,
                         "SSH",
@@ -106,14 +134,19 @@ class StatsParserSlurm:
                         vWallTime=myComputeWallDuration
                     )
 
-    def PrintResultsArray(self):
-        self.__statsArray.PrintByUser()
+    def PrintResultsArray(self, fordate=None):
+        self.getResultsArray(fordate).PrintByUser()
+
+    def PrintResultsArrayTree(self, fordate=None):
+        self.getResultsArray(fordate).PrintAsTree()
 
-    def PrintResultsArrayTree(self):
-        self.__statsArray.PrintAsTree()
+    # Return the stats of jobs that ended on fordate (defaults to the first day parsed)
+    def getResultsArray(self, fordate=None):
+        return self.__dailyStatsArrays.get(self.__bucketKey(fordate), DailyStatSparseArray())
 
-    def getResultsArray(self):
-        return self.__statsArray
+    # Return the per-day stats of every day that had at least one job end, keyed by date
+    def getDailyResultsArrays(self):
+        return dict(sorted(self.__dailyStatsArrays.items()))
 
-    def getArraySize(self):
-        return (self.__statsArray.getSize())
+    def getArraySize(self, fordate=None):
+        return (self.getResultsArray(fordate).getSize())
@@ -0,0 +1,84 @@
+# Micro-benchmark of the Slurm completion record parser.
+# Compares the single pass key -> value parser against the previous csv.reader
+# and list.pop(0) based parser, in lines per second.
+#
+#   python -m stats.slurm.benchmark_completion_record [slurm_log] [repeat]
+
+import csv
+import io
+import os
+import sys
+import timeit
+
+from .SlurmCompletionFile import SlurmCompletionFile
+
+DEFAULT_LOG = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'tests', 'hawk_10_2020.out')
+
+
+# The parser as it was before the single pass rewrite, kept for comparison only
+class LegacySlurmCompletionRecord:
+
+    def __init__(self, row):
+        self.__dict__.update(legacyParse(row))
+
+
+def legacyParse(row):
+    if len(row) == 0:
+        raise ValueError
+    record = {}
+    record['jobID'] = row.pop(0).split("=")[1].rstrip()
+    record['userID'] = row.pop(0).split("=")[1].rstrip()
+    record['groupID'] = row.pop(0).split("=")[1].rstrip()
+    record['jobName'] = row.pop(0).split("=")[1].rstrip()
+    while not row[0].startswith("JobState"):
+        row.pop(0)
+    record['jobState'] = row.pop(0).split("=")[1].rstrip()
+    while not row[0].startswith("Partition"):
+        row.pop(0)
+    if "," in row[0]:
+        record['partition'] = row.pop(0).split("=")[1].split(",")[0].rstrip()
+    else:
+        record['partition'] = row.pop(0).split("=")[1].rstrip()
+    record['timeLimit'] = row.pop(0).split("=")[1].rstrip()
+    record['startTime'] = row.pop(0).split("=")[1].rstrip()
+    record['endTime'] = row.pop(0).split("=")[1].rstrip()
+    record['nodeList'] = row.pop(0).split("=")[1].rstrip()
+    while not row[0].startswith("NodeCnt"):
+        row.pop(0)
+    record['nodeCount'] = row.pop(0).split("=")[1].rstrip()
+    record['processorCount'] = row.pop(0).split("=")[1].rstrip()
+    record['workDir'] = row.pop(0).split("=")[1].rstrip()
+    while row[0].split("=")[0] != "cpuTime":
+        row.pop(0)
+    record['cpuTime'] = row.pop(0).split("=")[1].rstrip()
+    record['account'] = row.pop(0).split("=")[1].rstrip()
+    record['allocCPU'] = row.pop(0).split("=")[1].rstrip()
+    record['submitTime'] = row.pop(0).split("=")[1].rstrip()
+    return record
+
+
+def legacyParseAll(text):
+    for row in csv.reader(io.StringIO(text), delimiter=' ', quotechar='"'):
+        LegacySlurmCompletionRecord(row)
+
+
+def parseAll(text):
+    for __ in SlurmCompletionFile(io.StringIO(text)):
+        pass
+
+
+def main(argv):
+    logFile = argv[1] if len(argv) > 1 else DEFAULT_LOG
+    repeat = int(argv[2]) if len(argv) > 2 else 200
+    with open(logFile, 'r') as fh:
+        text = fh.read()
+    nLines = text.count("\n") * repeat
+
+    print("Parsing", logFile, repeat, "times")
+    for name, func in (("before", legacyParseAll), ("after", parseAll)):
+        seconds = min(timeit.repeat(lambda: func(text), number=repeat, repeat=3))
+        print("%-7s %12.0f lines/sec" % (name, nLines / seconds))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
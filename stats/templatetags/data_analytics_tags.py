@@ -24,10 +24,9 @@ def gb_to_tb(gb):
 
 
 @register.filter
-def in_hours(td):
-    if td:
-        total_seconds = int(td.total_seconds())
-        hours = total_seconds / 3600
+def in_hours(seconds):
+    if seconds:
+        hours = int(seconds) / 3600
         return round(hours, 2)
     else:
         return 'N/A'
@@ -0,0 +1,97 @@
+from io import StringIO
+
+import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from project.models import Project
+from stats.models import ComputeDaily, ComputeMonthly, StorageWeekly
+
+
+class BenchmarkStatsCommandTest(TestCase):
+
+    fixtures = [
+        'users/fixtures/tests/users.json',
+        'project/fixtures/tests/funding_sources.json',
+        'project/fixtures/tests/categories.json',
+        'project/fixtures/tests/projects.json',
+        'project/fixtures/tests/memberships.json',
+        'system/fixtures/access_methods.json',
+        'system/fixtures/applications.json',
+        'system/fixtures/systems.json',
+        'system/fixtures/os.json',
+        'system/fixtures/hardware_groups.json',
+        'system/fixtures/partitions.json',
+    ]
+
+    def test_benchmark_stats(self):
+        '''
+        Ensure the parser methods are timed with and without the stats
+        indexes, and the seeded data is rolled back.
+        '''
+        out = StringIO()
+        call_command(
+            'benchmark_stats',
+            f'-p={Project.objects.first().code}',
+            '--years=1',
+            '--projects=2',
+            '--repeat=1',
+            '--explain',
+            stdout=out,
+        )
+        output = out.getvalue()
+        self.assertIn('Seeded', output)
+        self.assertIn('-- Without indexes', output)
+        self.assertIn('-- With indexes', output)
+        self.assertIn('build_project_stats: 4 queries', output)
+        self.assertNotIn('Error', output)
+
+        self.assertFalse(ComputeDaily.objects.exists())
+        self.assertFalse(ComputeMonthly.objects.exists())
+        self.assertFalse(StorageWeekly.objects.exists())
+
+    def test_benchmark_stats_without_transactional_ddl(self):
+        '''
+        Ensure the run without indexes is only made on databases that commit
+        schema changes when asked to, and that the seeded data is then
+        deleted.
+        '''
+        set_indexes = 'stats.management.commands.benchmark_stats.Command.set_indexes'
+        # The test's transaction prohibits schema changes when they can't be
+        # rolled back, so the indexes are left in place.
+        with mock.patch.object(connection.features, 'can_rollback_ddl', False), \
+                mock.patch(set_indexes) as set_indexes_mock:
+            out = StringIO()
+            call_command('benchmark_stats', f'-p={Project.objects.first().code}', '--years=1', '--repeat=1', stdout=out)
+            self.assertIn('Skipping the run without indexes', out.getvalue())
+            self.assertNotIn('-- Without indexes', out.getvalue())
+            self.assertIn('-- With indexes', out.getvalue())
+            set_indexes_mock.assert_not_called()
+
+            out = StringIO()
+            call_command(
+                'benchmark_stats',
+                f'-p={Project.objects.first().code}',
+                '--years=1',
+                '--repeat=1',
+                '--without-indexes',
+                stdout=out,
+            )
+            self.assertIn('-- Without indexes', out.getvalue())
+            self.assertIn('-- With indexes', out.getvalue())
+            self.assertEqual(set_indexes_mock.call_args_list, [mock.call(add=False), mock.call(add=True)])
+
+        self.assertFalse(ComputeDaily.objects.exists())
+        self.assertFalse(ComputeMonthly.objects.exists())
+        self.assertFalse(StorageWeekly.objects.exists())
+
+    def test_invalid_project_code(self):
+        '''
+        Ensure an error is displayed to the user if the project doesn't exist.
+        '''
+        out = StringIO()
+        err = StringIO()
+        call_command('benchmark_stats', '-p=invalid', stdout=out, stderr=err)
+        self.assertIn('Project matching query does not exist.', err.getvalue())
+        self.assertEqual(out.getvalue(), '')
@@ -0,0 +1,116 @@
+import json
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import F
+from django.test import RequestFactory, TestCase, override_settings
+from stats.cache import bump_stats_version, cached_stats, get_stats_version
+from stats.models import ComputeDaily
+from stats.views import ProjectStatsParserJSONView
+from users.models import CustomUser
+
+
+# The test's cache stands in for the shared cache
+@override_settings(CACHE_URL='redis://redis:6379/1')
+class StatsCacheTest(TestCase):
+
+    fixtures = [
+        'users/fixtures/tests/users.json',
+        'project/fixtures/tests/funding_sources.json',
+        'project/fixtures/tests/categories.json',
+        'project/fixtures/tests/projects.json',
+        'project/fixtures/tests/memberships.json',
+        'system/fixtures/access_methods.json',
+        'system/fixtures/applications.json',
+        'system/fixtures/systems.json',
+        'system/fixtures/os.json',
+        'system/fixtures/hardware_groups.json',
+        'system/fixtures/partitions.json',
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def _import(self, day):
+        call_command(
+            'import_daily_compute',
+            '-f=/app/stats/tests/hawk_10_2020.out',
+            f'-d {day}',
+            '-m 10',
+            '-y 2020',
+            '-s CF',
+            stdout=StringIO(),
+        )
+
+    def test_cached_stats(self):
+        '''
+        Ensure a response is built once per key until the stats version is
+        bumped.
+        '''
+        calls = []
+
+        def build():
+            calls.append(None)
+            return {'calls': len(calls)}
+
+        self.assertEqual(cached_stats('endpoint', ['scw0000', 'all'], build), {'calls': 1})
+        self.assertEqual(cached_stats('endpoint', ['scw0000', 'all'], build), {'calls': 1})
+        self.assertEqual(cached_stats('endpoint', ['scw1000', 'all'], build), {'calls': 2})
+
+        bump_stats_version()
+        self.assertEqual(cached_stats('endpoint', ['scw0000', 'all'], build), {'calls': 3})
+
+    @override_settings(CACHE_URL=None)
+    def test_stats_not_cached_without_shared_cache(self):
+        '''
+        Ensure responses aren't cached in a per-process cache, where the
+        imports can't invalidate them.
+        '''
+        calls = []
+
+        def build():
+            calls.append(None)
+            return {'calls': len(calls)}
+
+        self.assertEqual(cached_stats('endpoint', ['scw0000', 'all'], build), {'calls': 1})
+        self.assertEqual(cached_stats('endpoint', ['scw0000', 'all'], build), {'calls': 2})
+
+    def test_import_bumps_version(self):
+        '''
+        Ensure importing compute stats invalidates the cached responses.
+        '''
+        version = get_stats_version()
+        self._import(1)
+        self.assertNotEqual(get_stats_version(), version)
+
+    def test_project_stats_json_view(self):
+        '''
+        Ensure repeat chart loads are served from the cache until the stats
+        are rewritten.
+        '''
+        self._import(1)
+        project = ComputeDaily.objects.first().project
+        request = RequestFactory().get(
+            '/stats/project-stats',
+            {'code': project.code, 'start_date': '2020-10-01', 'end_date': '2020-10-31'},
+        )
+        request.user = CustomUser.objects.get(is_staff=True)
+
+        data = json.loads(ProjectStatsParserJSONView(request).content)
+        self.assertTrue(data['rate_of_usage']['dates'])
+        # Project and overview stats only
+        with self.assertNumQueries(4):
+            self.assertEqual(json.loads(ProjectStatsParserJSONView(request).content), data)
+
+        # Edits outside the import commands are not seen until the rollup is
+        # rebuilt
+        ComputeDaily.objects.filter(project=project).update(number_jobs=F('number_jobs') + 1)
+        self.assertEqual(json.loads(ProjectStatsParserJSONView(request).content), data)
+        call_command('rebuild_compute_monthly', stdout=StringIO())
+        refreshed = json.loads(ProjectStatsParserJSONView(request).content)
+        self.assertEqual(
+            refreshed['num_jobs_per_month']['number_jobs_in_date_range'],
+            data['num_jobs_per_month']['number_jobs_in_date_range'] + ComputeDaily.objects.filter(project=project).count(),
+        )
@@ -0,0 +1,62 @@
+import datetime
+
+from django.test import TestCase
+from project.models import Project
+from stats.management.commands.util import ComputeDailyBulkImporter
+from stats.models import ComputeDaily, ComputeMonthly
+from system.models import Application, AccessMethod, Partition
+from users.models import Profile
+
+
+class ComputeDailyBulkImporterTest(TestCase):
+
+    fixtures = [
+        'users/fixtures/tests/users.json',
+        'project/fixtures/tests/funding_sources.json',
+        'project/fixtures/tests/categories.json',
+        'project/fixtures/tests/projects.json',
+        'system/fixtures/access_methods.json',
+        'system/fixtures/applications.json',
+        'system/fixtures/systems.json',
+        'system/fixtures/os.json',
+        'system/fixtures/hardware_groups.json',
+        'system/fixtures/partitions.json',
+    ]
+
+    def test_negative_wait_time(self):
+        '''
+        Ensure a job recorded as starting before it was submitted, giving a
+        negative wait time, is written along with the rest of the day.
+        '''
+        importer = ComputeDailyBulkImporter(datetime.date(2020, 10, 1))
+        dimensions = {
+            'user': Profile.objects.get(scw_username='e.shibboleth.user').user,
+            'project': Project.objects.get(code='scw1124'),
+            'partition': Partition.objects.get(name='CF-htc'),
+            'application': Application.objects.get(name='Default'),
+            'access_method': AccessMethod.objects.get(name='SSH'),
+        }
+        importer.add(
+            number_processors=1,
+            number_jobs=1,
+            wait_time=datetime.timedelta(seconds=-5),
+            cpu_time=datetime.timedelta(seconds=10),
+            wall_time=datetime.timedelta(seconds=20),
+            **dimensions,
+        )
+        importer.add(
+            number_processors=2,
+            number_jobs=1,
+            wait_time=datetime.timedelta(seconds=3),
+            cpu_time=datetime.timedelta(seconds=10),
+            wall_time=datetime.timedelta(seconds=20),
+            **dimensions,
+        )
+        created, updated = importer.save()
+
+        self.assertEqual(len(created), 2)
+        self.assertEqual(
+            sorted(ComputeDaily.objects.values_list('number_processors', 'wait_time')),
+            [(1, -5), (2, 3)],
+        )
+        self.assertEqual(ComputeMonthly.objects.get().wait_time, -2)
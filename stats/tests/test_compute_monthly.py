@@ -0,0 +1,151 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth
+from django.test import SimpleTestCase, TestCase
+from project.models import Project
+from stats.models import ComputeDaily, ComputeMonthly
+from stats.parsers.project_stats_parser import ProjectStatsParser
+from stats.parsers.util import split_date_range_by_month
+
+
+class ComputeMonthlyTest(TestCase):
+
+    fixtures = [
+        'users/fixtures/tests/users.json',
+        'project/fixtures/tests/funding_sources.json',
+        'project/fixtures/tests/categories.json',
+        'project/fixtures/tests/projects.json',
+        'project/fixtures/tests/memberships.json',
+        'system/fixtures/access_methods.json',
+        'system/fixtures/applications.json',
+        'system/fixtures/systems.json',
+        'system/fixtures/os.json',
+        'system/fixtures/hardware_groups.json',
+        'system/fixtures/partitions.json',
+    ]
+
+    def setUp(self):
+        for day in (1, 2):
+            call_command(
+                'import_daily_compute',
+                '-f=/app/stats/tests/hawk_10_2020.out',
+                f'-d {day}',
+                '-m 10',
+                '-y 2020',
+                '-s CF',
+                stdout=StringIO(),
+            )
+
+    def _totals(self, queryset, date_field, total_processors):
+        return sorted(
+            queryset.annotate(period=TruncMonth(date_field)).values(
+                'period',
+                'project',
+                'user',
+                'partition',
+            ).annotate(
+                number_jobs_sum=Sum('number_jobs'),
+                total_processors_sum=total_processors,
+                wait_time_sum=Sum('wait_time'),
+                cpu_time_sum=Sum('cpu_time'),
+                wall_time_sum=Sum('wall_time'),
+            ).values_list(
+                'period',
+                'project',
+                'user',
+                'partition',
+                'number_jobs_sum',
+                'total_processors_sum',
+                'wait_time_sum',
+                'cpu_time_sum',
+                'wall_time_sum',
+            ).order_by(),
+            key=str,
+        )
+
+    def _assert_rollup_matches_daily(self):
+        self.assertEqual(
+            self._totals(ComputeDaily.objects.all(), 'date', Sum(F('number_jobs') * F('number_processors'))),
+            self._totals(ComputeMonthly.objects.all(), 'month', Sum('total_processors')),
+        )
+
+    def test_import_refreshes_rollup(self):
+        '''
+        Ensure the daily import keeps the monthly rollup in step with the
+        daily stats.
+        '''
+        self.assertTrue(ComputeMonthly.objects.exists())
+        self._assert_rollup_matches_daily()
+
+    def test_rebuild_command(self):
+        '''
+        Ensure the rebuild command recreates the monthly rollup from the
+        daily stats.
+        '''
+        ComputeMonthly.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_compute_monthly', stdout=out)
+        self.assertIn(f'END - {ComputeMonthly.objects.count()} compute monthly records', out.getvalue())
+        self._assert_rollup_matches_daily()
+
+        out = StringIO()
+        call_command('rebuild_compute_monthly', '-m 10', stdout=out)
+        self.assertIn('-m and -y must be supplied together.', out.getvalue())
+
+    def test_compute_per_month_matches_daily(self):
+        '''
+        Ensure the project stats parser returns the same monthly totals as
+        summing the daily stats, for part and whole month ranges.
+        '''
+        project = ComputeDaily.objects.values_list('project', flat=True).first()
+        project = Project.objects.get(id=project)
+        for start_date, end_date in (
+            (datetime.date(2020, 10, 2), datetime.date(2020, 10, 2)),
+            (datetime.date(2020, 9, 15), datetime.date(2020, 11, 30)),
+        ):
+            parser = ProjectStatsParser(project, 'all', start_date, end_date)
+            expected = ComputeDaily.objects.filter(
+                project=project,
+                date__range=[parser.start_date, parser.end_date],
+            ).annotate(month=TruncMonth('date')).values('month').annotate(
+                number_jobs_sum=Sum('number_jobs'),
+                total_processors_sum=Sum(F('number_jobs') * F('number_processors')),
+                wait_time_sum=Sum('wait_time'),
+                cpu_time_sum=Sum('cpu_time'),
+                wall_time_sum=Sum('wall_time'),
+            ).order_by('month')
+            expected = [{key.replace('_sum', ''): value for key, value in row.items()} for row in expected]
+            self.assertTrue(expected)
+            self.assertEqual(parser._compute_per_month(parser.start_date, parser.end_date), expected)
+
+
+class SplitDateRangeByMonthTest(SimpleTestCase):
+
+    def test_split_date_range_by_month(self):
+        '''
+        Ensure a date range is split into the whole months it covers and the
+        part months at either end.
+        '''
+        date = datetime.date
+        self.assertEqual(
+            split_date_range_by_month(date(2020, 9, 15), date(2020, 12, 10)),
+            (
+                (date(2020, 10, 1), date(2020, 11, 1)),
+                [(date(2020, 9, 15), date(2020, 9, 30)), (date(2020, 12, 1), date(2020, 12, 10))],
+            ),
+        )
+        self.assertEqual(
+            split_date_range_by_month(datetime.datetime(2020, 10, 1), datetime.datetime(2020, 10, 31)),
+            ((date(2020, 10, 1), date(2020, 10, 1)), []),
+        )
+        self.assertEqual(
+            split_date_range_by_month(date(2020, 10, 2), date(2020, 10, 30)),
+            (None, [(date(2020, 10, 2), date(2020, 10, 30))]),
+        )
+        self.assertEqual(
+            split_date_range_by_month(date(2020, 10, 20), date(2020, 11, 10)),
+            (None, [(date(2020, 10, 20), date(2020, 11, 10))]),
+        )
@@ -0,0 +1,55 @@
+import datetime
+import types
+
+from django.test import SimpleTestCase
+from stats.slurm.DailyStatSparseArray import DailyStatSparseArray
+
+
+class DailyStatSparseArrayTest(SimpleTestCase):
+
+    def test_add_aggregates_matching_dimensions(self):
+        '''
+        Ensure values added for the same dimensions are summed.
+        '''
+        stats = DailyStatSparseArray()
+        for __ in range(3):
+            stats.Add(
+                'c.user',
+                'scw1124',
+                'SSH',
+                'Default',
+                '4',
+                'htc',
+                vNJobs=1,
+                vWaitTime=datetime.timedelta(seconds=10),
+                vCPUTime=datetime.timedelta(minutes=1),
+                vWallTime=datetime.timedelta(hours=1),
+            )
+        stats.Add('c.user', 'scw1124', 'SSH', 'Default', '8', 'htc', vNJobs=2, vWallTime=120)
+
+        self.assertEqual(stats.getSize(), 5)
+        self.assertEqual(len(stats), 2)
+        self.assertEqual(
+            list(stats)[0], {
+                'userName': 'c.user',
+                'projectCode': 'scw1124',
+                'subMethod': 'SSH',
+                'execApp': 'Default',
+                'execNCPU': '4',
+                'execQueue': 'htc',
+                'nJobs': 3,
+                'waitTime': datetime.timedelta(seconds=30),
+                'cpuTime': datetime.timedelta(minutes=3),
+                'wallTime': datetime.timedelta(hours=3),
+            }
+        )
+        self.assertEqual(list(stats)[1]['wallTime'], datetime.timedelta(minutes=2))
+
+    def test_iteration_is_lazy(self):
+        '''
+        Ensure iterating returns a generator rather than a prebuilt list.
+        '''
+        stats = DailyStatSparseArray()
+        self.assertIsInstance(iter(stats), types.GeneratorType)
+        self.assertEqual(list(stats), [])
+        self.assertEqual(stats.getSize(), 0)
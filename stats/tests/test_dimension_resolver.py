@@ -0,0 +1,62 @@
+from django.test import TestCase
+from project.models import Project
+from stats.management.commands.util import DimensionResolver
+from users.models import Profile
+
+
+class DimensionResolverTest(TestCase):
+
+    fixtures = [
+        'users/fixtures/tests/users.json',
+        'project/fixtures/tests/funding_sources.json',
+        'project/fixtures/tests/categories.json',
+        'project/fixtures/tests/projects.json',
+        'system/fixtures/access_methods.json',
+        'system/fixtures/applications.json',
+        'system/fixtures/systems.json',
+        'system/fixtures/os.json',
+        'system/fixtures/hardware_groups.json',
+        'system/fixtures/partitions.json',
+    ]
+
+    def test_case_insensitive_lookups(self):
+        '''
+        Ensure dimension records are matched regardless of case.
+        '''
+        resolver = DimensionResolver()
+        profile = Profile.objects.get(scw_username='e.shibboleth.user')
+        self.assertEqual(resolver.get('user', 'E.Shibboleth.User'), profile.user)
+        self.assertEqual(resolver.get('project', 'SCW1124'), Project.objects.get(code='scw1124'))
+        self.assertEqual(resolver.get('access_method', 'ssh').name, 'SSH')
+        self.assertEqual(resolver.get('partition', 'cf-HTC').name, 'CF-htc')
+
+    def test_tables_are_loaded_once(self):
+        '''
+        Ensure repeated lookups do not query the database.
+        '''
+        resolver = DimensionResolver()
+        resolver.get('project', 'scw1124')
+        with self.assertNumQueries(0):
+            for __ in range(10):
+                resolver.get('project', 'scw1124')
+                resolver.get('project', 'scw9999')
+
+    def test_misses_are_reported_once(self):
+        '''
+        Ensure a missing name is only flagged the first time it is seen.
+        '''
+        resolver = DimensionResolver()
+        self.assertIsNone(resolver.get('user', 'unknown.user'))
+        self.assertTrue(resolver.is_new_miss('user', 'unknown.user'))
+        self.assertFalse(resolver.is_new_miss('user', 'Unknown.User'))
+
+    def test_add(self):
+        '''
+        Ensure records created during an import can be registered.
+        '''
+        resolver = DimensionResolver()
+        project = Project.objects.get(code='scw1124')
+        resolver.is_new_miss('project', 'new-code')
+        resolver.add('project', 'NEW-CODE', project)
+        self.assertEqual(resolver.get('project', 'new-code'), project)
+        self.assertTrue(resolver.is_new_miss('project', 'other-code'))
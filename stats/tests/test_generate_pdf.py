@@ -0,0 +1,125 @@
+from io import StringIO
+
+import mock
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from stats.models import ComputeDaily
+from stats.views import generate_project_pdf
+from users.models import CustomUser
+
+
+# The test's cache stands in for the shared cache
+@override_settings(CACHE_URL='redis://redis:6379/1')
+@mock.patch('stats.views.HTML')
+class GeneratePDFTest(TestCase):
+
+    fixtures = [
+        'users/fixtures/tests/users.json',
+        'project/fixtures/tests/funding_sources.json',
+        'project/fixtures/tests/categories.json',
+        'project/fixtures/tests/projects.json',
+        'project/fixtures/tests/memberships.json',
+        'system/fixtures/access_methods.json',
+        'system/fixtures/applications.json',
+        'system/fixtures/systems.json',
+        'system/fixtures/os.json',
+        'system/fixtures/hardware_groups.json',
+        'system/fixtures/partitions.json',
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        call_command(
+            'import_daily_compute',
+            '-f=/app/stats/tests/hawk_10_2020.out',
+            '-d 1',
+            '-m 10',
+            '-y 2020',
+            '-s CF',
+            stdout=StringIO(),
+        )
+        self.project = ComputeDaily.objects.first().project
+        self.url = reverse('data-analytics-generate-pdf')
+        self.params = {'code': self.project.code, 'start_date': '2020-10-01', 'end_date': '2020-10-31'}
+        self.client.force_login(CustomUser.objects.get(is_staff=True))
+
+    def test_pdf_rendered_in_memory(self, mock_html):
+        '''
+        Ensure the PDF is rendered in memory, returned as an attachment and
+        cached for repeat requests.
+        '''
+        mock_html.return_value.write_pdf.return_value = b'%PDF-1.7'
+        response = self.client.get(self.url, self.params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="{self.project.code}.pdf"')
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.7')
+        mock_html.return_value.write_pdf.assert_called_once_with()
+
+        response = self.client.get(self.url, self.params)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.7')
+        self.assertEqual(mock_html.return_value.write_pdf.call_count, 1)
+
+    @override_settings(DATA_ANALYTICS_PDF_ASYNC_RECORDS=1)
+    @mock.patch('stats.views.generate_project_pdf.delay')
+    @mock.patch('stats.views.django_rq.get_queue')
+    def test_large_pdf_rendered_by_worker(self, mock_get_queue, mock_delay, mock_html):
+        '''
+        Ensure large projects have their PDF rendered by a worker while the
+        client polls for it.
+        '''
+        mock_html.return_value.write_pdf.return_value = b'%PDF-1.7'
+        mock_get_queue.return_value.fetch_job.return_value = None
+        response = self.client.get(self.url, self.params)
+        self.assertEqual(response.status_code, 202)
+        self.assertContains(response, 'http-equiv="refresh"', status_code=202)
+        self.assertEqual(mock_delay.call_count, 1)
+        mock_html.return_value.write_pdf.assert_not_called()
+
+        # Don't queue the job again while it is pending
+        mock_get_queue.return_value.fetch_job.return_value = mock.Mock(is_failed=False, is_finished=False)
+        self.assertEqual(self.client.get(self.url, self.params).status_code, 202)
+        self.assertEqual(mock_delay.call_count, 1)
+
+        # Run the job in a worker, with a cache of its own, then return the
+        # job's PDF
+        args, kwargs = mock_delay.call_args
+        self.assertTrue(kwargs['job_id'].startswith('project-pdf-'))
+        with mock.patch('stats.views.cache', LocMemCache('worker', {})):
+            pdf = generate_project_pdf(*args)
+        finished_job = mock.Mock(is_failed=False, is_finished=True)
+        finished_job.return_value.return_value = pdf
+        mock_get_queue.return_value.fetch_job.return_value = finished_job
+        response = self.client.get(self.url, self.params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.7')
+        finished_job.delete.assert_called_once_with()
+
+        # The PDF is cached, rather than rendered again
+        mock_get_queue.return_value.fetch_job.return_value = None
+        response = self.client.get(self.url, self.params)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.7')
+        self.assertEqual(mock_delay.call_count, 1)
+
+    @override_settings(DATA_ANALYTICS_PDF_ASYNC_RECORDS=1, CACHE_URL=None)
+    @mock.patch('stats.views.generate_project_pdf.delay')
+    @mock.patch('stats.views.django_rq.get_queue')
+    def test_large_pdf_without_shared_cache(self, mock_get_queue, mock_delay, mock_html):
+        '''
+        Ensure the PDF of a finished job is returned without a shared cache,
+        and rendered again for the next request.
+        '''
+        finished_job = mock.Mock(is_failed=False, is_finished=True)
+        finished_job.return_value.return_value = b'%PDF-1.7'
+        mock_get_queue.return_value.fetch_job.return_value = finished_job
+        response = self.client.get(self.url, self.params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.7')
+        mock_delay.assert_not_called()
+
+        mock_get_queue.return_value.fetch_job.return_value = None
+        self.assertEqual(self.client.get(self.url, self.params).status_code, 202)
+        self.assertEqual(mock_delay.call_count, 1)
@@ -1,3 +1,4 @@
+import datetime
 from io import StringIO
 
 from django.core.management import call_command
@@ -151,9 +152,9 @@ class ImportDailyComputeTest(TestCase):
         self.assertEqual(record.partition.name, 'CF-htc')
         self.assertEqual(record.application.name, 'Default')
         self.assertEqual(record.access_method.name, 'SSH')
-        self.assertEqual(str(record.wait_time), '5 days, 5:44:24')
-        self.assertEqual(str(record.cpu_time), '0:00:10')
-        self.assertEqual(str(record.wall_time), '0:10:20')
+        self.assertEqual(str(datetime.timedelta(seconds=record.wait_time)), '5 days, 5:44:24')
+        self.assertEqual(str(datetime.timedelta(seconds=record.cpu_time)), '0:00:10')
+        self.assertEqual(str(datetime.timedelta(seconds=record.wall_time)), '0:10:20')
 
     def test_valid_statsfile_for_02_10_2020(self):
         '''
@@ -189,6 +190,29 @@ class ImportDailyComputeTest(TestCase):
         self.assertEqual(record.partition.name, 'CF-htc')
         self.assertEqual(record.application.name, 'Default')
         self.assertEqual(record.access_method.name, 'SSH')
-        self.assertEqual(str(record.wait_time), '0:00:20')
-        self.assertEqual(str(record.cpu_time), '29 days, 22:12:35')
-        self.assertEqual(str(record.wall_time), '30 days, 0:01:50')
+        self.assertEqual(str(datetime.timedelta(seconds=record.wait_time)), '0:00:20')
+        self.assertEqual(str(datetime.timedelta(seconds=record.cpu_time)), '29 days, 22:12:35')
+        self.assertEqual(str(datetime.timedelta(seconds=record.wall_time)), '30 days, 0:01:50')
+
+    def test_reimport_updates_existing_records(self):
+        '''
+        Ensure re-importing a stats file updates the existing records rather
+        than creating duplicates.
+        '''
+        for __ in range(2):
+            out = StringIO()
+            call_command(
+                'import_daily_compute',
+                '-f=/app/stats/tests/hawk_10_2020.out',
+                '-d 31',
+                '-m 10',
+                '-y 2020',
+                '-s CF',
+                stdout=out,
+            )
+        self.assertIn('END - 0 new records, 1 updated records', out.getvalue())
+        self.assertIn(
+            'INFO: Updated: 1 2020-10-31 00:00:00 Aaron Owen (issa16@cardiff.ac.uk) scw1124 CF-htc Default SSH 20 5 days, 5:44:24 0:00:10 0:10:20 5',
+            out.getvalue()
+        )
+        self.assertEqual(ComputeDaily.objects.count(), 1)
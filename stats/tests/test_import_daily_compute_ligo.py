@@ -1,3 +1,4 @@
+import datetime
 from io import StringIO
 
 from django.core.management import call_command
@@ -142,9 +143,9 @@ class ImportDailyComputeLIGOTest(TestCase):
         self.assertEqual(record.partition.name, 'CF-c_compute_ligo1')
         self.assertEqual(record.application.name, 'cbc.grb.cohptfoffline')
         self.assertEqual(record.access_method.name, 'CONDOR')
-        self.assertEqual(str(record.wait_time), '34 days, 12:40:37')
-        self.assertEqual(str(record.cpu_time), '556 days, 16:47:56')
-        self.assertEqual(str(record.wall_time), '567 days, 15:48:22')
+        self.assertEqual(str(datetime.timedelta(seconds=record.wait_time)), '34 days, 12:40:37')
+        self.assertEqual(str(datetime.timedelta(seconds=record.cpu_time)), '556 days, 16:47:56')
+        self.assertEqual(str(datetime.timedelta(seconds=record.wall_time)), '567 days, 15:48:22')
 
         # Check second record
         record = ComputeDaily.objects.all().last()
@@ -156,6 +157,6 @@ class ImportDailyComputeLIGOTest(TestCase):
         self.assertEqual(record.partition.name, 'CF-c_compute_ligo2')
         self.assertEqual(record.application.name, 'cbc.grb.cohptfoffline')
         self.assertEqual(record.access_method.name, 'CONDOR')
-        self.assertEqual(str(record.wait_time), '1 day, 0:59:33')
-        self.assertEqual(str(record.cpu_time), '26 days, 9:06:36')
-        self.assertEqual(str(record.wall_time), '26 days, 17:51:40')
+        self.assertEqual(str(datetime.timedelta(seconds=record.wait_time)), '1 day, 0:59:33')
+        self.assertEqual(str(datetime.timedelta(seconds=record.cpu_time)), '26 days, 9:06:36')
+        self.assertEqual(str(datetime.timedelta(seconds=record.wall_time)), '26 days, 17:51:40')
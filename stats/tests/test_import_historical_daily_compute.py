@@ -0,0 +1,109 @@
+import bz2
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from stats.management.commands.util import run_in_workers
+from stats.models import ComputeDaily
+
+STATS_FILE = os.path.join(os.path.dirname(__file__), 'hawk_10_2020.out')
+
+
+class ImportHistoricalDailyComputeTest(TestCase):
+
+    fixtures = [
+        'users/fixtures/tests/users.json',
+        'project/fixtures/tests/funding_sources.json',
+        'project/fixtures/tests/categories.json',
+        'project/fixtures/tests/projects.json',
+        'project/fixtures/tests/memberships.json',
+        'system/fixtures/access_methods.json',
+        'system/fixtures/applications.json',
+        'system/fixtures/systems.json',
+        'system/fixtures/os.json',
+        'system/fixtures/hardware_groups.json',
+        'system/fixtures/partitions.json',
+    ]
+
+    def setUp(self):
+        self.input_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.input_dir)
+        with open(STATS_FILE, 'rb') as src, bz2.open(os.path.join(self.input_dir, 'hawk_10_2020.out.bz2'), 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+
+    def _records(self):
+        return sorted(
+            ComputeDaily.objects.values_list(
+                'date',
+                'user',
+                'project',
+                'partition',
+                'application',
+                'access_method',
+                'number_processors',
+                'number_jobs',
+                'wait_time',
+                'cpu_time',
+                'wall_time',
+            )
+        )
+
+    def test_invalid_workers_value(self):
+        '''
+        Ensure an error is displayed to the user if the number of workers is
+        invalid.
+        '''
+        err = StringIO()
+        call_command(
+            'import_historical_daily_compute',
+            f'--input_dir={self.input_dir}',
+            '--workers=0',
+            stdout=StringIO(),
+            stderr=err,
+        )
+        self.assertIn('--workers must be at least 1.', err.getvalue())
+
+    def test_matches_daily_import(self):
+        '''
+        Ensure importing an archive writes the same records as running the
+        daily import over the extracted file.
+        '''
+        out = StringIO()
+        call_command(
+            'import_historical_daily_compute',
+            f'--input_dir={self.input_dir}',
+            stdout=out,
+        )
+        self.assertIn('Finished processing bz2 files.', out.getvalue())
+        self.assertEqual(os.listdir(self.input_dir), ['hawk_10_2020.out.bz2'])
+        records = self._records()
+        self.assertTrue(records)
+
+        ComputeDaily.objects.all().delete()
+        call_command(
+            'import_daily_compute',
+            f'-f={STATS_FILE}',
+            '-d 1',
+            '-m 10',
+            '-y 2020',
+            '-s CF',
+            stdout=StringIO(),
+        )
+        self.assertEqual(records, self._records())
+
+
+class RunInWorkersTest(SimpleTestCase):
+
+    def test_results_in_order(self):
+        '''
+        Ensure results and errors are returned in the order of the items,
+        with or without worker processes.
+        '''
+        for workers in (1, 2):
+            results = list(run_in_workers(int, ['1', 'x', '3'], workers))
+            self.assertEqual([item for item, result, error in results], ['1', 'x', '3'])
+            self.assertEqual([result for item, result, error in results], [1, None, 3])
+            self.assertIsInstance(results[1][2], ValueError)
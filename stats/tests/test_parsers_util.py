@@ -0,0 +1,58 @@
+import datetime
+
+import pandas as pd
+from django.test import SimpleTestCase
+from stats.parsers.util import (
+    efficiencies,
+    month_labels,
+    parse_efficiency_result_set,
+    result_set_frame,
+    seconds_to_hours,
+)
+
+
+class ParsersUtilTest(SimpleTestCase):
+
+    def setUp(self):
+        self.result_set = [
+            {'month': datetime.date(2020, 9, 1), 'cpu_time_sum': 1800, 'wall_time_sum': 3600},
+            {'month': datetime.date(2020, 10, 1), 'cpu_time_sum': 0, 'wall_time_sum': 0},
+            {'month': datetime.date(2020, 11, 1), 'cpu_time_sum': None, 'wall_time_sum': 7200},
+            {'month': datetime.date(2020, 12, 1), 'cpu_time_sum': 7200, 'wall_time_sum': 9000},
+        ]
+
+    def test_result_set_frame(self):
+        '''
+        Ensure result sets and frames are returned as frames of the given
+        columns.
+        '''
+        frame = result_set_frame(self.result_set, ['month', 'wall_time_sum'])
+        self.assertEqual(list(frame.columns), ['month', 'wall_time_sum'])
+        self.assertEqual(frame['wall_time_sum'].tolist(), [3600, 0, 7200, 9000])
+        self.assertEqual(result_set_frame(frame[frame['wall_time_sum'] > 0], ['wall_time_sum']).index.tolist(), [0, 1, 2])
+        self.assertEqual(len(result_set_frame([], ['month'])), 0)
+
+    def test_month_labels(self):
+        '''
+        Ensure months are labelled by name and year.
+        '''
+        months = [row['month'] for row in self.result_set]
+        self.assertEqual(month_labels(months), ['Sep 2020', 'Oct 2020', 'Nov 2020', 'Dec 2020'])
+        self.assertEqual(month_labels(pd.Series([], dtype=object)), [])
+
+    def test_seconds_to_hours(self):
+        '''
+        Ensure numbers and columns of seconds are converted to rounded hours.
+        '''
+        self.assertEqual(seconds_to_hours(5400), 1.5)
+        self.assertEqual(seconds_to_hours(pd.Series([3600, 100, None])).tolist()[:2], [1.0, 0.03])
+
+    def test_efficiencies(self):
+        '''
+        Ensure efficiencies are only calculated for rows with wall time.
+        '''
+        frame = result_set_frame(self.result_set, ['cpu_time_sum', 'wall_time_sum'])
+        efficiency, valid = efficiencies(frame['cpu_time_sum'], frame['wall_time_sum'])
+        self.assertEqual(efficiency.tolist(), [50.0, 80.0])
+        self.assertEqual(valid.tolist(), [True, False, False, True])
+        self.assertEqual(parse_efficiency_result_set(self.result_set), (['Sep 2020', 'Dec 2020'], [50.0, 80.0]))
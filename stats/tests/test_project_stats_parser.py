@@ -0,0 +1,204 @@
+import datetime
+import json
+from io import StringIO
+
+from dateutil.relativedelta import relativedelta
+from django.core.management import call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max
+from django.test import TestCase
+from project.models import Project, ProjectUserMembership
+from stats.models import ComputeDaily
+from stats.parsers.project_stats_parser import ProjectStatsParser
+from stats.views import build_project_stats
+from system.models import Partition
+from users.models import CustomUser
+
+
+class ProjectStatsParserTest(TestCase):
+
+    fixtures = [
+        'users/fixtures/tests/users.json',
+        'project/fixtures/tests/funding_sources.json',
+        'project/fixtures/tests/categories.json',
+        'project/fixtures/tests/projects.json',
+        'project/fixtures/tests/memberships.json',
+        'system/fixtures/access_methods.json',
+        'system/fixtures/applications.json',
+        'system/fixtures/systems.json',
+        'system/fixtures/os.json',
+        'system/fixtures/hardware_groups.json',
+        'system/fixtures/partitions.json',
+    ]
+
+    def setUp(self):
+        for day in (1, 2):
+            call_command(
+                'import_daily_compute',
+                '-f=/app/stats/tests/hawk_10_2020.out',
+                f'-d {day}',
+                '-m 10',
+                '-y 2020',
+                '-s CF',
+                stdout=StringIO(),
+            )
+        project = ComputeDaily.objects.values_list('project', flat=True).first()
+        self.project = Project.objects.get(id=project)
+
+    def test_compute_stats_matches_chart_methods(self):
+        '''
+        Ensure the combined compute stats match the stats of the individual
+        chart methods, for part and whole month date ranges.
+        '''
+        partition = ComputeDaily.objects.filter(project=self.project).values_list('partition', flat=True).first()
+        for partition_filter in ('all', 'core', str(partition)):
+            for start_date, end_date in (
+                (datetime.date(2020, 10, 2), datetime.date(2020, 10, 2)),
+                (datetime.date(2020, 9, 15), datetime.date(2020, 11, 30)),
+                (datetime.date(2019, 1, 1), datetime.date(2019, 2, 1)),
+            ):
+                parser = ProjectStatsParser(self.project, partition_filter, start_date, end_date)
+                data = parser.compute_stats()
+                self.assertEqual(data['efficiency'], parser.efficiency())
+                self.assertEqual(data['rate_of_usage'], parser.rate_of_usage())
+                self.assertEqual(data['cumulative_total_usage'], parser.cumulative_total_usage())
+                self.assertEqual(data['top_users_usage'], parser.top_users_usage())
+                self.assertEqual(data['usage_by_partition'], parser.usage_by_partition())
+                self.assertEqual(data['efficiency_per_month'], parser.efficiency_per_month())
+                self.assertEqual(data['num_jobs_per_month'], parser.num_jobs_per_month())
+                self.assertEqual(data['per_job_avg_stats'], parser.per_job_avg_stats())
+                self.assertEqual(data['core_count_node_utilisation'], parser.core_count_node_utilisation())
+                self.assertEqual(data['disk_space'], parser.disk_space())
+                self.assertEqual(data['file_count'], parser.file_count())
+                json.dumps(data, cls=DjangoJSONEncoder)
+
+    def test_compute_stats_queries(self):
+        '''
+        Ensure the combined compute stats are built from one query per stats
+        table.
+        '''
+        parser = ProjectStatsParser(self.project, 'all', datetime.date(2020, 9, 15), datetime.date(2020, 11, 30))
+        # Partition ids, ComputeMonthly, ComputeDaily and StorageWeekly
+        with self.assertNumQueries(4):
+            parser.compute_stats()
+
+    def test_build_project_stats(self):
+        '''
+        Ensure the project overview stats match the per partition type stats,
+        with one query per date range.
+        '''
+        parser = ProjectStatsParser(self.project, 'all', datetime.date(2020, 10, 2), datetime.date(2020, 10, 2))
+        # Totals, partition stats in date range and to present, and storage
+        with self.assertNumQueries(4):
+            data = build_project_stats(parser, {})
+
+        self.assertEqual(data['total_core_hours'], parser.total_core_hours())
+        self.assertEqual(data['total_cpu_hours'], parser.total_cpu_hours())
+        self.assertEqual(data['total_slurm_jobs'], parser.total_slurm_jobs())
+        self.assertEqual(data['efficiency'], parser.efficiency())
+        for name, partition_type in (
+            ('core_partitions', [Partition.CORE]),
+            ('researcher_partitions', [Partition.RESEARCH]),
+            ('compute_totals', [Partition.CORE, Partition.RESEARCH]),
+        ):
+            self.assertEqual(
+                data[f'{name}_in_date_range'],
+                parser.partition_stats_in_date_range(partition_type=partition_type),
+            )
+            self.assertEqual(
+                data[f'{name}_to_present'],
+                parser.partition_stats_in_date_range(
+                    start_date=self.project.start_date,
+                    partition_type=partition_type,
+                ),
+            )
+        self.assertTrue(data['compute_totals_to_present']['wall_time'])
+
+    def test_project_activity_counts(self):
+        '''
+        Ensure projects are counted as active, dormant, inactive and retired
+        from a single query.
+        '''
+        Project.objects.filter(pk=self.project.pk).update(status=Project.CLOSED)
+        # The imported stats are from October 2020
+        n_months_since_import = relativedelta(datetime.date.today(), datetime.date(2020, 10, 1)).years * 12
+        for n_months, activity in ((6, 'Inactive'), (n_months_since_import + 24, 'Active')):
+            expected = {'Active': 0, 'Dormant': 0, 'Inactive': 0, 'Retired': 0}
+            for project in Project.objects.all():
+                if not ComputeDaily.objects.filter(project=project).exists():
+                    expected['Dormant'] += 1
+                    continue
+                expected[activity] += 1
+                if project.status == Project.CLOSED:
+                    expected['Retired'] += 1
+            self.assertEqual(expected['Retired'], 1)
+            self.assertTrue(expected['Dormant'])
+
+            with self.assertNumQueries(1):
+                self.assertEqual(Project.objects.activity_counts(n_months), expected)
+
+    def test_pi_projects_queries(self):
+        '''
+        Ensure the PI's projects are classified with a single query.
+        '''
+        parser = ProjectStatsParser(self.project, 'all', datetime.date(2020, 10, 1), datetime.date(2020, 10, 31))
+        with self.assertNumQueries(1):
+            data = parser.pi_projects()
+        self.assertEqual([status for status, count in data], ['Active', 'Dormant', 'Inactive', 'Retired'])
+        self.assertEqual(sum(count for status, count in data[:3]), 1)
+
+        # Count every project of the PI
+        Project.objects.update(pi_email='pi@example.ac.uk')
+        self.project.refresh_from_db()
+        with self.assertNumQueries(1):
+            data = parser.pi_projects()
+        self.assertEqual(sum(count for status, count in data[:3]), Project.objects.count())
+
+    def test_user_status(self):
+        '''
+        Ensure members are counted as active, dormant and inactive from the
+        map of each user's last job date.
+        '''
+        last_job_dates = self.project.user_last_job_dates()
+        self.assertEqual(
+            last_job_dates,
+            {
+                row['user']: row['date__max']
+                for row in ComputeDaily.objects.filter(project=self.project).values('user').annotate(Max('date'))
+            },
+        )
+
+        # Make one member's last job recent and another's old
+        recent_user = ProjectUserMembership.objects.filter(project=self.project).first()
+        recent_user.status = ProjectUserMembership.AUTHORISED
+        recent_user.save()
+        old_user = ProjectUserMembership.objects.create(
+            project=self.project,
+            user=CustomUser.objects.exclude(id=recent_user.user_id).first(),
+            date_joined=datetime.date(2020, 1, 1),
+            status=ProjectUserMembership.AUTHORISED,
+        )
+        parser = ProjectStatsParser(self.project, 'all', datetime.date(2020, 10, 1), datetime.date(2020, 10, 31))
+        last_job_dates = {
+            recent_user.user_id: datetime.date.today(),
+            old_user.user_id: datetime.date(2020, 10, 1),
+        }
+        with self.assertNumQueries(1):
+            data = parser.user_status(last_job_dates)
+
+        memberships = ProjectUserMembership.objects.filter(project=self.project)
+        self.assertEqual(
+            data,
+            [
+                ['Active', 1],
+                ['Dormant', memberships.filter(status=ProjectUserMembership.AUTHORISED).count() - 1],
+                [
+                    'Inactive',
+                    memberships.filter(
+                        status__in=[ProjectUserMembership.REVOKED, ProjectUserMembership.SUSPENDED],
+                    ).count(),
+                ],
+            ],
+        )
+        with self.assertNumQueries(2):
+            parser.user_status()
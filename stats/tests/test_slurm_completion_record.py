@@ -0,0 +1,56 @@
+import os
+
+from django.test import SimpleTestCase
+from stats.slurm.SlurmCompletionFile import SlurmCompletionFile
+from stats.slurm.SlurmCompletionRecord import SlurmCompletionRecord
+
+STATS_FILE = os.path.join(os.path.dirname(__file__), 'hawk_10_2020.out')
+
+
+class SlurmCompletionRecordTest(SimpleTestCase):
+
+    def test_record_fields(self):
+        '''
+        Ensure each field is read by key, skipping extra tokens.
+        '''
+        record = SlurmCompletionRecord(
+            'JobId=18037473 UserId=c.issa16(5000120) GroupId=c.issa16(5000120) Name=ptm '
+            'JobState=CANCELLED by 5000120 Partition=htc,dev TimeLimit=3-00:00:00 '
+            'StartTime=2020-10-13T13:55:47 EndTime=2020-10-13T13:55:47 NodeList=None assigned '
+            'NodeCnt=1 ProcCnt=1 WorkDir=/tmp cpuTime=00:00:00 account= alloccpu=1 '
+            'submit=2020-10-13T13:55:18\n'
+        )
+        self.assertEqual(record.jobID, '18037473')
+        self.assertEqual(record.userID, 'c.issa16(5000120)')
+        self.assertEqual(record.jobState, 'CANCELLED')
+        self.assertEqual(record.partition, 'htc')
+        self.assertEqual(record.nodeList, 'None')
+        self.assertEqual(record.nodeCount, '1')
+        self.assertEqual(record.cpuTime, '00:00:00')
+        self.assertEqual(record.account, 'scw1001')
+        self.assertEqual(record.submitTime, '2020-10-13T13:55:18')
+
+    def test_quoted_job_name(self):
+        '''
+        Ensure a quoted job name may contain spaces and '=' characters.
+        '''
+        fields = SlurmCompletionRecord.splitFields('JobId=1 Name="my job a=b" JobState=COMPLETED')
+        self.assertEqual(fields, {'JobId': '1', 'Name': 'my job a=b', 'JobState': 'COMPLETED'})
+
+    def test_malformed_lines(self):
+        '''
+        Ensure empty and truncated lines are not returned as records.
+        '''
+        for line in ('', '\n', 'JobId=1 UserId=c.issa16(5000120)'):
+            with self.assertRaises(ValueError):
+                SlurmCompletionRecord(line)
+        self.assertEqual(list(SlurmCompletionFile(['\n'])), [0])
+
+    def test_completion_file(self):
+        '''
+        Ensure every line of the fixture is parsed into a record.
+        '''
+        with open(STATS_FILE, 'r') as fh:
+            records = list(SlurmCompletionFile(fh))
+        self.assertEqual(len(records), 257)
+        self.assertTrue(all(isinstance(record, SlurmCompletionRecord) for record in records))
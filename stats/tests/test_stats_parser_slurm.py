@@ -0,0 +1,86 @@
+import bz2
+import datetime
+import gzip
+import lzma
+import os
+import shutil
+import tempfile
+
+from django.test import SimpleTestCase
+from stats.slurm.StatsParserSlurm import StatsParserSlurm, parseTimestamp
+
+STATS_FILE = os.path.join(os.path.dirname(__file__), 'hawk_10_2020.out')
+
+
+class StatsParserSlurmTest(SimpleTestCase):
+
+    def test_multi_day_parse_matches_single_day_parses(self):
+        '''
+        Ensure a single pass over a month of logs produces the same per-day
+        stats as parsing the log once per day.
+        '''
+        start_date = datetime.datetime(2020, 10, 1)
+        number_days = 31
+
+        sp = StatsParserSlurm(STATS_FILE, start_date, numberDays=number_days)
+        sp.ParseNow()
+
+        for offset in range(number_days):
+            date = start_date + datetime.timedelta(days=offset)
+            single = StatsParserSlurm(STATS_FILE, date)
+            single.ParseNow()
+            self.assertEqual(sp.getArraySize(date), single.getArraySize())
+            self.assertEqual(list(sp.getResultsArray(date)), list(single.getResultsArray()))
+
+    def test_daily_results_arrays(self):
+        '''
+        Ensure only days with completed jobs are bucketed.
+        '''
+        sp = StatsParserSlurm(STATS_FILE, datetime.datetime(2020, 10, 1), numberDays=31)
+        sp.ParseNow()
+
+        daily = sp.getDailyResultsArrays()
+        self.assertEqual(list(daily)[0], datetime.date(2020, 10, 2))
+        self.assertEqual(list(daily)[-1], datetime.date(2020, 10, 31))
+        self.assertNotIn(datetime.date(2020, 10, 1), daily)
+        self.assertEqual(daily[datetime.date(2020, 10, 31)].getSize(), 5)
+        self.assertEqual(sum(stats.getSize() for stats in daily.values()), 257)
+
+    def test_parse_timestamp(self):
+        '''
+        Ensure the timestamp fast path matches strptime.
+        '''
+        for timestamp in ('2020-09-29T14:56:52', '2020-10-31T23:59:59', '2021-01-01T00:00:00'):
+            self.assertEqual(parseTimestamp(timestamp), datetime.datetime.strptime(timestamp, '%Y-%m-%dT%H:%M:%S'))
+
+    def test_window_bounds(self):
+        '''
+        Ensure jobs ending on the first and last second of the window are kept.
+        '''
+        sp = StatsParserSlurm(STATS_FILE, datetime.datetime(2020, 10, 2, 14, 57, 5), numberDays=1)
+        sp.ParseNow()
+        self.assertEqual(list(sp.getDailyResultsArrays()), [datetime.date(2020, 10, 2)])
+
+        sp = StatsParserSlurm(STATS_FILE, datetime.datetime(2020, 10, 1, 14, 57, 5), numberDays=1)
+        sp.ParseNow()
+        self.assertEqual(sp.getDailyResultsArrays(), {})
+
+    def test_compressed_logs(self):
+        '''
+        Ensure bz2, gzip and xz compressed logs parse the same as the plain log.
+        '''
+        start_date = datetime.datetime(2020, 10, 1)
+        sp = StatsParserSlurm(STATS_FILE, start_date, numberDays=31)
+        sp.ParseNow()
+        expected = {date: list(stats) for date, stats in sp.getDailyResultsArrays().items()}
+
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        for extension, opener in (('.bz2', bz2.open), ('.gz', gzip.open), ('.xz', lzma.open)):
+            compressed_file = os.path.join(tmp_dir, 'hawk_10_2020.out' + extension)
+            with open(STATS_FILE, 'rb') as src, opener(compressed_file, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+
+            sp = StatsParserSlurm(compressed_file, start_date, numberDays=31)
+            sp.ParseNow()
+            self.assertEqual({date: list(stats) for date, stats in sp.getDailyResultsArrays().items()}, expected)
@@ -1,19 +1,25 @@
+import hashlib
+import io
 from datetime import date, datetime, timedelta
 
+import django_rq
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.contrib import messages
-from django.core.files.storage import FileSystemStorage
-from django.http import HttpResponse, JsonResponse
+from django.core.cache import cache
+from django.http import FileResponse, HttpResponse, JsonResponse
+from django.shortcuts import render
 from django.template.loader import render_to_string
 from django.views.generic import TemplateView
+from django_rq import job
 from project.mixins import PermissionAndLoginRequiredMixin
 from project.models import Project
 from system.models import Partition
 from weasyprint import HTML
 
-from stats.models import StorageWeekly
+from stats.models import ComputeDaily, StorageWeekly
 
+from .cache import cached_stats, stats_cache_enabled, stats_cache_key
 from .parsers.project_stats_parser import ProjectStatsParser
 from .parsers.user_stats_parser import UserStatsParser
 from .parsers.util import kb_to_gb
@@ -69,8 +75,15 @@ class IndexView(
                     end_date,
                 )
 
-                # Build project stats and add to request context.
-                context = build_project_stats(stats_parser, context)
+                # Build project stats, unless cached since the last import,
+                # and add to request context.
+                context.update(
+                    cached_stats(
+                        'project_stats',
+                        [selected_project.code, selected_project.start_date, 'all', start_date, end_date],
+                        lambda: build_project_stats(stats_parser, {}),
+                    )
+                )
 
                 # Check home and scratch storage allocation usage
                 try:
@@ -98,7 +111,7 @@ class IndexView(
 
                 # Check allocated core hours usage
                 try:
-                    usage = stats_parser.total_core_hours().total_seconds()
+                    usage = context['total_core_hours']
                     allocation = timedelta(hours=selected_project.allocation_cputime).total_seconds()
                     usage_percentage = round((usage / allocation), 2) * 100
                     context['allocation_usage_percentage'] = usage_percentage
@@ -139,57 +152,22 @@ def parse_date_range(request):
 
 def build_project_stats(stats_parser, data):
     # Retrieve project overview stats
-    data['total_core_hours'] = stats_parser.total_core_hours()
-    data['total_cpu_hours'] = stats_parser.total_cpu_hours()
-    data['total_slurm_jobs'] = stats_parser.total_slurm_jobs()
-    data['efficiency'] = stats_parser.efficiency()
-
-    # Retrieve core partitions stats in date range
-    data['core_partitions_in_date_range'] = stats_parser.partition_stats_in_date_range(
-        partition_type=[
-            Partition.CORE,
-        ]
-    )
-
-    # Retrieve core partitions stats to present
-    data['core_partitions_to_present'] = stats_parser.partition_stats_in_date_range(
-        start_date=stats_parser.project.start_date,
-        partition_type=[
-            Partition.CORE,
-        ],
-    )
-
-    # Retrieve researcher funded partitions stats in date range
-    data['researcher_partitions_in_date_range'] = stats_parser.partition_stats_in_date_range(
-        partition_type=[
-            Partition.RESEARCH,
-        ],
-    )
-
-    # Retrieve researcher funded partitions stats to present
-    data['researcher_partitions_to_present'] = stats_parser.partition_stats_in_date_range(
-        start_date=stats_parser.project.start_date,
-        partition_type=[
-            Partition.RESEARCH,
-        ],
-    )
-
-    # Retrieve compute totals in date range
-    data['compute_totals_in_date_range'] = stats_parser.partition_stats_in_date_range(
-        partition_type=[
-            Partition.CORE,
-            Partition.RESEARCH,
-        ],
-    )
-
-    # Retrieve compute totals to present
-    data['compute_totals_to_present'] = stats_parser.partition_stats_in_date_range(
-        start_date=stats_parser.project.start_date,
-        partition_type=[
-            Partition.CORE,
-            Partition.RESEARCH,
-        ],
-    )
+    totals = stats_parser.project_totals()
+    data['total_core_hours'] = totals['wall_time']
+    data['total_cpu_hours'] = totals['cpu_time']
+    data['total_slurm_jobs'] = totals['number_jobs']
+    data['efficiency'] = stats_parser.efficiency(totals)
+
+    # Retrieve core, researcher funded and total partitions stats, in date
+    # range and to present
+    in_date_range = stats_parser.partition_type_stats_in_date_range()
+    to_present = stats_parser.partition_type_stats_in_date_range(start_date=stats_parser.project.start_date)
+    data['core_partitions_in_date_range'] = in_date_range['core']
+    data['core_partitions_to_present'] = to_present['core']
+    data['researcher_partitions_in_date_range'] = in_date_range['research']
+    data['researcher_partitions_to_present'] = to_present['research']
+    data['compute_totals_in_date_range'] = in_date_range['total']
+    data['compute_totals_to_present'] = to_present['total']
 
     # Retrieve list of partitions used
     data['core_partitions_used'] = stats_parser.partitions_used(partition_type=Partition.CORE)
@@ -201,6 +179,15 @@ def build_project_stats(stats_parser, data):
     return data
 
 
+def build_user_stats(stats_parser):
+    data = {}
+    data['rate_of_usage_per_month'] = stats_parser.rate_of_usage_per_month()
+    data['cumulative_total_usage_per_month'] = stats_parser.cumulative_total_usage_per_month()
+    data['efficiency_per_month'] = stats_parser.efficiency_per_month()
+    data['num_jobs_per_month'] = stats_parser.num_jobs_per_month()
+    return data
+
+
 def UserStatsParserJSONView(request):
     '''
     UserStatsParserJSONView
@@ -220,11 +207,12 @@ def UserStatsParserJSONView(request):
                 project_filter=project_filter,
             )
 
-            # Query stats
-            data['rate_of_usage_per_month'] = stats_parser.rate_of_usage_per_month()
-            data['cumulative_total_usage_per_month'] = stats_parser.cumulative_total_usage_per_month()
-            data['efficiency_per_month'] = stats_parser.efficiency_per_month()
-            data['num_jobs_per_month'] = stats_parser.num_jobs_per_month()
+            # Query stats, unless cached since the last import
+            data = cached_stats(
+                'user_stats_json',
+                [user.id, stats_parser.project_ids, stats_parser.start_date, stats_parser.end_date],
+                lambda: build_user_stats(stats_parser),
+            )
 
         except Exception:
             pass
@@ -273,21 +261,16 @@ def ProjectStatsParserJSONView(request):
             # Overview stats
             data['pi_projects'] = stats_parser.pi_projects()
             data['user_status'] = stats_parser.user_status()
-            data['efficiency'] = stats_parser.efficiency()
-
-            # Compute stats
-            data['rate_of_usage'] = stats_parser.rate_of_usage()
-            data['cumulative_total_usage'] = stats_parser.cumulative_total_usage()
-            data['top_users_usage'] = stats_parser.top_users_usage()
-            data['usage_by_partition'] = stats_parser.usage_by_partition()
-            data['efficiency_per_month'] = stats_parser.efficiency_per_month()
-            data['num_jobs_per_month'] = stats_parser.num_jobs_per_month()
-            data['per_job_avg_stats'] = stats_parser.per_job_avg_stats()
-            data['core_count_node_utilisation'] = stats_parser.core_count_node_utilisation()
-
-            # Storage stats
-            data['disk_space'] = stats_parser.disk_space()
-            data['file_count'] = stats_parser.file_count()
+
+            # Efficiency, compute and storage stats, unless cached since the
+            # last import
+            data.update(
+                cached_stats(
+                    'project_stats_json',
+                    [project.code, partition_filter, start_date, end_date],
+                    stats_parser.compute_stats,
+                )
+            )
 
         except Exception:
             pass
@@ -295,6 +278,39 @@ def ProjectStatsParserJSONView(request):
     return JsonResponse(data, safe=False)
 
 
+def render_project_pdf(project, partition_filter, start_date, end_date, user, base_url):
+    '''
+    Render a project's stats PDF in memory and return its bytes.
+    '''
+    # Create a ProjectStatsParser for the project
+    stats_parser = ProjectStatsParser(
+        project,
+        partition_filter,
+        start_date,
+        end_date,
+    )
+
+    context = {
+        'project': project,
+        'query_start_date': start_date,
+        'query_end_date': end_date,
+        'user': user,
+    }
+    context = build_project_stats(stats_parser, context)
+
+    html_string = render_to_string('stats/pdf_template.html', context)
+    return HTML(string=html_string, base_url=base_url).write_pdf()
+
+
+@job
+def generate_project_pdf(project, partition_filter, start_date, end_date, user, base_url):
+    '''
+    Render a project's stats PDF in a worker. GeneratePDF takes the PDF from
+    the job's result, as the worker may not share its cache.
+    '''
+    return render_project_pdf(project, partition_filter, start_date, end_date, user, base_url)
+
+
 def GeneratePDF(request):
     '''
     GeneratePDF
@@ -319,31 +335,43 @@ def GeneratePDF(request):
                     tech_lead=user,
                 )
 
-            # Create a ProjectStatsParser for the project
-            stats_parser = ProjectStatsParser(
-                project,
-                partition_filter,
-                start_date,
-                end_date,
-            )
-
-            context = {
-                'project': project,
-                'query_start_date': start_date,
-                'query_end_date': end_date,
-                'user': user,
-            }
-            context = build_project_stats(stats_parser, context)
-
-            html_string = render_to_string('stats/pdf_template.html', context)
-            html = HTML(string=html_string, base_url=request.build_absolute_uri())
-            html.write_pdf(target='/tmp/mypdf.pdf')
-
-            fs = FileSystemStorage('/tmp')
-            with fs.open('mypdf.pdf') as pdf:
-                response = HttpResponse(pdf, content_type='application/pdf')
-                response['Content-Disposition'] = 'attachment; filename="' + project.code + '".pdf"'
-            return response
+            # The PDF names the user that generated it
+            args = [project, partition_filter, start_date, end_date, user, request.build_absolute_uri()]
+            cache_key = stats_cache_key('project_pdf', project.code, partition_filter, start_date, end_date, user.id)
+            pdf = cache.get(cache_key) if stats_cache_enabled() else None
+            if pdf is None:
+                number_records = ComputeDaily.objects.filter(
+                    project=project,
+                    date__range=[start_date, end_date],
+                ).count()
+                if number_records < settings.DATA_ANALYTICS_PDF_ASYNC_RECORDS:
+                    pdf = render_project_pdf(*args)
+                else:
+                    # Render large projects in a worker, while the client
+                    # polls this view until the job has finished
+                    job_id = f'project-pdf-{hashlib.md5(cache_key.encode()).hexdigest()}'
+                    queued_job = django_rq.get_queue().fetch_job(job_id)
+                    if queued_job is not None and queued_job.is_failed:
+                        # Let the next request try again
+                        queued_job.delete()
+                        raise Exception(f'Failed to generate the PDF for {project.code}.')
+                    if queued_job is not None and queued_job.is_finished:
+                        pdf = queued_job.return_value()
+                        # The next request renders the PDF again, unless it
+                        # is cached below
+                        queued_job.delete()
+                    if pdf is None:
+                        if queued_job is None or queued_job.is_finished:
+                            generate_project_pdf.delay(*args, job_id=job_id)
+                        context = {
+                            'project': project,
+                            'refresh_seconds': 5,
+                        }
+                        return render(request, 'stats/pdf_pending.html', context, status=202)
+                if stats_cache_enabled():
+                    cache.set(cache_key, pdf, settings.DATA_ANALYTICS_CACHE_TIMEOUT)
+
+            return FileResponse(io.BytesIO(pdf), as_attachment=True, filename=f'{project.code}.pdf')
         except Exception as e:
             print(e)
             pass
@@ -1,9 +1,11 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.utils import timezone
 
 from users.forms import (CustomUserChangeForm, CustomUserCreationForm, ProfileUpdateForm)
 from users.models import CustomUser, Profile, ShibbolethProfile, UserLastLogin
-from users.openldap import update_openldap_user
+from openldap.admin import OpenLDAPBatchAdminMixin
+from users.openldap import update_openldap_users
 
 
 class ProfileInline(admin.StackedInline):
@@ -23,7 +25,7 @@ class ShibbolethProfileInline(admin.StackedInline):
 
 
 @admin.register(CustomUser)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(OpenLDAPBatchAdminMixin, UserAdmin):
     """
     Form to add or update a CustomUser instance.
     """
@@ -35,25 +37,25 @@ class CustomUserAdmin(UserAdmin):
             message = '{rows} accounts were'.format(rows=rows_updated)
         return message
 
+    def _update_account_status(self, ids, account_status):
+        # The profile has no modified time of its own, so the user's is bumped
+        # as CustomUser.save() would.
+        CustomUser.objects.filter(pk__in=ids).update(updated_at=timezone.now())
+        return Profile.objects.filter(user__in=ids).update(account_status=account_status)
+
     def activate_users(self, request, queryset):
-        rows_updated = 0
-        for user in queryset:
-            user.profile.account_status = Profile.APPROVED
-            user.save()
-            rows_updated += 1
-            update_openldap_user(user.profile)
+        ids = list(queryset.values_list('pk', flat=True))
+        rows_updated = self._update_account_status(ids, Profile.APPROVED)
+        self.queue_openldap_batch(request, update_openldap_users, ids)
         message = self._account_action_message(rows_updated)
         self.message_user(request, '{message} successfully submitted for activation.'.format(message=message))
 
     activate_users.short_description = 'Activate selected users account in LDAP'
 
     def deactivate_users(self, request, queryset):
-        rows_updated = 0
-        for user in queryset:
-            user.profile.account_status = Profile.REVOKED
-            user.save()
-            rows_updated += 1
-            update_openldap_user(user.profile)
+        ids = list(queryset.values_list('pk', flat=True))
+        rows_updated = self._update_account_status(ids, Profile.REVOKED)
+        self.queue_openldap_batch(request, update_openldap_users, ids)
         message = self._account_action_message(rows_updated)
         self.message_user(request, '{message} successfully submitted for deactivation.'.format(message=message))
 
@@ -1,41 +1,121 @@
 import re
+import time
 
 from django.conf import settings
 from django.contrib import auth
 from django.contrib.auth import load_backend
 from django.contrib.auth.backends import RemoteUserBackend
+from django.core.exceptions import ImproperlyConfigured
 from django.http import HttpResponse
 from django.http import HttpResponseRedirect
 from django.urls import resolve
 from django.urls import reverse
+from django.utils.translation import get_language
 
+from institution.cache import get_institution_by_identity_provider
 from institution.exceptions import InvalidInstitutionalIndentityProvider
 from institution.models import Institution
 from shibboleth.middleware import ShibbolethRemoteUserMiddleware
 from shibboleth.middleware import ShibbolethValidationError
 
+# The REMOTE USER header may return the authenticated user's email address or username.
+EMAIL_REGEX = re.compile(r'(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)')
 
-class TermsOfServiceMiddleware:
+# Paths of files, which need no authentication.
+SKIPPED_PATH_PREFIXES = tuple(prefix for prefix in (settings.STATIC_URL, settings.MEDIA_URL) if prefix)
+
+# Paths reversed by the middleware, by URL name and language.
+_paths = {}
+
+
+def url_path(name):
+    """
+    Return the path of a URL name in the active language, which prefixes the
+    i18n patterns.
+
+    Args:
+        name (str): URL name - required
+    """
+    key = (name, get_language())
+    path = _paths.get(key)
+    if path is None:
+        path = _paths[key] = reverse(name)
+    return path
+
+
+def is_skipped_path(path):
+    return path.startswith(SKIPPED_PATH_PREFIXES)
+
+
+def record_timing(request, name, start):
+    """
+    Record the seconds a middleware spent on a request since start, for the
+    MiddlewareTimingMiddleware.
+    """
+    timings = getattr(request, 'middleware_timings', None)
+    if timings is not None:
+        timings[name] = timings.get(name, 0) + time.perf_counter() - start
+
+
+class MiddlewareTimingMiddleware:
+    """
+    Report the time spent in each of the application's middlewares, and in
+    the whole request, in a Server-Timing response header. Installed first
+    when MIDDLEWARE_TIMING is set.
+    """
 
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
+        request.middleware_timings = {}
+        start = time.perf_counter()
         response = self.get_response(request)
-        if not request.path.startswith(reverse('terms-of-service')):
-            if request.user.is_authenticated:
-                if not request.user.accepted_terms_and_conditions:
-                    return HttpResponseRedirect(reverse('terms-of-service'))
+        request.middleware_timings['total'] = time.perf_counter() - start
+        response['Server-Timing'] = ', '.join(
+            '{name};dur={milliseconds:.3f}'.format(name=name, milliseconds=seconds * 1000)
+            for name, seconds in request.middleware_timings.items()
+        )
         return response
 
 
+class TermsOfServiceMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        start = time.perf_counter()
+        try:
+            if is_skipped_path(request.path):
+                return response
+            # Only reverse the terms of service path for users that haven't accepted them.
+            if request.user.is_authenticated and not request.user.accepted_terms_and_conditions:
+                if not request.path.startswith(url_path('terms-of-service')):
+                    return HttpResponseRedirect(url_path('terms-of-service'))
+            return response
+        finally:
+            record_timing(request, 'terms-of-service', start)
+
+
 class SCWRemoteUserMiddleware(ShibbolethRemoteUserMiddleware):
 
     def process_request(self, request):
+        start = time.perf_counter()
+        try:
+            return self._process_request(request)
+        finally:
+            record_timing(request, 'scw-remote-user', start)
+
+    def _process_request(self, request):
+        if is_skipped_path(request.path):
+            return
+
         # The identity of external collaborators is managed within the django application.
         # Therefore, exclude the external collaborator login form from the SCW Remote User
         # Middleware.
-        if request.path.startswith(reverse('external-login')):
+        if request.path.startswith(url_path('external-login')):
             return
 
         # AuthenticationMiddleware is required so that request.user exists.
@@ -73,11 +153,9 @@ class SCWRemoteUserMiddleware(ShibbolethRemoteUserMiddleware):
         except InvalidInstitutionalIndentityProvider:
             return
 
-        # The REMOTE USER header may return the authenticated user's email address or username.
-        email_regex = r'(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)'
-        if not re.match(email_regex, username):
+        if not EMAIL_REGEX.match(username):
             # Must append the institutions base domain to the username.
-            institution = Institution.objects.get(identity_provider=identity_provider)
+            institution = get_institution_by_identity_provider(identity_provider)
             username = '@'.join([username, institution.base_domain])
 
         # If the user is already authenticated and that user is the user we are getting passed in
@@ -91,10 +169,11 @@ class SCWRemoteUserMiddleware(ShibbolethRemoteUserMiddleware):
 
         # Make sure we have all required Shibboleth elements before proceeding.
         shib_meta, error = ShibbolethRemoteUserMiddleware.parse_attributes(request)
+        shib_meta['username'] = username  # Override
 
-        # Add parsed attributes to the session.
-        request.session['shib'] = shib_meta
-        request.session['shib']['username'] = username  # Override
+        # Add parsed attributes to the session, which is only saved again if they changed.
+        if request.session.get('shib') != shib_meta:
+            request.session['shib'] = shib_meta
 
         if error:
             raise ShibbolethValidationError('All required Shibboleth elements not found. %s' % shib_meta)
@@ -7,6 +7,7 @@ from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.db import models
 from django.utils.translation import gettext as _
 
+from institution.cache import get_institution_by_base_domain
 from institution.models import Institution
 from users.notifications import user_created_notification
 
@@ -285,7 +286,7 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         super(CustomUser, self).save(*args, **kwargs)
         if self.is_shibboleth_login_required:
             _, domain = self.email.split('@')
-            institution = Institution.objects.get(base_domain=domain)
+            institution = get_institution_by_base_domain(domain)
             obj, created = ShibbolethProfile.objects.update_or_create(
                 user=self,
                 defaults={
@@ -1,15 +1,25 @@
+import contextlib
+import contextvars
+import datetime
+import pickle
+
+import django_rq
 from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
+from django.core.mail import get_connection
 from django.template.loader import get_template
 from django.utils.translation import gettext_lazy as _
 from django_rq import job
 
 from institution.models import Institution
 
+# Emails collected by email_batch, rather than sent as they're dispatched.
+_email_batch = contextvars.ContextVar('email_batch', default=None)
 
-def email_user(subject, context, text_template_path, html_template_path):
+
+def build_email(subject, context, text_template_path, html_template_path):
     """
-    Dispatch a notification email.
+    Render a notification email.
 
     Args:
         subject (str): Email subject - required
@@ -30,7 +40,117 @@ def email_user(subject, context, text_template_path, html_template_path):
         bcc=[settings.DEFAULT_BCC_EMAIL],
     )
     email.attach_alternative(html_alternative, "text/html")
-    email.send(fail_silently=False)
+    return email
+
+
+def send_emails(emails):
+    """
+    Send emails through a single connection to the mail server.
+    """
+    if emails:
+        get_connection(fail_silently=False).send_messages(emails)
+
+
+@contextlib.contextmanager
+def email_batch():
+    """
+    Collect the emails dispatched by email_user within the block, including
+    from threads started with a copy of its context, and send them through
+    one connection when the block exits.
+    """
+    emails = []
+    token = _email_batch.set(emails)
+    try:
+        yield emails
+    finally:
+        _email_batch.reset(token)
+        send_emails(emails)
+
+
+def email_user(subject, context, text_template_path, html_template_path):
+    """
+    Dispatch a notification email.
+
+    Args:
+        subject (str): Email subject - required
+        context (str): Email context - required
+        text_template_path (str): text_template_path - required
+        html_template_path (str): html_template_path - required
+    """
+    email = build_email(subject, context, text_template_path, html_template_path)
+    batch = _email_batch.get()
+    if batch is not None:
+        batch.append(email)
+    else:
+        send_emails([email])
+
+
+def _coalesced_emails_key(recipient):
+    return 'notifications:coalesced:{recipient}'.format(recipient=recipient)
+
+
+def coalesce_email(subject, context, text_template_path, html_template_path):
+    """
+    Dispatch a notification email together with the others to the same
+    recipient within NOTIFICATION_COALESCE_SECONDS, as one digest.
+
+    The first notification of the window schedules the digest, so the RQ
+    worker must run its scheduler.
+
+    Args:
+        subject (str): Email subject - required
+        context (str): Email context - required
+        text_template_path (str): text_template_path - required
+        html_template_path (str): html_template_path - required
+    """
+    if not settings.NOTIFICATION_COALESCE_SECONDS:
+        email_user(subject, context, text_template_path, html_template_path)
+        return
+    notification = pickle.dumps((subject, context, text_template_path, html_template_path))
+    redis = django_rq.get_connection()
+    if redis.rpush(_coalesced_emails_key(context['to']), notification) == 1:
+        django_rq.get_queue().enqueue_in(
+            datetime.timedelta(seconds=settings.NOTIFICATION_COALESCE_SECONDS),
+            send_coalesced_emails,
+            context['to'],
+        )
+
+
+@job
+def send_coalesced_emails(recipient):
+    """
+    Send the notifications coalesced for a recipient, as a digest if there
+    is more than one.
+
+    Args:
+        recipient (str): Email address - required
+    """
+    key = _coalesced_emails_key(recipient)
+    pipeline = django_rq.get_connection().pipeline()
+    pipeline.lrange(key, 0, -1)
+    pipeline.delete(key)
+    notifications, _deleted = pipeline.execute()
+    notifications = [pickle.loads(notification) for notification in notifications]
+    if len(notifications) == 1:
+        email_user(*notifications[0])
+    elif notifications:
+        subject = _('{company_name} Notifications ({count})'.format(
+            company_name=settings.COMPANY_NAME,
+            count=len(notifications),
+        ))
+        digest = []
+        for notification_subject, notification_context, notification_text_template_path, _html in notifications:
+            digest.append({
+                'subject': notification_subject,
+                'body': get_template(notification_text_template_path).render(notification_context),
+            })
+        context = {
+            'notifications': digest,
+            'to': recipient,
+        }
+        text_template_path = 'notifications/digest.txt'
+        html_template_path = 'notifications/digest.html'
+        email_user(subject, context, text_template_path, html_template_path)
 
 
 @job
@@ -49,4 +169,4 @@ def user_created_notification(user):
     }
     text_template_path = 'notifications/user/created.txt'
     html_template_path = 'notifications/user/created.html'
-    email_user(subject, context, text_template_path, html_template_path)
+    coalesce_email(subject, context, text_template_path, html_template_path)
@@ -2,8 +2,10 @@ import re
 
 from django.http import JsonResponse
 from django.utils.translation import gettext as _
+from django_rq import job
 
 from openldap.api import user_api
+from openldap.util import propagate_batch
 from users.models import Profile
 
 
@@ -39,9 +41,9 @@ def reset_openldap_password(request):
         return JsonResponse(status=400, data={})
 
 
-def update_openldap_user(profile):
+def openldap_user_job(profile):
     """
-    Ensure account status updates are propagated to the user's OpenLDAP account.
+    Return the OpenLDAP API job that propagates the account status, if any.
     """
     deactivate_user_states = [
         Profile.REVOKED,
@@ -50,8 +52,36 @@ def update_openldap_user(profile):
     ]
     if profile.account_status == Profile.APPROVED:
         if profile.scw_username:
-            user_api.activate_user_account.delay(user=profile.user)
-        else:
-            user_api.create_user.delay(user=profile.user)
+            return user_api.activate_user_account
+        return user_api.create_user
     elif profile.account_status in deactivate_user_states:
-        user_api.deactivate_user_account.delay(user=profile.user)
+        return user_api.deactivate_user_account
+    return None
+
+
+def update_openldap_user(profile):
+    """
+    Ensure account status updates are propagated to the user's OpenLDAP account.
+    """
+    api_job = openldap_user_job(profile)
+    if api_job:
+        api_job.delay(user=profile.user)
+
+
+@job
+def update_openldap_users(user_ids):
+    """
+    Ensure the account status updates of a batch of users are propagated to
+    their OpenLDAP accounts.
+
+    Args:
+        user_ids (list): User ids - required
+    """
+    profiles = Profile.objects.filter(user__in=user_ids).select_related('user')
+
+    def propagate(profile):
+        api_job = openldap_user_job(profile)
+        if api_job:
+            api_job(user=profile.user)
+
+    return propagate_batch(propagate, profiles)
@@ -0,0 +1,87 @@
+import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test import TestCase
+from django.urls import reverse
+
+from users.middleware import MiddlewareTimingMiddleware
+from users.middleware import SCWRemoteUserMiddleware
+from users.middleware import TermsOfServiceMiddleware
+from users.models import CustomUser
+
+
+class MiddlewareTests(TestCase):
+
+    fixtures = [
+        'institution/fixtures/tests/institutions.json',
+        'users/fixtures/tests/users.json',
+    ]
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = CustomUser.objects.get(email='shibboleth.user@example.ac.uk')
+
+    def _request(self, path, user, **meta):
+        request = self.factory.get(path, **meta)
+        SessionMiddleware(lambda request: HttpResponse()).process_request(request)
+        request.user = user
+        return request
+
+    def test_terms_of_service_middleware(self):
+        """
+        Ensure users that haven't accepted the terms of service are redirected
+        to them, other than for files.
+        """
+        middleware = TermsOfServiceMiddleware(lambda request: HttpResponse())
+        with mock.patch('users.middleware.reverse', wraps=reverse) as reverse_mock:
+            response = middleware(self._request(reverse('logged_out'), self.user))
+            self.assertEqual(response.status_code, 200)
+            reverse_mock.assert_not_called()
+
+        self.user.accepted_terms_and_conditions = False
+        response = middleware(self._request(reverse('logged_out'), self.user))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, reverse('terms-of-service'))
+
+        response = middleware(self._request(reverse('terms-of-service'), self.user))
+        self.assertEqual(response.status_code, 200)
+        response = middleware(self._request('/static/css/main.css', self.user))
+        self.assertEqual(response.status_code, 200)
+
+    def test_remote_user_middleware_session(self):
+        """
+        Ensure the Shibboleth attributes are only saved to the session when
+        they change, and that usernames are completed with the identity
+        provider's domain.
+        """
+        middleware = SCWRemoteUserMiddleware(lambda request: HttpResponse())
+        meta = {
+            'REMOTE_USER': 'unknown.user',
+            'Shib-Identity-Provider': 'https://idp.example.ac.uk/shibboleth',
+        }
+        request = self._request(reverse('logged_out'), AnonymousUser(), **meta)
+        response = middleware.process_request(request)
+        self.assertEqual(response.url, reverse('register'))
+        self.assertEqual(request.session['shib'], {'username': 'unknown.user@example.ac.uk'})
+        self.assertTrue(request.session.modified)
+
+        request.session.modified = False
+        middleware.process_request(request)
+        self.assertFalse(request.session.modified)
+
+        request = self._request('/static/css/main.css', AnonymousUser(), **meta)
+        self.assertIsNone(middleware.process_request(request))
+        self.assertNotIn('shib', request.session)
+
+    def test_middleware_timing(self):
+        """
+        Ensure the time spent in the middlewares is reported in a Server-Timing
+        header.
+        """
+        middleware = MiddlewareTimingMiddleware(TermsOfServiceMiddleware(lambda request: HttpResponse()))
+        response = middleware(self._request(reverse('logged_out'), self.user))
+        timings = [timing.split(';dur=')[0] for timing in response['Server-Timing'].split(', ')]
+        self.assertEqual(timings, ['terms-of-service', 'total'])
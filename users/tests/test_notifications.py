@@ -0,0 +1,127 @@
+import pickle
+
+import mock
+
+from django.core import mail
+from django.test import TestCase
+from django.test import override_settings
+
+from users.notifications import coalesce_email
+from users.notifications import email_batch
+from users.notifications import email_user
+from users.notifications import send_coalesced_emails
+
+
+@override_settings(COMPANY_NAME='ACME Corporation', NOTIFICATION_COALESCE_SECONDS=300)
+class NotificationTests(TestCase):
+
+    def _notification(self, applicant_first_name):
+        context = {
+            'code': 'scw0000',
+            'tech_lead_first_name': 'Joe',
+            'applicant_first_name': applicant_first_name,
+            'applicant_last_name': 'Bloggs',
+            'applicant_university': 'Example University',
+            'to': 'tech.lead@example.ac.uk',
+        }
+        return (
+            'Project Membership Request',
+            context,
+            'notifications/project_membership/created.txt',
+            'notifications/project_membership/created.html',
+        )
+
+    def test_email_batch(self):
+        """
+        Ensure emails dispatched within a batch are sent together, through one
+        connection, when the batch exits.
+        """
+        with mock.patch('users.notifications.get_connection', wraps=mail.get_connection) as get_connection_mock:
+            with email_batch():
+                email_user(*self._notification('Ann'))
+                email_user(*self._notification('Bob'))
+                self.assertEqual(len(mail.outbox), 0)
+            self.assertEqual(len(mail.outbox), 2)
+            get_connection_mock.assert_called_once_with(fail_silently=False)
+
+        email_user(*self._notification('Cat'))
+        self.assertEqual(len(mail.outbox), 3)
+
+    @mock.patch('django_rq.get_queue')
+    @mock.patch('django_rq.get_connection')
+    def test_coalesce_email(self, get_connection_mock, get_queue_mock):
+        """
+        Ensure the first notification to a recipient schedules a digest, which
+        the following notifications join.
+        """
+        redis = get_connection_mock.return_value
+        redis.rpush.side_effect = [1, 2]
+        coalesce_email(*self._notification('Ann'))
+        coalesce_email(*self._notification('Bob'))
+
+        self.assertEqual(redis.rpush.call_count, 2)
+        redis.rpush.assert_called_with(
+            'notifications:coalesced:tech.lead@example.ac.uk',
+            pickle.dumps(self._notification('Bob')),
+        )
+        get_queue_mock.return_value.enqueue_in.assert_called_once()
+        self.assertEqual(get_queue_mock.return_value.enqueue_in.call_args[0][1:], (
+            send_coalesced_emails,
+            'tech.lead@example.ac.uk',
+        ))
+        self.assertEqual(len(mail.outbox), 0)
+
+    @mock.patch('django_rq.get_connection')
+    def test_send_coalesced_emails(self, get_connection_mock):
+        """
+        Ensure coalesced notifications are sent as one digest, and a single
+        notification as itself.
+        """
+        pipeline = get_connection_mock.return_value.pipeline.return_value
+        pipeline.execute.return_value = [
+            [pickle.dumps(self._notification('Ann')), pickle.dumps(self._notification('Bob'))],
+            1,
+        ]
+        send_coalesced_emails('tech.lead@example.ac.uk')
+        pipeline.lrange.assert_called_once_with('notifications:coalesced:tech.lead@example.ac.uk', 0, -1)
+        pipeline.delete.assert_called_once_with('notifications:coalesced:tech.lead@example.ac.uk')
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, 'ACME Corporation Notifications (2)')
+        self.assertEqual(mail.outbox[0].to, ['tech.lead@example.ac.uk'])
+        self.assertIn('Ann Bloggs from Example University', mail.outbox[0].body)
+        self.assertIn('Bob Bloggs from Example University', mail.outbox[0].body)
+
+        pipeline.execute.return_value = [[pickle.dumps(self._notification('Cat'))], 1]
+        send_coalesced_emails('tech.lead@example.ac.uk')
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[1].subject, 'Project Membership Request')
+
+
+class NotificationDefaultsTests(TestCase):
+
+    @mock.patch('django_rq.get_queue')
+    @mock.patch('django_rq.get_connection')
+    def test_notifications_are_not_coalesced_by_default(self, get_connection_mock, get_queue_mock):
+        """
+        Ensure notifications are sent immediately, without the RQ scheduler,
+        unless coalescing is configured.
+        """
+        context = {
+            'first_name': 'Joe',
+            'last_name': 'Bloggs',
+            'university': 'Example University',
+            'reason': 'Research',
+            'to': 'support@example.ac.uk',
+        }
+        notification = (
+            'User Account Created',
+            context,
+            'notifications/user/created.txt',
+            'notifications/user/created.html',
+        )
+        email_user(*notification)
+        coalesce_email(*notification)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[1].to, ['support@example.ac.uk'])
+        get_connection_mock.assert_not_called()
+        get_queue_mock.assert_not_called()
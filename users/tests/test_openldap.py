@@ -0,0 +1,55 @@
+import mock
+
+from django.test import TestCase
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from users.models import CustomUser
+from users.models import Profile
+from users.openldap import update_openldap_users
+
+
+@override_settings(OPENLDAP_BATCH_WORKERS=2)
+class UserOpenLDAPBatchTests(TestCase):
+
+    fixtures = [
+        'institution/fixtures/tests/institutions.json',
+        'users/fixtures/tests/users.json',
+    ]
+
+    @mock.patch('openldap.api.user_api.create_user')
+    @mock.patch('openldap.api.user_api.activate_user_account')
+    def test_update_openldap_users(self, activate_user_mock, create_user_mock):
+        """
+        Ensure a batch of accounts is propagated to OpenLDAP in one job.
+        """
+        admin_user = CustomUser.objects.get(email='admin.user@example.ac.uk')
+        guest_user = CustomUser.objects.get(email='guest.user@external.ac.uk')
+        Profile.objects.filter(user__in=[admin_user, guest_user]).update(account_status=Profile.APPROVED)
+
+        summary = update_openldap_users([admin_user.id, guest_user.id])
+        self.assertEqual(sorted(summary['succeeded']), [admin_user.email, guest_user.email])
+        create_user_mock.assert_called_once_with(user=admin_user)
+        activate_user_mock.assert_called_once_with(user=guest_user)
+
+    @mock.patch('users.openldap.update_openldap_users.delay')
+    def test_admin_activate_users(self, delay_mock):
+        """
+        Ensure the admin saves the selected accounts' status, and queues one
+        batch job.
+        """
+        delay_mock.return_value = mock.Mock(id='batch-job')
+        self.client.force_login(CustomUser.objects.get(is_staff=True))
+        ids = list(CustomUser.objects.filter(is_staff=False).values_list('pk', flat=True))
+        start = timezone.now()
+
+        response = self.client.post(
+            reverse('admin:users_customuser_changelist'),
+            {'action': 'activate_users', '_selected_action': ids},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Profile.objects.filter(user__in=ids, account_status=Profile.APPROVED).count(), len(ids))
+        self.assertEqual(CustomUser.objects.filter(pk__in=ids, updated_at__gte=start).count(), len(ids))
+        delay_mock.assert_called_once()
+        self.assertEqual(sorted(delay_mock.call_args[0][0]), sorted(ids))